@@ -1,17 +1,22 @@
 # sc_action.py
 
-from binance import enums as k_binance
+import time
+from typing import Optional
+from basics import sc_binance_enums as k_binance
 
 
 class Action:
-    def __init__(self, action_id: str, side: k_binance, qty: float, price: float):
+    def __init__(self, action_id: str, symbol_name: str, side: k_binance, qty: float, price: float,
+                 timestamp: Optional[float] = None):
         self.action_id = action_id
+        self.symbol_name = symbol_name
         self.side = side
         self.qty = qty
         self.price = price
+        self.timestamp = timestamp if timestamp else time.time()
 
-    def get_tuple(self) -> (str, k_binance, float, float):
-        return self.action_id, self.side, self.qty, self.price
+    def get_tuple(self) -> (str, str, k_binance, float, float, float):
+        return self.action_id, self.symbol_name, self.side, self.qty, self.price, self.timestamp
 
     def __repr__(self):
-        return f'{self.action_id} {self.side} {self.qty} {self.price}'
+        return f'{self.action_id} {self.symbol_name} {self.side} {self.qty} {self.price}'
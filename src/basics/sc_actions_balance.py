@@ -0,0 +1,58 @@
+# sc_actions_balance.py
+
+from collections import deque
+from typing import Deque, Dict
+
+from basics import sc_binance_enums as k_binance
+from basics.sc_action import Action
+
+
+class ActionsBalance:
+    # actions are paired by order of creation (first buy with first sell, second buy with second sell, ...)
+    # and the balance is the sum of (sell total - buy total) of every pair
+    # only the actions still waiting for a pair are kept, so adding an action is O(1)
+    def __init__(self):
+        self.buy_count = 0
+        self.sell_count = 0
+        self.balance = 0.0
+        # unpaired actions (only one side can have unpaired actions at a time)
+        self._unpaired: Dict[str, Deque[Action]] = {k_binance.SIDE_BUY: deque(), k_binance.SIDE_SELL: deque()}
+
+    def add(self, action: Action) -> None:
+        if action.side == k_binance.SIDE_BUY:
+            self.buy_count += 1
+            counter_side = k_binance.SIDE_SELL
+        else:
+            self.sell_count += 1
+            counter_side = k_binance.SIDE_BUY
+
+        if len(self._unpaired[counter_side]) > 0:
+            # pair with the oldest unpaired action of the other side
+            counter_action = self._unpaired[counter_side].popleft()
+            sell_action, buy_action = (action, counter_action) if action.side == k_binance.SIDE_SELL \
+                else (counter_action, action)
+            self.balance += sell_action.price * sell_action.qty - buy_action.price * buy_action.qty
+        else:
+            self._unpaired[action.side].append(action)
+
+    def get(self) -> (int, int, float):
+        return self.buy_count, self.sell_count, self.balance
+
+    def to_snapshot(self) -> Dict:
+        return dict(
+            buy_count=self.buy_count,
+            sell_count=self.sell_count,
+            balance=self.balance,
+            unpaired=[list(action.get_tuple()) for side in self._unpaired.keys() for action in self._unpaired[side]]
+        )
+
+    @staticmethod
+    def from_snapshot(snapshot: Dict) -> 'ActionsBalance':
+        actions_balance = ActionsBalance()
+        actions_balance.buy_count = snapshot['buy_count']
+        actions_balance.sell_count = snapshot['sell_count']
+        actions_balance.balance = snapshot['balance']
+        for action_id, symbol_name, side, qty, price, timestamp in snapshot['unpaired']:
+            actions_balance._unpaired[side].append(Action(action_id=action_id, symbol_name=symbol_name, side=side,
+                                                          qty=qty, price=price, timestamp=timestamp))
+        return actions_balance
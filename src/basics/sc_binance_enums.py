@@ -0,0 +1,13 @@
+# sc_binance_enums.py
+
+# the Binance constants used in the app, with the same values as in binance.enums
+# importing binance.enums loads the whole python-binance package (client, websockets, asyncio stack),
+# so these are mirrored here to keep simulations & startup free of it until the Binance client is needed
+
+SIDE_BUY = 'BUY'
+SIDE_SELL = 'SELL'
+
+ORDER_TYPE_LIMIT = 'LIMIT'
+ORDER_TYPE_MARKET = 'MARKET'
+
+TIME_IN_FORCE_GTC = 'GTC'  # Good till cancelled
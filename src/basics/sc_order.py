@@ -2,12 +2,12 @@
 
 import logging
 from enum import Enum
-from binance import enums as k_binance
-from typing import Optional
+from basics import sc_binance_enums as k_binance
+from typing import Optional, Dict, NamedTuple
 
 from basics.sc_symbol import Symbol
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_order')
 
 K_ACTIVATION_DISTANCE = 25.0
 
@@ -21,6 +21,22 @@ class OrderStatus(Enum):
     CANCELED = 4
 
 
+class OrderLogSnapshot(NamedTuple):
+    # immutable copy of the order fields shown in the log (built in the calling thread, formatted in the log
+    # listener thread, see sc_logger.py)
+    uid: str
+    price: float
+    amount: float
+    status_name: str
+
+    def __repr__(self):
+        uid = self.uid
+        return f'/{uid[:4]}_{uid[4:7]}-{uid[7:14]}_{uid[14:17]}-{uid[17:23]}_{uid[23:]}/' \
+               f'{self.price:,.2f}/{self.amount:,.6f}/{self.status_name}]'
+
+    __str__ = __repr__
+
+
 class Order:
     def __init__(self,
                  symbol: Symbol,
@@ -47,6 +63,10 @@ class Order:
         self.amount = round(amount, symbol.base_tp())
         self.status = status
 
+        # incremented on each change shown in the dashboard (status & price), so that only changed orders are
+        # sent again to the orders table
+        self.version = 0
+
         self._bnb_commission = 0.0  # bnb_commission
         self._binance_id = binance_id
 
@@ -79,6 +99,41 @@ class Order:
         d['total'] = self.get_total_at_cmp(cmp=self.price, signed=False, with_commission=False)
         return d
 
+    def to_snapshot(self) -> Dict:
+        # state needed to rebuild the order at warm restart (pt & sibling_order are rebuilt by the pt)
+        return dict(
+            symbol_name=self.symbol.name,
+            order_id=self.order_id,
+            uid=self.uid,
+            name=self.name,
+            k_side=self.k_side,
+            price=self.price,
+            amount=self.amount,
+            status=self.status.name,
+            target_price=self.target_price,
+            bnb_commission=self._bnb_commission,
+            quote_commission=self._quote_commission,
+            binance_id=self._binance_id
+        )
+
+    @staticmethod
+    def from_snapshot(snapshot: Dict, symbol: Symbol) -> 'Order':
+        order = Order(
+            symbol=symbol,
+            order_id=snapshot['order_id'],
+            k_side=snapshot['k_side'],
+            price=snapshot['price'],
+            amount=snapshot['amount'],
+            status=OrderStatus[snapshot['status']],
+            binance_id=snapshot['binance_id'],
+            name=snapshot['name']
+        )
+        order.uid = snapshot['uid']
+        order.target_price = snapshot['target_price']
+        order._bnb_commission = snapshot['bnb_commission']
+        order._quote_commission = snapshot['quote_commission']
+        return order
+
     def is_ready_for_activation(self, cmp: float) -> bool:
         if self.k_side == k_binance.SIDE_BUY and cmp < self.price - self.over_activation_shift:
             return True
@@ -92,14 +147,14 @@ class Order:
                 return True
             # if target_price < cmp < price does nothing
             elif cmp < self.target_price:
-                self.price = self.target_price
+                self.set_price(price=self.target_price)
                 self.target_price -= self.distance_to_target_price
         elif self.k_side == k_binance.SIDE_SELL:
             if cmp < self.price:
                 return True
             # if price < cmp < target_price does nothing
             elif cmp > self.target_price:
-                self.price = self.target_price
+                self.set_price(price=self.target_price)
                 self.target_price += self.distance_to_target_price
 
         return False
@@ -163,19 +218,25 @@ class Order:
     def set_status(self, status: OrderStatus):
         old_status = self.status
         self.status = status
-        log.info(f'** ORDER STATUS CHANGED FROM {old_status.name} TO {status.name} - {self}')
+        self.version += 1
+        log.info('** ORDER STATUS CHANGED FROM %s TO %s - %s', old_status.name, status.name, self)
+
+    def set_price(self, price: float):
+        self.price = price
+        self.version += 1
 
     def set_binance_id(self, new_id: int):
         self._binance_id = new_id
 
+    def get_log_snapshot(self) -> OrderLogSnapshot:
+        return OrderLogSnapshot(uid=self.uid, price=self.price, amount=self.amount, status_name=self.status.name)
+
     def __repr__(self):
-        return (
-                # f'{self.k_side:4} - {self.pt.id:5} - {self.name:5}'
-                f'/{self.uid[:4]}_{self.uid[4:7]}-{self.uid[7:14]}_{self.uid[14:17]}-{self.uid[17:23]}_{self.uid[23:]}/'
-                f'{self.price:,.2f}/{self.amount:,.6f}/{self.status.name}]'
-                # f' - {self._bnb_commission:12,.6f} - '
-                # f'- {self._binance_id}]'
-        )
+        # same text as the log snapshot
+        # f'{self.k_side:4} - {self.pt.id:5} - {self.name:5}'
+        # f' - {self._bnb_commission:12,.6f} - '
+        # f'- {self._binance_id}]'
+        return repr(self.get_log_snapshot())
 
     def _is_filter_passed(self) -> bool:
         return self.symbol.are_filters_ok(price=self.price, qty=self.amount)
@@ -1,6 +1,8 @@
 # sc_pending_order.py
 
-from binance import enums as k_binance
+import time
+from typing import Optional
+from basics import sc_binance_enums as k_binance
 
 
 class PendingOrder:
@@ -9,16 +11,17 @@ class PendingOrder:
                  uid: str,
                  k_side: k_binance,
                  price: float,
-                 qty: float):
+                 qty: float,
+                 timestamp: Optional[float] = None):
         self.symbol_name = symbol_name
         self.uid = uid
         self.k_side = k_side
         self.price = price
         self.qty = qty
+        self.timestamp = timestamp if timestamp else time.time()
 
-    def get_tuple_for_pending_order_table(self) -> (str, str, k_binance, float, float):
-        return self.symbol_name, self.uid, self.k_side, self.price, self.qty
+    def get_tuple_for_pending_order_table(self) -> (str, str, k_binance, float, float, float):
+        return self.symbol_name, self.uid, self.k_side, self.price, self.qty, self.timestamp
 
     def __repr__(self):
         return f'{self.symbol_name} {self.uid} {self.price} {self.qty}'
-
@@ -2,7 +2,7 @@
 
 from enum import Enum
 from basics.sc_order import Order
-from typing import List
+from typing import List, Dict
 
 
 class PerfectTradeStatus(Enum):
@@ -67,3 +67,25 @@ class PerfectTrade:
 
     def get_gap(self) -> float:
         return abs(self.orders[1].price - self.orders[0].price)
+
+    def to_snapshot(self) -> Dict:
+        # orders are referenced by uid (both references are the same order in previous runs orders)
+        return dict(
+            pt_id=self.id,
+            pt_type=self.pt_type,
+            status=self.status.name,
+            original_expected_profit=self._original_expected_profit,
+            orders_uid=[order.uid for order in self.orders]
+        )
+
+    @staticmethod
+    def from_snapshot(snapshot: Dict, orders: Dict[str, Order]) -> 'PerfectTrade':
+        pt = PerfectTrade(
+            pt_id=snapshot['pt_id'],
+            orders=[orders[uid] for uid in snapshot['orders_uid']],
+            pt_type=snapshot['pt_type']
+        )
+        pt.status = PerfectTradeStatus[snapshot['status']]
+        # orders prices may have changed since the pt creation
+        pt._original_expected_profit = snapshot['original_expected_profit']
+        return pt
@@ -0,0 +1,72 @@
+# bench.py
+
+# benchmarks, run from src/:
+#   python bench.py session                                  (session engine against FakeClient: 10, 1k & 100k pt)
+#   python bench.py session --sizes 10,1000 --save-baseline  (store the results as the baseline)
+#   python bench.py session --baseline bench_baseline_session.json --threshold 0.2
+#   python bench.py model                                    (Order & PerfectTrade micro-benchmarks & allocations)
+#   python bench.py model --only order_init,pt_create
+# results are written as json and appended to the history (bench_history.jsonl);
+# with a baseline, regressions are reported and the exit code is 1
+
+import argparse
+import os
+import sys
+
+from benchmarks.sc_bench_runner import write_results, load_results, compare_results, get_report, append_history, \
+    DEFAULT_THRESHOLD
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scorpius benchmarks')
+    parser.add_argument('suite', choices=['session', 'model'])
+    parser.add_argument('--config', default='config_new.ini', help='base config file')
+    parser.add_argument('--sizes', default=None, help='session: comma separated number of pt (default: 10,1000,100000)')
+    parser.add_argument('--symbol', default=None, help='symbol (default: first symbol in config)')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the synthetic population & market')
+    parser.add_argument('--max-ticks', type=int, default=2_000, help='session: ticks for the smallest population')
+    parser.add_argument('--only', default=None, help='model: comma separated benchmarks (default: all)')
+    parser.add_argument('--allocations-count', type=int, default=1_000,
+                        help='model: calls traced for each allocation measure')
+    parser.add_argument('--output', default=None, help='results file (default: bench_<suite>.json)')
+    parser.add_argument('--baseline', default=None, help='baseline file (default: bench_baseline_<suite>.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--history', default='bench_history.jsonl', help='results history (empty: not written)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown of the median reported as regression')
+    args = parser.parse_args()
+
+    config_file = os.path.abspath(args.config)
+    output_file = args.output or f'bench_{args.suite}.json'
+    baseline_file = args.baseline or f'bench_baseline_{args.suite}.json'
+
+    # imported here, each suite only loads its own modules
+    if args.suite == 'session':
+        from benchmarks.sc_bench_session import run_session_benchmarks
+        sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else None
+        results = run_session_benchmarks(config_file=config_file, sizes=sizes, symbol_name=args.symbol,
+                                         seed=args.seed, max_ticks=args.max_ticks)
+    else:
+        from benchmarks.sc_bench_model import run_model_benchmarks
+        results = run_model_benchmarks(config_file=config_file, symbol_name=args.symbol,
+                                       names=args.only.split(',') if args.only else None,
+                                       allocations_count=args.allocations_count)
+
+    write_results(results=results, output_file=output_file)
+    if args.history:
+        append_history(results=results, history_file=args.history)
+
+    baseline = None if args.save_baseline else load_results(file_name=baseline_file)
+    comparison = compare_results(results=results, baseline=baseline, threshold=args.threshold) if baseline else None
+    print(get_report(results=results, comparison=comparison))
+    print(f'results written to {output_file}')
+
+    if args.save_baseline:
+        write_results(results=results, output_file=baseline_file)
+        print(f'baseline written to {baseline_file}')
+    elif comparison and any([c['is_regression'] for c in comparison]):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# sc_bench_model.py
+
+import gc
+import logging
+import os
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from basics import sc_binance_enums as k_binance
+from basics.sc_order import Order, OrderStatus
+from basics.sc_perfect_trade import PerfectTrade, PerfectTradeStatus
+from basics.sc_symbol import Symbol
+from session.sc_pt_calculator import get_prices_given_neb
+from simulator.sc_fake_client import FakeClient
+from benchmarks.sc_bench_runner import bench_work_dir, measure, get_number, get_environment, get_first_symbol_name
+
+log = logging.getLogger('log.sc_bench_model')
+
+# objects created (and kept alive) for each allocation measure
+DEFAULT_ALLOCATIONS_COUNT = 1_000
+
+# allocation lines reported for each benchmark
+TOP_ALLOCATIONS = 5
+
+
+class ModelFixture:
+    # a symbol (from the simulator) and a few orders & perfect trades in every status
+    def __init__(self, symbol_name: str):
+        client = FakeClient(user_socket_callback=lambda msg: None, symbol_ticker_socket_callback=lambda msg: None)
+        self.symbol: Symbol = client.symbols[symbol_name]
+        self.cmp = client.cmp[symbol_name]
+        self._count = 0
+
+        self.new_pt = self.create_pt()
+        self.buy_traded_pt = self.create_pt()
+        self._trade(order=self.buy_traded_pt.orders[0], pt_status=PerfectTradeStatus.BUY_TRADED)
+        self.completed_pt = self.create_pt()
+        self._trade(order=self.completed_pt.orders[0], pt_status=PerfectTradeStatus.BUY_TRADED)
+        self._trade(order=self.completed_pt.orders[1], pt_status=PerfectTradeStatus.COMPLETED)
+        self.order = self.new_pt.orders[0]
+        self.order_snapshot = self.order.to_snapshot()
+
+    def create_order(self, k_side: str = k_binance.SIDE_BUY) -> Order:
+        self._count += 1
+        b1_price, s1_price, quantity = get_prices_given_neb(mp=self.cmp, symbol=self.symbol)
+        is_buy = k_side == k_binance.SIDE_BUY
+        return Order(
+            symbol=self.symbol,
+            order_id=f'{"BUYY" if is_buy else "SELL"}{self._count:06d}SESSION001BENCH',
+            k_side=k_side,
+            price=b1_price if is_buy else s1_price,
+            amount=quantity,
+            name='b1' if is_buy else 's1'
+        )
+
+    def create_pt(self) -> PerfectTrade:
+        # as PTManager.create_new_pt does
+        b1 = self.create_order(k_side=k_binance.SIDE_BUY)
+        s1 = self.create_order(k_side=k_binance.SIDE_SELL)
+        return PerfectTrade(pt_id=f'{self._count:03}', orders=[b1, s1])
+
+    @staticmethod
+    def _trade(order: Order, pt_status: PerfectTradeStatus) -> None:
+        order.status = OrderStatus.TRADED
+        order.pt.status = pt_status
+
+    def toggle_status(self) -> None:
+        # MONITOR <-> ACTIVE (the most frequent change)
+        order = self.order
+        order.set_status(OrderStatus.ACTIVE if order.status == OrderStatus.MONITOR else OrderStatus.MONITOR)
+
+
+def get_benchmarks(fixture: ModelFixture) -> Dict[str, Callable[[], object]]:
+    # name: function (the returned object is kept alive when measuring allocations)
+    b1, s1 = fixture.new_pt.orders
+    cmp = fixture.cmp
+    return dict(
+        order_init=lambda: fixture.create_order(),
+        perfect_trade_init=lambda: PerfectTrade(pt_id='001', orders=[b1, s1]),
+        pt_create=lambda: fixture.create_pt(),
+        order_set_status=lambda: fixture.toggle_status(),
+        order_is_ready_for_activation=lambda: b1.is_ready_for_activation(cmp=cmp),
+        order_get_total_at_cmp=lambda: b1.get_total_at_cmp(cmp=cmp),
+        pt_get_actual_profit_at_cmp=lambda: fixture.buy_traded_pt.get_actual_profit_at_cmp(cmp=cmp),
+        pt_get_consolidated_profit=lambda: fixture.completed_pt.get_consolidated_profit(),
+        order_to_dict_for_df=lambda: b1.to_dict_for_df(),
+        order_to_snapshot=lambda: b1.to_snapshot(),
+        order_from_snapshot=lambda: Order.from_snapshot(snapshot=fixture.order_snapshot, symbol=fixture.symbol),
+        pt_to_snapshot=lambda: fixture.new_pt.to_snapshot()
+    )
+
+
+def measure_allocations(f: Callable[[], object], count: int) -> Dict:
+    # memory allocated by count calls whose results are kept alive (retained size of the created objects),
+    # plus the peak while calling (temporary allocations), per call
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    start_size, _ = tracemalloc.get_traced_memory()
+    kept = [f() for _ in range(count)]
+    _, peak_size = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    trace_filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    stats = after.filter_traces(trace_filters).compare_to(before.filter_traces(trace_filters), 'lineno')
+    stats = [stat for stat in stats if stat.size_diff > 0]
+    del kept
+
+    return dict(
+        count=count,
+        bytes_per_call=round(sum([stat.size_diff for stat in stats]) / count, 1),
+        blocks_per_call=round(sum([stat.count_diff for stat in stats]) / count, 2),
+        peak_bytes_per_call=round((peak_size - start_size) / count, 1),
+        top=[f'{_get_relative_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno} '
+             f'{stat.size_diff / count:.1f} B {stat.count_diff / count:.2f} blocks'
+             for stat in stats[:TOP_ALLOCATIONS] if stat.size_diff >= count]
+    )
+
+
+def _get_relative_path(file_name: str) -> str:
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.relpath(file_name, src_dir) if file_name.startswith(src_dir) else os.path.basename(file_name)
+
+
+def run_model_benchmarks(config_file: str,
+                         symbol_name: Optional[str] = None,
+                         names: Optional[List[str]] = None,
+                         allocations_count: int = DEFAULT_ALLOCATIONS_COUNT) -> Dict:
+    symbol_name = symbol_name or get_first_symbol_name(config_file=config_file)
+    results = dict(suite='model', environment=get_environment(),
+                   parameters=dict(symbol_name=symbol_name, allocations_count=allocations_count),
+                   benchmarks={}, allocations={})
+
+    with bench_work_dir(config_file=config_file, overrides={}):
+        fixture = ModelFixture(symbol_name=symbol_name)
+        for name, f in get_benchmarks(fixture=fixture).items():
+            if names and name not in names:
+                continue
+            results['benchmarks'][name] = measure(f=f, number=get_number(f=f), repeat=7)
+            results['allocations'][name] = measure_allocations(f=f, count=allocations_count)
+    return results
@@ -0,0 +1,167 @@
+# sc_bench_runner.py
+
+import configparser
+import contextlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+log = logging.getLogger('log.sc_bench_runner')
+
+# a benchmark is flagged as a regression when its median is this fraction slower than the baseline
+DEFAULT_THRESHOLD = 0.20
+
+
+@contextlib.contextmanager
+def bench_work_dir(config_file: str, overrides: Dict[str, Dict[str, str]]):
+    # the app reads config_new.ini, log/ and database.db from the working directory:
+    # benchmarks run in a temporary one (MANUAL mode, no snapshots) with the app silenced
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='scorpius_bench_')
+    try:
+        config = configparser.ConfigParser()
+        config.read(config_file)
+        config.set('APP_MODE', 'client_mode', 'CLIENT_MODE_SIMULATOR_MANUAL')
+        if config.has_section('SNAPSHOT'):
+            config.set('SNAPSHOT', 'enabled', 'False')
+        for section, values in overrides.items():
+            for key, value in values.items():
+                config.set(section, key, str(value))
+        with open(os.path.join(work_dir, 'config_new.ini'), 'w') as f:
+            config.write(f)
+        os.mkdir(os.path.join(work_dir, 'log'))
+        os.chdir(work_dir)
+
+        logging.getLogger('log').addHandler(logging.NullHandler())
+        logging.getLogger('log').propagate = False
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            yield work_dir
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def get_first_symbol_name(config_file: str) -> str:
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    symbols_s = config.get('BINANCE', 'symbols')
+    return symbols_s.replace(' ', '').replace('[', '').replace(']', '').replace("'", '').split(',')[0]
+
+
+def get_stats(samples_ns: List[int], number: int = 1) -> Dict:
+    # samples_ns: elapsed time of each sample (of number calls), stats per call in microseconds
+    per_call = sorted([sample / number / 1000 for sample in samples_ns])
+    return dict(
+        n=len(per_call) * number,
+        min_us=round(per_call[0], 3),
+        median_us=round(statistics.median(per_call), 3),
+        mean_us=round(statistics.mean(per_call), 3),
+        p99_us=round(per_call[min(len(per_call) - 1, int(len(per_call) * 0.99))], 3),
+        max_us=round(per_call[-1], 3)
+    )
+
+
+def measure(f: Callable[[], object], number: int = 1, repeat: int = 5) -> Dict:
+    # time repeat samples of number calls
+    samples_ns: List[int] = []
+    for _ in range(repeat):
+        start_ns = time.perf_counter_ns()
+        for _ in range(number):
+            f()
+        samples_ns.append(time.perf_counter_ns() - start_ns)
+    return get_stats(samples_ns=samples_ns, number=number)
+
+
+def get_number(f: Callable[[], object], target_s: float = 0.05, max_number: int = 100_000) -> int:
+    # calls per sample so that each sample lasts about target_s (a first call is also a warm-up)
+    start = time.perf_counter()
+    f()
+    elapsed = time.perf_counter() - start
+    return max(1, min(max_number, int(target_s / elapsed) if elapsed > 0 else max_number))
+
+
+def get_environment() -> Dict:
+    return dict(
+        timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        python=platform.python_version(),
+        implementation=platform.python_implementation(),
+        machine=platform.machine(),
+        system=platform.system(),
+        processor=platform.processor()
+    )
+
+
+def write_results(results: Dict, output_file: str) -> None:
+    with open(output_file, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(file_name: str) -> Optional[Dict]:
+    if not os.path.isfile(file_name):
+        return None
+    with open(file_name) as f:
+        return json.load(f)
+
+
+def append_history(results: Dict, history_file: str) -> None:
+    # one json line per run (environment & medians), to follow the results over time
+    line = dict(suite=results['suite'], environment=results['environment'],
+                medians={name: stats['median_us'] for name, stats in results['benchmarks'].items()
+                         if 'median_us' in stats})
+    if 'allocations' in results.keys():
+        line['bytes_per_call'] = {name: allocations['bytes_per_call']
+                                  for name, allocations in results['allocations'].items()}
+    with open(history_file, 'a') as f:
+        f.write(json.dumps(line, sort_keys=True) + '\n')
+
+
+def compare_results(results: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    # compare the medians of the benchmarks present in both, sorted by ratio (slowest first)
+    # (single sample values, like the fixture build time, are too noisy to be compared)
+    comparison = []
+    for name, stats in results['benchmarks'].items():
+        baseline_stats = baseline['benchmarks'].get(name)
+        if not baseline_stats or 'median_us' not in stats or 'median_us' not in baseline_stats:
+            continue
+        if stats['n'] < 2:
+            continue
+        ratio = stats['median_us'] / baseline_stats['median_us'] if baseline_stats['median_us'] > 0 else 1.0
+        comparison.append(dict(
+            name=name,
+            baseline_us=baseline_stats['median_us'],
+            current_us=stats['median_us'],
+            ratio=round(ratio, 3),
+            is_regression=ratio > 1 + threshold,
+            is_improvement=ratio < 1 / (1 + threshold)
+        ))
+    return sorted(comparison, key=lambda c: c['ratio'], reverse=True)
+
+
+def get_report(results: Dict, comparison: Optional[List[Dict]] = None) -> str:
+    lines = [f'{"benchmark":<48} {"median us":>12} {"p99 us":>12} {"n":>8}']
+    for name, stats in results['benchmarks'].items():
+        if 'error' in stats:
+            lines.append(f'{name:<48} error: {stats["error"]}')
+        else:
+            lines.append(f'{name:<48} {stats["median_us"]:>12,.3f} {stats["p99_us"]:>12,.3f} {stats["n"]:>8}')
+    if results.get('allocations'):
+        lines.append('')
+        lines.append(f'{"allocations":<48} {"B/call":>12} {"blocks/call":>12} {"peak B/call":>12}')
+        for name, allocations in results['allocations'].items():
+            lines.append(f'{name:<48} {allocations["bytes_per_call"]:>12,.1f} {allocations["blocks_per_call"]:>12,.2f} '
+                         f'{allocations["peak_bytes_per_call"]:>12,.1f}')
+            lines += [f'    {top}' for top in allocations['top']]
+    if comparison is not None:
+        lines.append('')
+        lines.append(f'{"benchmark":<48} {"baseline us":>12} {"current us":>12} {"ratio":>8}')
+        for c in comparison:
+            flag = ' REGRESSION' if c['is_regression'] else (' improved' if c['is_improvement'] else '')
+            lines.append(f'{c["name"]:<48} {c["baseline_us"]:>12,.3f} {c["current_us"]:>12,.3f} '
+                         f'{c["ratio"]:>8.3f}{flag}')
+    return '\n'.join(lines)
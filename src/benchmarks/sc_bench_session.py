@@ -0,0 +1,239 @@
+# sc_bench_session.py
+
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+from basics.sc_order import OrderStatus
+from basics.sc_perfect_trade import PerfectTrade, PerfectTradeStatus
+from basics.sc_symbol import Asset
+from managers.sc_account_manager import AccountManager
+from managers.sc_db_manager import DBManager
+from managers.sc_isolated_manager import IsolatedOrdersManager
+from market.sc_market_api_out import MarketAPIOut
+from market.sc_market_sockets_in import MarketSocketsIn
+from session.sc_helpers import Helpers
+from session.sc_session import Session
+from simulator.sc_fake_client import FakeClient
+from benchmarks.sc_bench_runner import bench_work_dir, measure, get_number, get_stats, get_environment, \
+    get_first_symbol_name
+from sc_events import events
+
+log = logging.getLogger('log.sc_bench_session')
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+
+# share of synthetic perfect trades by status (the rest are NEW)
+PT_STATUS_MIX = [(PerfectTradeStatus.BUY_TRADED, 0.25), (PerfectTradeStatus.SELL_TRADED, 0.25),
+                 (PerfectTradeStatus.COMPLETED, 0.10)]
+
+# synthetic pt are created at random prices within cmp +/- PRICE_SPREAD (relative)
+PRICE_SPREAD = 0.05
+
+# with big populations each tick trades many orders (and tries new pt for each one): the tick loop
+# of each size stops after this time, whatever the number of ticks done
+TICKS_TIME_BUDGET = 10.0
+
+
+class SessionFixture:
+    # a Session (and its PTManager) against a FakeClient, populated with pt_count synthetic perfect trades
+    # the fake exchange fills are sent back to the session (as SessionManager does), so ticks follow
+    # the real path: activation, market orders, traded callbacks & new pt
+    def __init__(self, symbol_name: str, pt_count: int, seed: int):
+        self.rng = random.Random(seed)
+
+        self.market_sockets_in = MarketSocketsIn(
+            order_traded_callback=self._order_traded_callback,
+            account_balance_callback=lambda accounts: None,
+            symbol_ticker_callback=lambda name, cmp: None,
+            update_previous_callback=lambda: None,
+            order_canceled_callback=lambda name, uid, k_side, price, qty: None
+        )
+        self.client = FakeClient(user_socket_callback=self.market_sockets_in.binance_user_socket_callback,
+                                 symbol_ticker_socket_callback=lambda msg: None)
+        self.symbol = self.client.symbols[symbol_name]
+        self.market = MarketAPIOut(client=self.client, hot_reconnect_callback=lambda: None)
+        self.iom = IsolatedOrdersManager()
+        self.dbm = DBManager()
+        self.session = Session(
+            symbol=self.symbol,
+            session_id=f'SESSION001{symbol_name}BENCH',
+            isolated_orders_manager=self.iom,
+            session_stopped_callback=lambda *args: None,
+            market=self.market,
+            account_manager=AccountManager(accounts=self.market.get_account_info()),
+            dbm=self.dbm,
+            isolated_order_traded_callback=lambda symbol, consolidated, expected: None,
+            get_liquidity_needed_callback=self._get_liquidity_needed_callback,
+            consolidated_profit=0.0
+        )
+        self._populate(pt_count=pt_count)
+
+    def _populate(self, pt_count: int) -> None:
+        session = self.session
+        cmp = session.cmp
+        for _ in range(pt_count):
+            session.ptm.create_new_pt(cmp=cmp * (1 + self.rng.uniform(-PRICE_SPREAD, PRICE_SPREAD)),
+                                      symbol=self.symbol)
+            pt = session.ptm.perfect_trades[-1]
+            status = self._get_random_status()
+            if status in [PerfectTradeStatus.BUY_TRADED, PerfectTradeStatus.COMPLETED]:
+                self._trade(pt=pt, index=0)
+            if status == PerfectTradeStatus.SELL_TRADED:
+                self._trade(pt=pt, index=1)
+            if status == PerfectTradeStatus.COMPLETED:
+                self._trade(pt=pt, index=1)
+        session.gap = session.ptm.get_first_gap()
+
+        # cmp patterns filled, so that the pt creation shift is computed from the tendency
+        for pattern in [session.cmp_pattern_short, session.cmp_pattern_long]:
+            for i in range(len(pattern)):
+                pattern[i] = cmp * (1 + self.rng.uniform(-0.001, 0.001))
+
+    def _get_random_status(self) -> PerfectTradeStatus:
+        r = self.rng.random()
+        for status, share in PT_STATUS_MIX:
+            if r < share:
+                return status
+            r -= share
+        return PerfectTradeStatus.NEW
+
+    def _trade(self, pt: PerfectTrade, index: int) -> None:
+        order = pt.orders[index]
+        order.set_status(status=OrderStatus.TRADED)
+        self.session.ptm.order_traded(order=order)
+
+    def _order_traded_callback(self, symbol_name: str, uid: str, price: float, bnb_commission: float) -> None:
+        if symbol_name == self.symbol.name:
+            self.session.order_traded_callback(uid=uid, order_price=price, bnb_commission=bnb_commission)
+
+    def _get_liquidity_needed_callback(self, asset: Asset) -> float:
+        # same as SessionManager with a single session
+        quote_asset_needed, base_asset_needed = self.session.ptm.get_symbol_liquidity_needed()
+        if self.symbol.quote_asset().name() == asset.name():
+            return quote_asset_needed
+        if self.symbol.base_asset().name() == asset.name():
+            return base_asset_needed
+        return 0.0
+
+    def get_to_be_traded_uids(self, count: int) -> List[str]:
+        # first orders of NEW pt set as sent to the market (as helpers.place_market_order does)
+        uids = []
+        for pt in self.session.ptm.get_pt_by_request(pt_status=[PerfectTradeStatus.NEW]):
+            if len(uids) >= count:
+                break
+            order = pt.orders[self.rng.randint(0, 1)]
+            order.set_status(status=OrderStatus.TO_BE_TRADED)
+            uids.append(order.uid)
+        return uids
+
+    def close(self) -> None:
+        self.dbm.close()
+
+
+def get_overrides(symbol_name: str) -> Dict[str, Dict[str, str]]:
+    # exit conditions out of reach (the session must not quit while measuring) and enough liquidity
+    # for any number of pt (otherwise allow_new_pt_creation would only measure the liquidity checks)
+    return {
+        symbol_name: dict(target_total_net_profit='1e15', max_negative_profit_allowed='-1e15'),
+        'SIMULATOR_GLOBAL_DATA': dict(initial_btc='1e9', initial_eur='1e13', initial_bnb='1e9', initial_eth='1e9')
+    }
+
+
+def run_size_benchmarks(symbol_name: str, pt_count: int, seed: int, ticks: int,
+                        ticks_time_budget: float = TICKS_TIME_BUDGET) -> Dict[str, Dict]:
+    benchmarks: Dict[str, Dict] = {}
+    suffix = f'[pt={pt_count}]'
+
+    start_ns = time.perf_counter_ns()
+    fixture = SessionFixture(symbol_name=symbol_name, pt_count=pt_count, seed=seed)
+    benchmarks[f'fixture_build{suffix}'] = get_stats(samples_ns=[time.perf_counter_ns() - start_ns])
+    session = fixture.session
+    cmp = session.cmp
+    orders = session.ptm.get_all_alive_orders()
+    gap = session.gap if session.gap > 0 else 1.0
+
+    read_only_benchmarks = dict(
+        get_total_actual_profit_at_cmp=lambda: session.ptm.get_total_actual_profit_at_cmp(cmp=cmp),
+        get_all_alive_orders=lambda: session.ptm.get_all_alive_orders(),
+        get_gap_span_from_list=lambda: Helpers.get_gap_span_from_list(orders=orders, cmp=cmp, gap=gap),
+        get_gap_depth_from_list=lambda: Helpers.get_gap_depth_from_list(orders=orders, cmp=cmp, gap=gap),
+        get_gap_momentum_from_list=lambda: Helpers.get_gap_momentum_from_list(orders=orders, cmp=cmp, gap=gap),
+        get_momentum=lambda: session.ptm.get_momentum(cmp=cmp),
+        allow_new_pt_creation=lambda: session.checks_manager.allow_new_pt_creation(
+            cmp=cmp, consolidated_profit=session.consolidated_profit, gap=session.gap,
+            cmp_pattern_short=session.cmp_pattern_short, cmp_pattern_long=session.cmp_pattern_long)
+    )
+    for name, f in read_only_benchmarks.items():
+        benchmarks[name + suffix] = _run_safe(f=f)
+
+    # order traded: each call measured (it changes the state)
+    try:
+        uids = fixture.get_to_be_traded_uids(count=200)
+        samples_ns = []
+        for uid in uids:
+            start_ns = time.perf_counter_ns()
+            session.order_traded_callback(uid=uid, order_price=cmp, bnb_commission=0.0)
+            samples_ns.append(time.perf_counter_ns() - start_ns)
+        benchmarks[f'order_traded_callback{suffix}'] = get_stats(samples_ns=samples_ns)
+    except Exception as e:
+        benchmarks[f'order_traded_callback{suffix}'] = dict(error=f'{type(e).__name__}: {e}')
+
+    # ticks: seeded random walk with the simulator steps
+    choice_values = fixture.client.choice_values[symbol_name]
+    errors_before = events.get_counters().get('tick_error', 0)
+    samples_ns = []
+    budget_end = time.perf_counter() + ticks_time_budget
+    try:
+        for _ in range(ticks):
+            if time.perf_counter() > budget_end:
+                break
+            cmp += fixture.rng.choice(choice_values)
+            fixture.client.cmp[symbol_name] = cmp
+            start_ns = time.perf_counter_ns()
+            session.symbol_ticker_callback(cmp=cmp)
+            samples_ns.append(time.perf_counter_ns() - start_ns)
+        tick_stats = get_stats(samples_ns=samples_ns)
+        tick_stats['ticks_per_s'] = round(1e6 / tick_stats['mean_us'], 1) if tick_stats['mean_us'] > 0 else 0.0
+        tick_stats['tick_errors'] = events.get_counters().get('tick_error', 0) - errors_before
+        tick_stats['pt_count_end'] = len(session.ptm.perfect_trades)
+        benchmarks[f'tick{suffix}'] = tick_stats
+    except Exception as e:
+        benchmarks[f'tick{suffix}'] = dict(error=f'{type(e).__name__}: {e} (after {len(samples_ns)} ticks)')
+
+    fixture.close()
+    return benchmarks
+
+
+def _run_safe(f) -> Dict:
+    # a failing benchmark (i.e. an optional dependency not installed) does not stop the suite
+    try:
+        return measure(f=f, number=get_number(f=f), repeat=7)
+    except Exception as e:
+        return dict(error=f'{type(e).__name__}: {e}')
+
+
+def get_ticks(pt_count: int, max_ticks: int) -> int:
+    # the tick cost grows with the number of pt: keep each size within a few seconds
+    return max(20, min(max_ticks, 200_000 // max(pt_count, 1)))
+
+
+def run_session_benchmarks(config_file: str,
+                           sizes: Optional[List[int]] = None,
+                           symbol_name: Optional[str] = None,
+                           seed: int = 1,
+                           max_ticks: int = 2_000) -> Dict:
+    sizes = sizes or DEFAULT_SIZES
+    results = dict(suite='session', environment=get_environment(),
+                   parameters=dict(sizes=sizes, seed=seed, max_ticks=max_ticks), benchmarks={})
+    symbol_name = symbol_name or get_first_symbol_name(config_file=config_file)
+    results['parameters']['symbol_name'] = symbol_name
+
+    for pt_count in sizes:
+        with bench_work_dir(config_file=config_file, overrides=get_overrides(symbol_name=symbol_name)):
+            results['benchmarks'].update(run_size_benchmarks(symbol_name=symbol_name, pt_count=pt_count, seed=seed,
+                                                             ticks=get_ticks(pt_count=pt_count,
+                                                                             max_ticks=max_ticks)))
+    return results
+
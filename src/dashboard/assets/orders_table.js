@@ -0,0 +1,34 @@
+// orders_table.js
+
+// orders table rows merged from the orders feed changes (see dash_callbacks.py & sc_orders_feed.py):
+// changed rows replaced, removed rows deleted, cmp row added & sorted by price
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    orders: {
+        merge: function(changes, data) {
+            if (!changes) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            var rows = {};
+            if (!changes.full && data) {
+                data.forEach(function(row) {
+                    if (row.id !== 'cmp') {
+                        rows[row.id] = row;
+                    }
+                });
+            }
+            changes.rows.forEach(function(row) {
+                rows[row.id] = row;
+            });
+            changes.removed.forEach(function(id) {
+                delete rows[id];
+            });
+
+            var table = Object.values(rows);
+            table.push({id: 'cmp', pt_id: '', name: '', price: changes.cmp, amount: '', total: 0.0, status: 'cmp'});
+            table.sort(function(a, b) {
+                return b.price - a.price;
+            });
+            return table;
+        }
+    }
+});
@@ -0,0 +1,65 @@
+// state_stream.js
+
+// dashboard values pushed by the server (/stream, see dash_stream.py): the values of every symbol are kept and
+// the ones of the active symbol (the symbol button text) are written in the layout elements, at each message and
+// as soon as the active symbol changes
+(function() {
+    if (!window.EventSource) {
+        return;
+    }
+    var values = {};
+    var lastTs = null;
+
+    function render(ts) {
+        var button = document.getElementById('button-symbols');
+        var symbolValues = button ? values[button.textContent] : undefined;
+        if (!symbolValues || ts === null) {
+            return;
+        }
+        Object.keys(symbolValues).forEach(function(id) {
+            var element = document.getElementById(id);
+            if (element && element.textContent !== symbolValues[id]) {
+                element.textContent = symbolValues[id];
+            }
+        });
+        var currentTime = document.getElementById('current-time');
+        if (currentTime) {
+            currentTime.textContent = new Date(ts * 1000).toTimeString().slice(0, 8);
+        }
+    }
+
+    var source = new EventSource('/stream');
+    source.addEventListener('state', function(event) {
+        var message = JSON.parse(event.data);
+        if (message.full) {
+            values = {};
+        }
+        Object.keys(message.symbols).forEach(function(name) {
+            values[name] = Object.assign(values[name] || {}, message.symbols[name]);
+        });
+        lastTs = message.ts;
+        render(lastTs);
+    });
+
+    // the symbol button is rendered by dash after this script runs: watched once it is in the page
+    function watchSymbolButton() {
+        var button = document.getElementById('button-symbols');
+        if (!button) {
+            return false;
+        }
+        new MutationObserver(function() {
+            render(lastTs);
+        }).observe(button, {childList: true, characterData: true, subtree: true});
+        render(lastTs);
+        return true;
+    }
+
+    if (!watchSymbolButton()) {
+        var pageObserver = new MutationObserver(function() {
+            if (watchSymbolButton()) {
+                pageObserver.disconnect();
+            }
+        });
+        pageObserver.observe(document.body, {childList: true, subtree: true});
+    }
+})();
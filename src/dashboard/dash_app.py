@@ -4,9 +4,13 @@
 # the app entry point is main.py, not dash_app.py
 
 
+import functools
+
 import dash
 import dash_auth
 import dash_bootstrap_components as dbc
+from dash.fingerprint import check_fingerprint
+from flask import Flask, request
 from dashboard.dash_layout import DashLayout
 
 import logging
@@ -15,9 +19,25 @@ VALID_USERNAME_PASSWORD_PAIRS = {
     'xavi': '7639'
 }
 
+# browser cache time (seconds) of the urls that change with their content: the dash bundles (version fingerprint
+# in the name) & the assets files (modification time in the ?m= query), downloaded once per release
+# private: they are behind the basic authentication, so no shared cache may serve them to other clients (the nginx
+# cache keeps them by credentials, see nginx/dash_app)
+STATIC_MAX_AGE = 31_536_000
+
 print('dash_app.py')
 
+# responses compressed by flask-compress (brotli if the browser accepts it, gzip otherwise): the bundles & the
+# callbacks json, not the server-sent events (/stream is a streamed response)
+flask_server = Flask(__name__)
+flask_server.config.update(
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_MIMETYPES=['text/html', 'text/css', 'application/javascript', 'application/json'],
+    COMPRESS_MIN_SIZE=500)
+
 app = dash.Dash(__name__,
+                server=flask_server,
+                compress=True,
                 suppress_callback_exceptions=True,
                 external_stylesheets=[dbc.themes.DARKLY]
                 )
@@ -27,6 +47,33 @@ auth = dash_auth.BasicAuth(app=app, username_password_list=VALID_USERNAME_PASSWO
 server = app.server
 app.layout = DashLayout().get_layout()
 
+
+@server.after_request
+def set_static_cache_headers(response):
+    # fingerprinted urls never change their content: cached without revalidation (a new release changes the url)
+    if response.status_code != 200:
+        return response
+    path = request.path
+    prefix = app.config.requests_pathname_prefix
+    if (path.startswith(prefix + '_dash-component-suites/') and check_fingerprint(path)[1]) or \
+            (path.startswith(prefix + app.config.assets_url_path.strip('/') + '/') and 'm' in request.args):
+        response.cache_control.private = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+
+def protect_route(f):
+    # flask routes added to the dashboard server (dash_metrics.py, dash_stream.py) are not covered by the basic
+    # authentication above, it only wraps the views existing when it is created: use below @app.server.route
+    @functools.wraps(f)
+    def protected(*args, **kwargs):
+        if not auth.is_authorized():
+            return auth.login_request()
+        return f(*args, **kwargs)
+    return protected
+
+
 # This is the default behavior of the logger that Flask uses
 # change this default behavior to only produce logs for errors:
 log = logging.getLogger('werkzeug')
@@ -1,485 +1,276 @@
 # dash_callbacks.py
 
-from dash.dependencies import Input, Output
+import json
+
+import dash
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from dash.exceptions import PreventUpdate
+from dash_table.Format import Format, Scheme, Group
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from dashboard.dash_app import app
-from dashboard.dash_aux import get_pending_html_table
+from dashboard.dash_profiler import callback_profiler
 from session.sc_helpers import QuitMode
 from dashboard.sc_df_manager import DataframeManager
-from binance import enums as k_binance
+from managers.sc_engine_ipc import EngineNotAvailable
 from datetime import datetime, timedelta
-from basics.sc_perfect_trade import PerfectTradeStatus
-from basics.sc_asset import Asset
+import time
+from typing import Callable
+from sc_startup_profiler import startup_profiler
+from sc_state_publisher import state_publisher
 
 print('dash_callbacks.py')
 
-dfm = DataframeManager()
+# every server callback below is profiled (/debug/callbacks & /metrics)
+callback_profiler.install(app=app)
+
+# the session manager publishes the dashboard values from now on
+state_publisher.attach_dashboard()
+
+with startup_profiler.stage('session manager init'):
+    dfm = DataframeManager()
+
+
+# ********** dashboard state **********
+# all the dashboard values come from the state published by the session manager (built in the tick thread at
+# the metrics interval): a single server callback copies the active symbol values into the store, and a
+# clientside callback fans them out to the layout elements (no session data walked, one request per refresh)
+DASHBOARD_STATE_IDS = [
+    # first line data
+    'current-time', 'neb', 'qty', 'target', 'max-negative-profit-allowed',
+    # session data
+    'session-count', 'session-cycle-count', 'pt-new', 'pt-buy', 'pt-sell', 'pt-end',
+    'pt-span', 'pt-span-buy', 'pt-span-sell', 'pt-depth', 'pt-depth-buy', 'pt-depth-sell',
+    'pt-mtm', 'pt-mtm-buy', 'pt-mtm-sell',
+    'actual-profit', 'stop-price-profit', 'ntc', 'time-to-next-try', 'is-active',
+    # global data
+    'global-cycle-count', 'isol-orders-placed', 'isol-orders-pending', 'isol-orders-pending-buy',
+    'isol-orders-pending-sell',
+    'is-span', 'is-span-buy', 'is-span-sell', 'is-depth', 'is-depth-buy', 'is-depth-sell',
+    'is-mtm', 'is-mtm-buy', 'is-mtm-sell',
+    'consolidated-profit', 'expected-profit-at-cmp', 'expected-profit', 'actions-info', 'actions-rate',
+    'canceled-count',
+    # symbol & accounts data
+    'symbol', 'cmp-max', 'cmp', 'cmp-min',
+    'base-asset', 'base-asset-locked', 'base-asset-alive', 'base-asset-free', 'base-asset-total',
+    'quote-asset', 'quote-asset-locked', 'quote-asset-alive', 'quote-asset-free', 'quote-asset-total',
+    'bnb-locked', 'bnb-alive', 'bnb-free', 'bnb-total',
+    # alert message
+    'alert-msg'
+]
+
+
+# with push enabled the values are sent by /stream instead (see dash_stream.py), and the TARGET ACHIEVED check
+# below is not done
+if not dfm.is_push_enabled:
+    @app.callback(Output('dashboard-state', 'data'),
+                  Input('update', 'n_intervals'),
+                  Input('active-symbol', 'data'))  # refreshed as soon as the active symbol changes
+    def update_dashboard_state(value, symbol_name):
+        state = state_publisher.get_state()
+        if not state or symbol_name not in state['symbols'].keys() or 'dashboard' not in state['symbols'][symbol_name]:
+            raise PreventUpdate
+        symbol_state = state['symbols'][symbol_name]
+
+        consolidated = symbol_state['consolidated_profit']
+        expected_at_cmp = symbol_state['expected_profit_at_cmp']
+        if consolidated + expected_at_cmp > 100.0:
+            raise Exception(f'TARGET ACHIEVED!!! in {timedelta(seconds=symbol_state["global_cmp_count"])}'
+                            f' DONE: {consolidated} ACTUAL AL CMP: {expected_at_cmp}')
+
+        data = dict(symbol_state['dashboard'])
+        data['current-time'] = f'{datetime.now().strftime("%H:%M:%S")}'
+        return data
+
+    app.clientside_callback(
+        f"""
+        function(data) {{
+            if (!data) {{
+                throw window.dash_clientside.PreventUpdate;
+            }}
+            return {json.dumps(DASHBOARD_STATE_IDS)}.map(function(id) {{ return data[id]; }});
+        }}
+        """,
+        [Output(element_id, 'children') for element_id in DASHBOARD_STATE_IDS],
+        Input('dashboard-state', 'data'))
 
 
-# first line data
-@app.callback(Output('current-time', 'children'),
-              Output('neb', 'children'),  # perfect trade net profit
-              Output('qty', 'children'),  # orders quantity
-              Output('target', 'children'),  # session target net profit
-              Output('max-negative-profit-allowed', 'children'),  # if reached, session ended at price
-              Input('update', 'n_intervals'))
-def display_value(value):
-    symbol_name = dfm.dashboard_active_symbol.name
-    quote_name = dfm.dashboard_active_symbol.quote_asset().name()
-    base_name = dfm.dashboard_active_symbol.base_asset().name()
-
-    return \
-        f'{datetime.now().strftime("%H:%M:%S")}',\
-        f'n: {dfm.sm.active_sessions[symbol_name].P_NET_QUOTE_BALANCE:,.2f} {quote_name}',\
-        f'q: {dfm.sm.active_sessions[symbol_name].P_QUANTITY:,.4f} {base_name}',\
-        f't: {dfm.sm.active_sessions[symbol_name].checks_manager.P_TARGET_TOTAL_NET_PROFIT:,.2f} {quote_name}',\
-        f'({dfm.sm.active_sessions[symbol_name].checks_manager.P_MAX_NEGATIVE_PROFIT_ALLOWED:,.2f})'
-
-
-# **********************************
-# ********** Session data **********
-# **********************************
-
-# elapsed time
-@app.callback(Output('session-count', 'children'),
-              Output('session-cycle-count', 'children'),
-              Input('update', 'n_intervals'))
-def display_value(value):
-    symbol_name = dfm.dashboard_active_symbol.name
-    return f'#{dfm.sm.session_count[symbol_name]:03d}', \
-           f'{timedelta(seconds=dfm.sm.active_sessions[symbol_name].cmp_count)}'
+# ********** symbol selection buttons *********
+# the active symbol is kept by each browser tab (active-symbol store), so that each one can show its own symbol
+@app.callback(Output('active-symbol', 'data'),
+              Input('button-symbols', 'n_clicks'),
+              Input('overview-table', 'active_cell'),
+              State('overview-table', 'data'),
+              State('active-symbol', 'data'))
+def on_button_click(n, active_cell, overview_rows, symbol_name):
+    # first symbol unless the tab has already one, next symbol if button pressed, the row symbol if an overview
+    # table symbol row clicked
+    current_symbol_name = symbol_name if symbol_name in dfm.symbol_names else dfm.symbol_names[0]
+    triggered = [trigger['prop_id'] for trigger in dash.callback_context.triggered]
+    if 'overview-table.active_cell' in triggered and active_cell and overview_rows \
+            and active_cell['row'] < len(overview_rows) \
+            and overview_rows[active_cell['row']]['symbol'] in dfm.symbol_names:
+        return overview_rows[active_cell['row']]['symbol']
+    elif 'button-symbols.n_clicks' in triggered and n is not None:
+        return dfm.get_next_symbol(symbol_name=current_symbol_name)
+    else:
+        return current_symbol_name
 
 
-# perfect trade status info
-@app.callback(Output('pt-new', 'children'),
-              Output('pt-buy', 'children'),
-              Output('pt-sell', 'children'),
-              Output('pt-end', 'children'),
-              Input('update', 'n_intervals'))
-def display_value(value):
-    symbol_name = dfm.dashboard_active_symbol.name
-    ptm = dfm.sm.active_sessions[symbol_name].ptm
-    return \
-        len(ptm.get_pt_by_request(pt_status=[PerfectTradeStatus.NEW])),\
-        len(ptm.get_pt_by_request(pt_status=[PerfectTradeStatus.BUY_TRADED])),\
-        len(ptm.get_pt_by_request(pt_status=[PerfectTradeStatus.SELL_TRADED])),\
-        len(ptm.get_pt_by_request(pt_status=[PerfectTradeStatus.COMPLETED]))
-
-
-# span, depth, momentum & TBD data
-@app.callback(Output('pt-span', 'children'),
-              Output('pt-span-buy', 'children'),
-              Output('pt-span-sell', 'children'),
-              Output('pt-depth', 'children'),
-              Output('pt-depth-buy', 'children'),
-              Output('pt-depth-sell', 'children'),
-              Output('pt-mtm', 'children'),
-              Output('pt-mtm-buy', 'children'),
-              Output('pt-mtm-sell', 'children'),
-              Input('update', 'n_intervals'))
-def display_value(value):
-    session_orders = dfm.get_session_orders()
-
-    symbol_name = dfm.dashboard_active_symbol.name
-    active_session = dfm.sm.active_sessions[symbol_name]
-    cmp = active_session.cmp
-    gap = active_session.gap
-
-    buy_gap_span, sell_gap_span = active_session.helpers.get_gap_span_from_list(orders=session_orders, cmp=cmp, gap=gap)
-    total_gap_span = buy_gap_span + sell_gap_span
-    buy_gap_depth, sell_gap_depth = active_session.helpers.get_gap_depth_from_list(orders=session_orders, cmp=cmp, gap=gap)
-    total_gap_depth = buy_gap_depth + sell_gap_depth
-    buy_gap_momentum, sell_gap_momentum = active_session.helpers.get_gap_momentum_from_list(orders=session_orders, cmp=cmp, gap=gap)
-    total_gap_momentum = buy_gap_momentum + sell_gap_momentum
-    return \
-        f'{total_gap_span:.2f}', \
-        f'{buy_gap_span:.2f}', \
-        f'{sell_gap_span:.2f}', \
-        f'{total_gap_depth:.2f}', \
-        f'{buy_gap_depth:.2f}', \
-        f'{sell_gap_depth:.2f}', \
-        f'{total_gap_momentum:.2f}', \
-        f'{buy_gap_momentum:.2f}', \
-        f'{sell_gap_momentum:.2f}'
-
-
-# ********** Session STOP profits **********
-@app.callback(Output('actual-profit', 'children'),
-              Output('stop-price-profit', 'children'),
-              Output('ntc', 'children'),
-              Output('time-to-next-try', 'children'),
-              Output('is-active', 'children'),
+# ********** overview **********
+# the rows are built once per publication by the session manager for all the symbols, the same for every client
+@app.callback(Output('overview-table', 'data'),
               Input('update', 'n_intervals'))
-def display_value(value):
-    symbol = dfm.dashboard_active_symbol
-    symbol_name = symbol.name
-    cmp = dfm.sm.active_sessions[symbol_name].cmp
-    qp = symbol.quote_asset().pv()
-    base_ntc = dfm.sm.active_sessions[symbol_name].checks_manager.base_negative_try_count
-    quote_ntc = dfm.sm.active_sessions[symbol_name].checks_manager.quote_negative_try_count
-    
-    cycles_count_for_inactivity = dfm.sm.active_sessions[symbol_name].cycles_count_for_inactivity
-    cycles_to_new_pt = cycles_count_for_inactivity - dfm.sm.active_sessions[symbol_name].cycles_from_last_trade
-    cycles_to_new_pt = 0.0 if cycles_to_new_pt < 0 else cycles_to_new_pt
-    time_to_next_try = timedelta(seconds=cycles_to_new_pt)
-
-    is_active = 'ON' if dfm.sm.active_sessions[symbol_name].is_active else 'OFF'
-
-    return f'{dfm.sm.active_sessions[symbol_name].ptm.get_total_actual_profit_at_cmp(cmp=cmp):,.{qp}f}',\
-           f'{dfm.sm.active_sessions[symbol_name].ptm.get_stop_price_profit(cmp=cmp):,.{qp}f}', \
-           f'{base_ntc} - {quote_ntc}', \
-           f'{time_to_next_try}', \
-           f'{is_active}'
-
-
-# @app.callback(Output('cycles-to-new-pt', 'children'), Input('update', 'n_intervals'))
-# def display_value(value):
-#     symbol_name = dfm.dashboard_active_symbol.name
-#     cycles_count_for_inactivity = dfm.sm.active_sessions[symbol_name].cycles_count_for_inactivity
-#     cycles_to_new_pt = cycles_count_for_inactivity - dfm.sm.active_sessions[symbol_name].cycles_from_last_trade
-#     time_to_new_pt = timedelta(seconds=cycles_to_new_pt)
-#     return f'({cycles_count_for_inactivity})  {time_to_new_pt}'
-
-
-
-# **********************************
-# ********** Global data **********
-# **********************************
-
-
-# ********** Global elapsed time **********
-@app.callback(Output('global-cycle-count', 'children'), Input('update', 'n_intervals'))
-def display_value(value):
-    symbol_name = dfm.dashboard_active_symbol.name
-    global_cmp = dfm.sm.terminated_sessions[symbol_name]["global_cmp_count"]
-    session_cmp = dfm.sm.active_sessions[symbol_name].cmp_count
-    return f'{timedelta(seconds=global_cmp + session_cmp)}'
-
-
-# isolated orders info
-@app.callback(
-    Output('isol-orders-placed', 'children'),
-    Output('isol-orders-pending', 'children'),
-    Output('isol-orders-pending-buy', 'children'),
-    Output('isol-orders-pending-sell', 'children'),
-    Input('update', 'n_intervals'))
-def display_value(value):
-    symbol_name = dfm.dashboard_active_symbol.name
-
-    placed = dfm.sm.terminated_sessions[symbol_name]['global_placed_orders_count_at_price']
-    sell = len(
-        [order for order in dfm.sm.iom.isolated_orders
-         if order.k_side == k_binance.SIDE_SELL and order.symbol.name == symbol_name])
-    buy = len(
-        [order for order in dfm.sm.iom.isolated_orders
-         if order.k_side == k_binance.SIDE_BUY and order.symbol.name == symbol_name])
-    pending = buy + sell
-    return placed, pending, buy, sell
-
-
-# Global span, depth, momentum & TBD data
-@app.callback(Output('is-span', 'children'),
-              Output('is-span-buy', 'children'),
-              Output('is-span-sell', 'children'),
-              Output('is-depth', 'children'),
-              Output('is-depth-buy', 'children'),
-              Output('is-depth-sell', 'children'),
-              Output('is-mtm', 'children'),
-              Output('is-mtm-buy', 'children'),
-              Output('is-mtm-sell', 'children'),
-              Input('update', 'n_intervals'))
-def display_value(value):
-    all_orders = dfm.get_all_orders()
-
-    symbol_name = dfm.dashboard_active_symbol.name
-    active_session = dfm.sm.active_sessions[symbol_name]
-    cmp = active_session.cmp
-    gap = active_session.gap
-
-    buy_gap_span, sell_gap_span = active_session.helpers.get_gap_span_from_list(orders=all_orders, cmp=cmp, gap=gap)
-    total_gap_span = buy_gap_span + sell_gap_span
-    buy_gap_depth, sell_gap_depth = active_session.helpers.get_gap_depth_from_list(orders=all_orders, cmp=cmp, gap=gap)
-    total_gap_depth = buy_gap_depth + sell_gap_depth
-    buy_gap_momentum, sell_gap_momentum = \
-        active_session.helpers.get_gap_momentum_from_list(orders=all_orders, cmp=cmp, gap=gap)
-    total_gap_momentum = buy_gap_momentum + sell_gap_momentum
-    return \
-        f'{total_gap_span:.2f}',\
-        f'{buy_gap_span:.2f}',\
-        f'{sell_gap_span:.2f}', \
-        f'{total_gap_depth:.2f}', \
-        f'{buy_gap_depth:.2f}', \
-        f'{sell_gap_depth:.2f}', \
-        f'{total_gap_momentum:.2f}', \
-        f'{buy_gap_momentum:.2f}', \
-        f'{sell_gap_momentum:.2f}'
-
-
-# ********** Global STOP profits **********
-@app.callback(Output('consolidated-profit', 'children'),
-              Output('expected-profit-at-cmp', 'children'),
-              Output('expected-profit', 'children'),
-              Output('actions-info', 'children'),
-              Output('actions-rate', 'children'),
-              Output('canceled-count', 'children'),
-              Input('update', 'n_intervals'))
-def display_value(value):
-    symbol = dfm.dashboard_active_symbol
-    symbol_name = symbol.name
-    cmp = dfm.sm.active_sessions[symbol_name].cmp  # s[-1]
-    qp = symbol.quote_asset().pv()
-    # coin_symbol = symbol.quote_asset().name()
-    # called the method in session to check buy_count == sell_count
-    consolidated = dfm.sm.terminated_sessions[symbol_name]['global_consolidated_profit']
-    expected = dfm.sm.terminated_sessions[symbol_name]['global_expected_profit']
-    expected_at_cmp = dfm.sm.iom.get_expected_profit_at_cmp(cmp=cmp, symbol_name=symbol_name)
-    buy_actions_count, sell_actions_count, actions_balance = \
-        dfm.sm.active_sessions[symbol_name].checks_manager.get_actions_balance()
-    buy_actions_rate = consolidated / (buy_actions_count +1)
-    sell_actions_rate = consolidated / (sell_actions_count +1)
-    canceled_buy_orders = [order for order in dfm.sm.iom.canceled_orders if order.k_side == k_binance.SIDE_BUY]
-    canceled_sell_orders = [order for order in dfm.sm.iom.canceled_orders if order.k_side == k_binance.SIDE_SELL]
-
-    if consolidated + expected_at_cmp > 100.0:
-        global_cmp = dfm.sm.terminated_sessions[symbol_name]["global_cmp_count"]
-        session_cmp = dfm.sm.active_sessions[symbol_name].cmp_count
-        raise Exception(f'TARGET ACHIEVED!!! in {timedelta(seconds=global_cmp + session_cmp)}'
-                        f' DONE: {consolidated} ACTUAL AL CMP: {expected_at_cmp}')
-
-    return f'{consolidated:,.{qp}f}',\
-           f'{expected_at_cmp:,.{qp}f}',\
-           f'{expected:,.{qp}f}', \
-           f'{buy_actions_count}/{sell_actions_count} {actions_balance:,.2f}', \
-           f'{buy_actions_rate:,.0f} / {sell_actions_rate:,.0f}', \
-           f'{len(canceled_buy_orders)} / {len(canceled_sell_orders)}'
-
-
-# ********** PT count / traded orders count **********
-# @app.callback(Output('trade-info', 'children'), Input('update', 'n_intervals'))
-# def display_value(value):
-#     symbol_name = dfm.dashboard_active_symbol.name
-#     pt_count = len(dfm.sm.active_sessions[symbol_name].ptm.perfect_trades)
-#     buy_count = dfm.sm.active_sessions[symbol_name].buy_count
-#     sell_count = dfm.sm.active_sessions[symbol_name].sell_count
-#     return f'pt: {pt_count}   b: {buy_count}   s: {sell_count}'
-
-
-
-
-# @app.callback(Output('short-prediction', 'children'),
-#               Output('long-prediction', 'children'),
-#               Input('update', 'n_intervals'))
-# def display_value(value):
-#     symbol_name = dfm.dashboard_active_symbol.name
-#     session = dfm.sm.active_sessions[symbol_name]
-#     short_prediction = session.strategy_manager.get_tendency(session.cmp_pattern_short) - session.cmp
-#     long_prediction = session.strategy_manager.get_tendency(session.cmp_pattern_long) - session.cmp
-#     return f'short: {short_prediction:,.0f}', f'long: {long_prediction:,.0f}'
-
-
-# @app.callback(Output('accounts-info', 'children'), Input('update', 'n_intervals'))
-# def display_value(value):
-#     accounts_info = [f'{account.name}: {account.free:,.2f} ' for account in dfm.sm.am.accounts.values()]
-#     accounts_info_s = ' '.join(map(str, accounts_info))
-#     return accounts_info_s
-
-
-# ********** symbol & accounts data **********
-@app.callback(
-    Output('symbol', 'children'),
-    Output('cmp-max', 'children'),
-    Output('cmp', 'children'),
-    Output('cmp-min', 'children'),
-    Output('base-asset', 'children'),
-    Output('base-asset-locked', 'children'),
-    Output('base-asset-alive', 'children'),
-    Output('base-asset-free', 'children'),
-    Output('base-asset-total', 'children'),
-    Output('quote-asset', 'children'),
-    Output('quote-asset-locked', 'children'),
-    Output('quote-asset-alive', 'children'),
-    Output('quote-asset-free', 'children'),
-    Output('quote-asset-total', 'children'),
-    Output('bnb-locked', 'children'),
-    Output('bnb-alive', 'children'),
-    Output('bnb-free', 'children'),
-    Output('bnb-total', 'children'),
-    Input('update', 'n_intervals')
-)
-def display_value(value):
-    symbol = dfm.dashboard_active_symbol
-    symbol_name = symbol.name
-    # am = dfm.sm.active_sessions[symbol_name].am
-    am = dfm.sm.am
-    base_account = am.get_account(symbol.base_asset().name())
-    quote_account = am.get_account(symbol.quote_asset().name())
-    bnb_account = am.get_account('BNB')
-    quote_pv = symbol.quote_asset().pv()
-
-    base_alive = dfm.sm.get_liquidity_for_alive_orders(asset=symbol.base_asset())
-    quote_alive = dfm.sm.get_liquidity_for_alive_orders(asset=symbol.quote_asset())
-    bnb_alive = dfm.sm.get_liquidity_for_alive_orders(asset=Asset(name='BNB', pv=6))
-    # bnb_alive = 1.0
-
-    return \
-        symbol_name, \
-        f'{dfm.sm.active_sessions[symbol_name].max_cmp:,.{quote_pv}f}', \
-        f'{dfm.sm.active_sessions[symbol_name].cmp:,.{quote_pv}f}', \
-        f'{dfm.sm.active_sessions[symbol_name].min_cmp:,.{quote_pv}f}', \
-        symbol.base_asset().name(),\
-        f'{base_account.locked:,.{symbol.base_asset().pv()}f}', \
-        f'{base_alive:,.{symbol.base_asset().pv()}f}', \
-        f'{base_account.free - base_alive:,.{symbol.base_asset().pv()}f}', \
-        f'{base_account.get_total():,.{symbol.base_asset().pv()}f}', \
-        symbol.quote_asset().name(), \
-        f'{quote_account.locked:,.{symbol.quote_asset().pv()}f}', \
-        f'{quote_alive:,.{symbol.quote_asset().pv()}f}', \
-        f'{quote_account.free - quote_alive:,.{symbol.quote_asset().pv()}f}',\
-        f'{quote_account.get_total():,.{symbol.quote_asset().pv()}f}',\
-        f'{bnb_account.locked:,.6f}',\
-        f'{bnb_alive:,.6f}', \
-        f'{bnb_account.free - bnb_alive:,.6f}', \
-        f'{bnb_account.get_total():,.6f}'
-
-
-# ********** alert message **********
-@app.callback(Output('alert-msg', 'children'),
-              Input('update', 'n_intervals'))
-def display_value(value):
-    symbol = dfm.dashboard_active_symbol
+def update_overview_table(value):
+    state = state_publisher.get_state()
+    if 'overview' not in state.keys():
+        raise PreventUpdate
+    return state['overview']
 
-    # check bnb liquidity and raise ALERT
-    bnb_liquidity = dfm.sm.active_sessions[symbol.name].am.get_account('BNB').free
-    if bnb_liquidity < 1.0:
-        return f'BNB LIQUIDITY ALERT {bnb_liquidity:,.6f}'
-    else:
-        return ''
 
+app.clientside_callback(
+    """
+    function(symbol_name) {
+        return symbol_name;
+    }
+    """,
+    Output('button-symbols', 'children'),
+    Input('active-symbol', 'data'))
 
-# ********** symbol selection buttons *********
-@app.callback(Output('button-symbols', 'children'),
-              Input('button-symbols', 'n_clicks'),
-              )
-def on_button_click(n):
-    # set BTCEUR as active symbol if button pressed
-    current_symbol_name = dfm.dashboard_active_symbol.name
-    if n is not None:
-        next_symbol = dfm.get_next_symbol(symbol_name=current_symbol_name)
-        dfm.set_dashboard_active_symbol(symbol_name=next_symbol)
-        return next_symbol
-    else:
-        return current_symbol_name
 
+# Stop buttons (the actions are run by the engine, in this process or in its own one)
+@app.callback(Output('button-stop-cmp', 'children'), Input('button-stop-cmp', 'n_clicks'),
+              State('active-symbol', 'data'))
+def on_button_click(n, symbol_name):
+    return _get_button_text(text='STOP-CMP', n=n, command=lambda: dfm.engine.quit_session(
+        symbol_name=symbol_name, quit_mode=QuitMode.TRADE_ALL_PENDING))
 
-# Stop buttons
-@app.callback(Output('button-stop-cmp', 'children'), Input('button-stop-cmp', 'n_clicks'))
-def on_button_click(n):
-    if n is not None:
-        symbol = dfm.dashboard_active_symbol
-        symbol_name = symbol.name
-        session = dfm.sm.active_sessions[symbol_name]
-        session.helpers.quit_particular_session(
-            quit_mode=QuitMode.TRADE_ALL_PENDING,
-            session_id=session.session_id,
-            symbol=session.symbol,
-            cmp=session.cmp,
-            iom=session.iom,
-            cmp_count=session.cmp_count)
-
-    return 'STOP-CMP'
-
-
-@app.callback(Output('button-stop-price', 'children'), Input('button-stop-price', 'n_clicks'))
-def on_button_click(n):
-    if n is not None:
-        symbol = dfm.dashboard_active_symbol
-        symbol_name = symbol.name
-        session = dfm.sm.active_sessions[symbol_name]
-        session.helpers.quit_particular_session(
-            quit_mode=QuitMode.PLACE_ALL_PENDING,
-            session_id=session.session_id,
-            symbol=session.symbol,
-            cmp=session.cmp,
-            iom=session.iom,
-            cmp_count=session.cmp_count)
-
-    return 'STOP-PRICE'
-
-
-@app.callback(Output('button-stop-cancel', 'children'), Input('button-stop-cancel', 'n_clicks'))
-def on_button_click(n):
-    if n is not None:
-        symbol = dfm.dashboard_active_symbol
-        symbol_name = symbol.name
-        session = dfm.sm.active_sessions[symbol_name]
-        session.helpers.quit_particular_session(
-            quit_mode=QuitMode.CANCEL_ALL,
-            session_id=session.session_id,
-            symbol=session.symbol,
-            cmp=session.cmp,
-            iom=session.iom,
-            cmp_count=session.cmp_count)
-    return 'STOP-CANCEL'
+
+@app.callback(Output('button-stop-price', 'children'), Input('button-stop-price', 'n_clicks'),
+              State('active-symbol', 'data'))
+def on_button_click(n, symbol_name):
+    return _get_button_text(text='STOP-PRICE', n=n, command=lambda: dfm.engine.quit_session(
+        symbol_name=symbol_name, quit_mode=QuitMode.PLACE_ALL_PENDING))
+
+
+@app.callback(Output('button-stop-cancel', 'children'), Input('button-stop-cancel', 'n_clicks'),
+              State('active-symbol', 'data'))
+def on_button_click(n, symbol_name):
+    return _get_button_text(text='STOP-CANCEL', n=n, command=lambda: dfm.engine.quit_session(
+        symbol_name=symbol_name, quit_mode=QuitMode.CANCEL_ALL))
 
 
 @app.callback(Output('button-reboot-global-session', 'children'), Input('button-reboot-global-session', 'n_clicks'))
 def on_button_click(n):
-    if n is not None:
-        # as first step, perform STOP-PRICE actions
-        symbol = dfm.dashboard_active_symbol
-        symbol_name = symbol.name
-        for session in dfm.sm.active_sessions.values():
-            # session = dfm.sm.active_sessions[symbol_name]
-            session.helpers.quit_particular_session(
-                quit_mode=QuitMode.PLACE_ALL_PENDING,
-                session_id=session.session_id,
-                symbol=session.symbol,
-                cmp=session.cmp,
-                iom=session.iom,
-                cmp_count=session.cmp_count)
-
-        # finish app ans it will cause a gunicorn workers reboot (reset-like app)
-        dfm.sm.reboot_global_session()
-    return 'REBOOT-SESSION'
-
-
-@app.callback(Output('button-new-pt', 'children'), Input('button-new-pt', 'n_clicks'))
-def on_button_click(n):
-    if n:
-        symbol = dfm.dashboard_active_symbol
-        symbol_name = symbol.name
-        dfm.sm.active_sessions[symbol_name].manually_create_new_pt()
-    return 'NEW-PT'
+    # STOP-PRICE actions for all symbols, then the engine is finished
+    return _get_button_text(text='REBOOT-SESSION', n=n, command=lambda: dfm.engine.reboot_global_session())
 
 
-@app.callback(Output('button-increase-cmp', 'children'), Input('button-increase-cmp', 'n_clicks'))
-def on_button_click(n):
-    if n:
-        symbol_name = dfm.dashboard_active_symbol.name
-        dfm.sm.client_manager.on_button_step(symbol_name=symbol_name, step=10.0)
-    return '+ 10.0 €'
+@app.callback(Output('button-new-pt', 'children'), Input('button-new-pt', 'n_clicks'),
+              State('active-symbol', 'data'))
+def on_button_click(n, symbol_name):
+    return _get_button_text(text='NEW-PT', n=n, command=lambda: dfm.engine.create_new_pt(symbol_name=symbol_name))
 
 
-@app.callback(Output('button-decrease-cmp', 'children'), Input('button-decrease-cmp', 'n_clicks'))
-def on_button_click(n):
+@app.callback(Output('button-increase-cmp', 'children'), Input('button-increase-cmp', 'n_clicks'),
+              State('active-symbol', 'data'))
+def on_button_click(n, symbol_name):
+    return _get_button_text(text='+ 10.0 €', n=n, command=lambda: dfm.engine.step_cmp(
+        symbol_name=symbol_name, step=10.0))
+
+
+@app.callback(Output('button-decrease-cmp', 'children'), Input('button-decrease-cmp', 'n_clicks'),
+              State('active-symbol', 'data'))
+def on_button_click(n, symbol_name):
+    return _get_button_text(text='- 10.0 €', n=n, command=lambda: dfm.engine.step_cmp(
+        symbol_name=symbol_name, step=-10.0))
+
+
+def _get_button_text(text: str, n, command: Callable[[], None]) -> str:
+    # the command is run when the button is clicked (n_clicks not None nor 0); with the engine in its own process
+    # and not available, the button shows it until the next click
     if n:
-        symbol_name = dfm.dashboard_active_symbol.name
-        dfm.sm.client_manager.on_button_step(symbol_name=symbol_name, step=-10.0)
-    return '- 10.0 €'
-
-
-# ********** others **********
-@app.callback(
-    Output('new-table', 'children'),
-    Input('update', 'n_intervals')
-)
-def update_table(timer):
-    df = dfm.get_all_orders_df_with_cmp()
-    # sort by price
-    df1 = df.sort_values(by=['price'], ascending=False)
-    # filter by status for each table (monitor-placed & traded)
-    df_pending = df1[df1.status.isin(['monitor', 'active', 'cmp', 'to_be_traded', 'canceled'])]
-    qp = dfm.dashboard_active_symbol.quote_asset().pv()
-    df_pending['price'] = df_pending['price'].map(f'{{:,.{qp}f}}'.format)  # two {{ }} to escape { in f-string
-    df_pending['total'] = df_pending['total'].map(f'{{:,.{qp}f}}'.format)
-
-    return get_pending_html_table(df=df_pending[['pt_id', 'name', 'price', 'amount', 'total', 'status']])
+        try:
+            command()
+        except EngineNotAvailable:
+            return f'{text} (ENGINE NOT AVAILABLE)'
+    return text
+
+
+# ********** orders table **********
+# the table rows are kept in the browser: each refresh only sends the rows changed since the last sequence number
+# applied by this client (see sc_orders_feed.py), or nothing at all if neither the orders nor the cmp have changed
+@app.callback(Output('orders-table', 'columns'),
+              Input('active-symbol', 'data'))
+def update_orders_table_columns(symbol_name):
+    if symbol_name is None:
+        raise PreventUpdate
+    qp = dfm.quote_pv[symbol_name]
+    price_format = Format(precision=qp, scheme=Scheme.fixed, group=Group.yes)
+    return [
+        dict(id='pt_id', name='pt_id'),
+        dict(id='name', name='name'),
+        dict(id='price', name='price', type='numeric', format=price_format),
+        dict(id='amount', name='amount', type='numeric'),
+        dict(id='total', name='total', type='numeric', format=price_format),
+        dict(id='status', name='status')
+    ]
+
+
+@app.callback(Output('orders-feed', 'data'),
+              Input('update', 'n_intervals'),
+              Input('active-symbol', 'data'),
+              State('orders-feed', 'data'))
+def update_orders_feed(value, symbol_name, last_changes):
+    if symbol_name is None:
+        raise PreventUpdate
+    last_changes = last_changes or {}
+    try:
+        changes = dfm.engine.get_orders_table_changes(symbol_name=symbol_name,
+                                                      client_symbol_name=last_changes.get('symbol_name'),
+                                                      since_seq=last_changes.get('seq'))
+    except EngineNotAvailable:
+        # engine run in its own process and not available: the table is kept until it is back
+        raise PreventUpdate
+    if not changes['full'] and not changes['rows'] and not changes['removed'] \
+            and changes['cmp'] == last_changes.get('cmp'):
+        raise PreventUpdate
+    return changes
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace='orders', function_name='merge'),
+    Output('orders-table', 'data'),
+    Input('orders-feed', 'data'),
+    State('orders-table', 'data'))
+
+
+# ********** history charts **********
+@app.callback(Output('history-graph', 'figure'),
+              Input('history-update', 'n_intervals'),
+              Input('history-range', 'value'),
+              Input('active-symbol', 'data'))
+def update_history_graph(value, seconds, symbol_name):
+    # recorded by the engine at each state publication (see sc_time_series.py), no history computed here
+    if symbol_name is None:
+        raise PreventUpdate
+    end = time.time()
+    try:
+        points = dfm.engine.get_history(symbol_name=symbol_name, start=end - seconds, end=end)['points']
+    except EngineNotAvailable:
+        raise PreventUpdate
+    x = [datetime.fromtimestamp(ts) for ts in points['ts']]
+
+    figure = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.04, row_heights=[0.5, 0.3, 0.2])
+    figure.add_trace(go.Scatter(x=x, y=points['cmp_max'], name='max', line=dict(width=0), showlegend=False),
+                     row=1, col=1)
+    figure.add_trace(go.Scatter(x=x, y=points['cmp_min'], name='min', line=dict(width=0), fill='tonexty',
+                                showlegend=False), row=1, col=1)
+    figure.add_trace(go.Scatter(x=x, y=points['cmp'], name='cmp'), row=1, col=1)
+    for field in ['profit_at_cmp', 'consolidated_profit', 'expected_profit_at_cmp']:
+        figure.add_trace(go.Scatter(x=x, y=points[field], name=field), row=2, col=1)
+    for field in ['monitor_orders', 'active_orders', 'isolated_orders']:
+        figure.add_trace(go.Scatter(x=x, y=points[field], name=field, line_shape='hv'), row=3, col=1)
+    figure.update_layout(template='plotly_dark', height=900, margin=dict(l=40, r=20, t=20, b=20),
+                         uirevision=symbol_name)
+    return figure
@@ -1,15 +1,37 @@
 # dash_layout.py
 
-import pandas as pd
 import dash_html_components as html
 import dash_bootstrap_components as dbc
 import dash_core_components as dcc
+import dash_table
 
 print('dash_layout.py')
 
 # with lower values the dashboard does not refresh itself correctly
 K_UPDATE_INTERVAL = 2000.0  # milisecs
 
+# history charts refresh & time ranges (label, seconds)
+K_HISTORY_UPDATE_INTERVAL = 10000.0  # milisecs
+HISTORY_RANGES = [('1h', 3_600), ('1d', 86_400), ('30d', 30 * 86_400)]
+
+# overview table: one row per symbol, then the profits totals by quote asset (see sc_session_manager.py)
+OVERVIEW_COLUMNS = [('symbol', 'symbol'), ('cmp', 'cmp'), ('pt_new', 'NEW'), ('pt_buy', 'BUY'), ('pt_sell', 'SELL'),
+                    ('pt_end', 'END'), ('profit_at_cmp', 'STOP-CMP'), ('consolidated_profit', 'DONE'),
+                    ('base_free', 'base free'), ('quote_free', 'quote free'), ('is_active', 'active')]
+OVERVIEW_TABLE_STYLES = [
+    {'if': {'filter_query': '{is_active} = "OFF"'}, 'color': 'DarkGray'},
+    {'if': {'filter_query': '{symbol} contains "TOTAL"'}, 'color': 'DarkGray', 'backgroundColor': '#262626'}
+]
+
+# orders table rows colors (b1/s1 & sent to the market), the cmp row last
+ORDERS_TABLE_STYLES = [
+    {'if': {'filter_query': '{name} = "b1"'}, 'color': '#008000'},
+    {'if': {'filter_query': '{name} = "s1"'}, 'color': '#f25e43'},
+    {'if': {'filter_query': '{name} = "b1" && {status} = "to_be_traded"'}, 'color': '#196619'},
+    {'if': {'filter_query': '{name} = "s1" && {status} = "to_be_traded"'}, 'color': '#bf4a35'},
+    {'if': {'filter_query': '{status} = "cmp"'}, 'color': 'DarkGray', 'backgroundColor': '#262626'}
+]
+
 
 class DashLayout:
     @staticmethod
@@ -32,6 +54,22 @@ class DashLayout:
                         ]),
                     ]),
                 ]),
+                # all symbols overview (a symbol row click shows that symbol)
+                dbc.Row([
+                    dbc.Col([
+                        dash_table.DataTable(
+                            id='overview-table',
+                            columns=[dict(id=column_id, name=name) for column_id, name in OVERVIEW_COLUMNS],
+                            data=[],
+                            style_as_list_view=True,
+                            style_header={'backgroundColor': 'transparent', 'color': 'grey', 'border': 'none'},
+                            style_cell={'backgroundColor': 'transparent', 'textAlign': 'center', 'fontSize': '20px',
+                                        'border': 'none'},
+                            style_data_conditional=OVERVIEW_TABLE_STYLES
+                        ),
+                    ], xs=12, sm=12, md=12, lg=12, xl=12),
+                ]),
+                html.Br(),
                 # session KPI
                 dbc.Row([
                     dbc.Col([
@@ -329,7 +367,32 @@ class DashLayout:
                 # orders table
                 dbc.Row([
                     dbc.Col([
-                        dbc.Table.from_dataframe(id='new-table', df=pd.DataFrame({'first': ['1', '2']})),
+                        # rows merged (clientside) from the orders feed changes, see dash_callbacks.py
+                        dash_table.DataTable(
+                            id='orders-table',
+                            columns=[],
+                            data=[],
+                            style_as_list_view=True,
+                            style_header={'backgroundColor': 'transparent', 'color': 'grey', 'border': 'none'},
+                            style_cell={'backgroundColor': 'transparent', 'textAlign': 'center', 'fontSize': '30px',
+                                        'border': 'none'},
+                            style_data_conditional=ORDERS_TABLE_STYLES
+                        ),
+                        dcc.Store(id='orders-feed'),
+                    ], xs=12, sm=12, md=12, lg=12, xl=12),
+                ]),
+                html.Br(),
+                # history charts (cmp, profits & orders), filled from the update_history_graph callback
+                dbc.Row([
+                    dbc.Col([
+                        dcc.RadioItems(
+                            id='history-range',
+                            options=[dict(label=label, value=seconds) for label, seconds in HISTORY_RANGES],
+                            value=HISTORY_RANGES[0][1],
+                            labelStyle={'display': 'inline-block', 'marginRight': '20px'}
+                        ),
+                        dcc.Graph(id='history-graph', config={'displayModeBar': False}),
+                        dcc.Interval(id='history-update', n_intervals=0, interval=K_HISTORY_UPDATE_INTERVAL)
                     ], xs=12, sm=12, md=12, lg=12, xl=12),
                 ]),
                 html.Br(), html.Br(), html.Br(),
@@ -360,7 +423,11 @@ class DashLayout:
                                    className='sc-button'),
                     ]),
                 ]),
-                dcc.Interval(id='update', n_intervals=0, interval=K_UPDATE_INTERVAL)
+                dcc.Interval(id='update', n_intervals=0, interval=K_UPDATE_INTERVAL),
+                # active symbol values from the published state (see dash_callbacks.py)
+                dcc.Store(id='dashboard-state'),
+                # symbol shown in this browser tab
+                dcc.Store(id='active-symbol', storage_type='session')
             ],)
         ])
         return layout
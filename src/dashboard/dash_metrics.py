@@ -0,0 +1,172 @@
+# dash_metrics.py
+
+# flask routes added to the dashboard server (with the dashboard basic authentication, see protect_route):
+# - /metrics: published state (fills, pt & orders by status, accounts, alive orders liquidity, queues & tick lag),
+#   latency histograms (including the market api calls) & event counters in prometheus text format
+# - /latency: latency recording state & histograms; POST enabled=1|0 switches the recording at run time
+#   (reset=1 clears the histograms)
+# - /debug/callbacks: dashboard callbacks profile, most cpu consuming first (POST reset=1 clears it), not linked
+#   from the dashboard
+
+import html
+import time
+from typing import Dict, List, Tuple
+
+from flask import request, Response, jsonify
+
+from dashboard.dash_app import app, protect_route
+from dashboard.dash_profiler import callback_profiler
+from sc_events import events
+from sc_latency import latency
+from sc_state_publisher import state_publisher
+
+
+# symbol state values exported as gauges (the rest are counters)
+SYMBOL_GAUGES = ['cmp', 'cmp_count', 'is_active', 'buy_count', 'sell_count', 'isolated_orders_count',
+                 'previous_runs_orders_count', 'consolidated_profit', 'expected_profit', 'placed_pending_orders_count',
+                 'tick_lag']
+SYMBOL_COUNTERS = ['global_cmp_count', 'session_count', 'fills', 'market_orders_count_at_cmp',
+                   'placed_orders_count_at_price']
+
+
+def _get_state_lines(state: Dict) -> List[str]:
+    if not state:
+        return []
+    now = time.time()
+    lines = [f'scorpius_state_age_seconds {now - state["ts"]:.3f}']
+    symbols_state = state['symbols']
+    for metric in SYMBOL_GAUGES + SYMBOL_COUNTERS:
+        metric_type = 'gauge' if metric in SYMBOL_GAUGES else 'counter'
+        name = f'scorpius_{metric}' if metric_type == 'gauge' else f'scorpius_{metric}_total'
+        lines.append(f'# TYPE {name} {metric_type}')
+        for symbol_name, symbol_state in sorted(symbols_state.items()):
+            lines.append(f'{name}{{symbol="{symbol_name}"}} {float(symbol_state[metric]):g}')
+
+    lines.append('# TYPE scorpius_seconds_since_last_tick gauge')
+    for symbol_name, symbol_state in sorted(symbols_state.items()):
+        if symbol_state['last_tick_time'] > 0:
+            lines.append(f'scorpius_seconds_since_last_tick{{symbol="{symbol_name}"}} '
+                         f'{now - symbol_state["last_tick_time"]:.3f}')
+
+    for metric in ['pt_count', 'orders_count']:
+        lines.append(f'# TYPE scorpius_{metric} gauge')
+        for symbol_name, symbol_state in sorted(symbols_state.items()):
+            for status, count in symbol_state[metric].items():
+                lines.append(f'scorpius_{metric}{{symbol="{symbol_name}",status="{status}"}} {count}')
+
+    lines.append('# TYPE scorpius_account gauge')
+    for asset_name, account in sorted(state['accounts'].items()):
+        for balance in ['free', 'locked']:
+            lines.append(f'scorpius_account{{asset="{asset_name}",balance="{balance}"}} {account[balance]:g}')
+
+    # liquidity needed to trade the alive orders of all the sessions at their own price
+    lines.append('# TYPE scorpius_alive_orders_liquidity gauge')
+    for asset_name, liquidity in sorted(state['liquidity'].items()):
+        lines.append(f'scorpius_alive_orders_liquidity{{asset="{asset_name}"}} {liquidity:g}')
+
+    lines.append('# TYPE scorpius_queue_depth gauge')
+    for queue_name, depth in sorted(state['queues'].items()):
+        lines.append(f'scorpius_queue_depth{{queue="{queue_name}"}} {depth}')
+    return lines
+
+
+def _get_summary_lines(name: str, summaries: List[Tuple[str, Dict]]) -> List[str]:
+    # prometheus summary (quantiles, _sum & _count) from histogram summaries, by labels; the max is a gauge of
+    # its own (name_max), a summary has no max series
+    lines = [f'# TYPE {name} summary']
+    for labels, summary in summaries:
+        for key, value in summary.items():
+            if key.startswith('p') and key.endswith('_us'):
+                quantile = float(key[1:-3]) / 100
+                lines.append(f'{name}{{{labels},quantile="{quantile:g}"}} {value:.3f}')
+        lines.append(f'{name}_sum{{{labels}}} {summary["mean_us"] * summary["count"]:.3f}')
+        lines.append(f'{name}_count{{{labels}}} {summary["count"]}')
+    lines.append(f'# TYPE {name}_max gauge')
+    for labels, summary in summaries:
+        lines.append(f'{name}_max{{{labels}}} {summary["max_us"]:.3f}')
+    return lines
+
+
+def _get_latency_lines(summary: Dict[str, Dict[str, Dict]]) -> List[str]:
+    return _get_summary_lines(name='scorpius_latency_us',
+                              summaries=[(f'group="{group}",stage="{stage}"', stage_summary)
+                                         for group, stages in sorted(summary.items())
+                                         for stage, stage_summary in sorted(stages.items())])
+
+
+def _get_events_lines(counters: Dict[str, int]) -> List[str]:
+    lines = ['# TYPE scorpius_events_total counter']
+    for event_type, count in sorted(counters.items()):
+        lines.append(f'scorpius_events_total{{event="{event_type}"}} {count}')
+    return lines
+
+
+def _get_callbacks_lines(summary: Dict[str, Dict]) -> List[str]:
+    lines = []
+    for metric, key, metric_type in [('calls', 'calls', 'counter'), ('prevented', 'prevented', 'counter'),
+                                     ('errors', 'errors', 'counter'), ('cpu_seconds', 'cpu_s', 'counter'),
+                                     ('request_bytes', 'request_bytes', 'counter'),
+                                     ('response_bytes', 'response_bytes', 'counter'),
+                                     ('response_bytes_max', 'max_response_bytes', 'gauge')]:
+        name = f'scorpius_dash_callback_{metric}' + ('_total' if metric_type == 'counter' else '')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for callback, callback_summary in sorted(summary.items()):
+            lines.append(f'{name}{{callback="{callback}"}} {float(callback_summary[key]):g}')
+
+    # function: the callback function only, request: the whole callback request
+    lines += _get_summary_lines(name='scorpius_dash_callback_latency_us',
+                                summaries=[(f'callback="{callback}",scope="{scope}"', callback_summary[scope])
+                                           for callback, callback_summary in sorted(summary.items())
+                                           for scope in ['function', 'request']])
+    return lines
+
+
+@app.server.route('/metrics')
+@protect_route
+def metrics():
+    # only already aggregated data: the session structures are never read here
+    lines = _get_state_lines(state=state_publisher.get_state())
+    lines.append(f'scorpius_latency_enabled {int(latency.enabled)}')
+    lines.append(f'scorpius_stream_subscribers {state_publisher.get_subscribers_count()}')
+    lines += _get_latency_lines(summary=latency.get_summary())
+    lines += _get_events_lines(counters=events.get_counters())
+    lines += _get_callbacks_lines(summary=callback_profiler.get_summary())
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+@app.server.route('/latency', methods=['GET', 'POST'])
+@protect_route
+def latency_toggle():
+    # changes only by POST (form or query values)
+    if request.method == 'POST':
+        enabled = request.values.get('enabled')
+        if enabled is not None:
+            latency.enable(enabled=enabled.lower() in ['1', 'true', 'on'])
+        if request.values.get('reset') in ['1', 'true']:
+            latency.reset()
+    return jsonify(enabled=latency.enabled, latency=latency.get_summary())
+
+
+@app.server.route('/debug/callbacks', methods=['GET', 'POST'])
+@protect_route
+def debug_callbacks():
+    if request.method == 'POST' and request.values.get('reset') in ['1', 'true']:
+        callback_profiler.reset()
+    summary = callback_profiler.get_summary()
+    headers = ['callback', 'function', 'calls', 'prevented', 'errors', 'cpu s', 'p50 ms', 'p99 ms', 'max ms',
+               'request p50 ms', 'request p99 ms', 'mean KB', 'max KB', 'total KB']
+    rows = []
+    for callback, s in sorted(summary.items(), key=lambda item: item[1]['cpu_s'], reverse=True):
+        values = [callback, s['name'], s['calls'], s['prevented'], s['errors'], f'{s["cpu_s"]:.3f}',
+                  f'{s["function"]["p50_us"] / 1000:.2f}', f'{s["function"]["p99_us"] / 1000:.2f}',
+                  f'{s["function"]["max_us"] / 1000:.2f}', f'{s["request"]["p50_us"] / 1000:.2f}',
+                  f'{s["request"]["p99_us"] / 1000:.2f}', f'{s["mean_response_bytes"] / 1024:.1f}',
+                  f'{s["max_response_bytes"] / 1024:.1f}', f'{s["response_bytes"] / 1024:.1f}']
+        rows.append('<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in values) + '</tr>')
+    page = '<html><head><title>callbacks</title></head><body>' \
+           '<table border="1" cellpadding="4" style="border-collapse: collapse; font-family: monospace">' \
+           '<tr>' + ''.join(f'<th>{header}</th>' for header in headers) + '</tr>' \
+           + ''.join(rows) + '</table>' \
+           '<form method="post"><input type="hidden" name="reset" value="1"><input type="submit" value="reset">' \
+           '</form></body></html>'
+    return Response(page, mimetype='text/html')
@@ -0,0 +1,142 @@
+# dash_profiler.py
+
+# dashboard server callbacks profiler, to know how much cpu the dashboard takes from the trading threads:
+# - each callback registered with app.callback (after install) is wrapped to record its calls, latency, cpu time
+#   (of the calling thread) & outcome (updated, prevented, failed)
+# - each callback request (/_dash-update-component) records its whole latency (including the dash json encoding)
+#   and its request & response sizes (before compression)
+# the callbacks are identified by their outputs, like dash does; clientside callbacks are not server callbacks
+# shown at /debug/callbacks & in /metrics (see dash_metrics.py)
+
+import functools
+import threading
+import time
+from typing import Dict, Callable, Tuple
+
+from dash import Dash
+from dash.dependencies import Output
+from dash.exceptions import PreventUpdate
+from flask import g, request, Response
+
+from sc_latency import LatencyHistogram
+
+CALLBACK_REQUEST_PATH = '_dash-update-component'
+
+
+class CallbackStats:
+    def __init__(self, name: str):
+        self.name = name  # function name
+        self.function_latency = LatencyHistogram()
+        self.request_latency = LatencyHistogram()
+        self.cpu_ns = 0
+        self.prevented_count = 0
+        self.errors_count = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.max_response_bytes = 0
+
+    def get_summary(self) -> Dict:
+        requests_count = self.request_latency.count
+        return dict(
+            name=self.name,
+            calls=self.function_latency.count,
+            prevented=self.prevented_count,
+            errors=self.errors_count,
+            cpu_s=self.cpu_ns / 1e9,
+            function=self.function_latency.get_summary(),
+            request=self.request_latency.get_summary(),
+            request_bytes=self.request_bytes,
+            response_bytes=self.response_bytes,
+            mean_response_bytes=self.response_bytes / requests_count if requests_count > 0 else 0.0,
+            max_response_bytes=self.max_response_bytes
+        )
+
+
+class CallbackProfiler:
+    # always on: a few counters & two histogram records per callback call
+    # records from different threads are not locked (a concurrent record might be lost, it is only statistics)
+    def __init__(self):
+        self._stats: Dict[str, CallbackStats] = {}
+        self._lock = threading.Lock()
+
+    def install(self, app: Dash) -> None:
+        # callbacks registered before install are not profiled
+        register_callback = app.callback
+
+        def profiled_callback(*args, **kwargs):
+            key = self._get_key(args=args, kwargs=kwargs)
+            register = register_callback(*args, **kwargs)
+
+            def decorator(f: Callable) -> Callable:
+                return register(self._wrap(key=key, f=f))
+            return decorator
+
+        app.callback = profiled_callback
+        app.server.before_request(self._before_request)
+        app.server.after_request(self._after_request)
+
+    def reset(self) -> None:
+        with self._lock:
+            for key, stats in self._stats.items():
+                self._stats[key] = CallbackStats(name=stats.name)
+
+    def get_summary(self) -> Dict[str, Dict]:
+        # {callback outputs: summary}
+        with self._lock:
+            items = list(self._stats.items())
+        return {key: stats.get_summary() for key, stats in items}
+
+    def _wrap(self, key: str, f: Callable) -> Callable:
+        with self._lock:
+            self._stats[key] = CallbackStats(name=f.__name__)
+
+        @functools.wraps(f)
+        def profiled(*args, **kwargs):
+            start_ns = time.perf_counter_ns()
+            start_cpu_ns = time.thread_time_ns()
+            try:
+                return f(*args, **kwargs)
+            except PreventUpdate:
+                self._stats[key].prevented_count += 1
+                raise
+            except Exception:
+                self._stats[key].errors_count += 1
+                raise
+            finally:
+                stats = self._stats[key]
+                stats.cpu_ns += time.thread_time_ns() - start_cpu_ns
+                stats.function_latency.record(ns=time.perf_counter_ns() - start_ns)
+        return profiled
+
+    @staticmethod
+    def _before_request() -> None:
+        if request.path.endswith(CALLBACK_REQUEST_PATH):
+            g.callback_start_ns = time.perf_counter_ns()
+
+    def _after_request(self, response: Response) -> Response:
+        start_ns = g.get('callback_start_ns')
+        if start_ns is None:
+            return response
+        body = request.get_json(silent=True) or {}
+        stats = self._stats.get(body.get('output'))
+        if stats is not None:
+            stats.request_latency.record(ns=time.perf_counter_ns() - start_ns)
+            stats.request_bytes += request.content_length or 0
+            response_bytes = response.calculate_content_length() or 0
+            stats.response_bytes += response_bytes
+            stats.max_response_bytes = max(stats.max_response_bytes, response_bytes)
+        return response
+
+    @staticmethod
+    def _get_key(args: Tuple, kwargs: Dict) -> str:
+        # same id as the one dash sends in the callback requests: 'id.property' for a single output,
+        # '..id.property...id.property..' for a list of outputs
+        output = kwargs.get('output', args[0] if args else None)
+        if isinstance(output, Output) and not any(isinstance(arg, Output) for arg in args[1:]):
+            return str(output)
+        outputs = output if isinstance(output, (list, tuple)) else [arg for arg in args if isinstance(arg, Output)]
+        return '..' + '...'.join(str(item) for item in outputs) + '..'
+
+
+# single profiler for the dashboard
+callback_profiler = CallbackProfiler()
@@ -0,0 +1,52 @@
+# dash_stream.py
+
+# flask route added to the dashboard server (with the dashboard basic authentication, see protect_route, the
+# browser sends the credentials of the dashboard page):
+# - /stream: server-sent events with the dashboard values of every symbol, the whole values at connection and then
+#   only the changed ones at each state publication; rendered in the browser by assets/state_stream.js, so the
+#   load does not grow with the number of viewers (no server callbacks) and the values arrive as published
+# with push disabled it answers 204 (no content), and the browsers do not reconnect
+
+import json
+import queue
+from typing import Dict
+
+from flask import Response, stream_with_context
+
+from dashboard.dash_app import app, protect_route
+from dashboard.dash_callbacks import dfm
+from sc_state_publisher import state_publisher
+
+# seconds without changes before a comment line is sent (keeps proxies & browsers from closing the connection)
+KEEPALIVE_INTERVAL = 15.0
+
+
+def _get_event(data: Dict) -> str:
+    return f'event: state\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+@app.server.route('/stream')
+@protect_route
+def stream():
+    if not dfm.is_push_enabled:
+        return Response(status=204)
+
+    subscriber = state_publisher.subscribe()
+
+    def get_events():
+        try:
+            yield 'retry: 2000\n\n'
+            yield _get_event(data=state_publisher.get_dashboard_state())
+            while True:
+                try:
+                    changes = subscriber.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                # None: this client was too slow and its changes were dropped
+                yield _get_event(data=state_publisher.get_dashboard_state() if changes is None else changes)
+        finally:
+            state_publisher.unsubscribe(subscriber)
+
+    return Response(stream_with_context(get_events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,123 @@
+# headless.py
+
+# entry point without the dashboard stack (dash, flask, plotly & pandas are not imported), run from src/:
+#   python headless.py --mode generator --symbols BTCEUR,BNBEUR --duration 3600 --stats-interval 10
+# the dashboard can still be attached as an observer of the same session manager with --dashboard
+# with --serve the engine is served to the dashboard run in its own process (main.py with ENGINE remote = True)
+
+import argparse
+import logging
+import os
+import resource
+import threading
+import time
+from datetime import timedelta
+
+from managers.config_manager import ConfigManager
+from sc_logger import XBLogger
+from sc_startup_profiler import startup_profiler
+
+MODES = {
+    'binance': 'CLIENT_MODE_BINANCE',
+    'generator': 'CLIENT_MODE_SIMULATOR_GENERATOR',
+    'manual': 'CLIENT_MODE_SIMULATOR_MANUAL'
+}
+
+log = logging.getLogger('log.headless')
+
+
+def print_stats(sm, start: float) -> None:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'---------- {timedelta(seconds=int(time.time() - start))} '
+          f'sessions: {sm.all_symbols_session_count} max rss: {rss_mb:,.1f} MB ----------')
+    for symbol in sm.symbols:
+        stats = sm.get_symbol_stats(symbol_name=symbol.name)
+        pv = symbol.quote_asset().pv()
+        pt_count = stats['pt_count']
+        print(f'{stats["symbol_name"]:8} cmp: {stats["cmp"]:,.{pv}f} '
+              f'session: #{stats["session_count"]:03d} ({stats["cmp_count"]} cycles) '
+              f'{"ON" if stats["is_active"] else "OFF"} '
+              f'pt: {pt_count["NEW"]}/{pt_count["BUY_TRADED"]}/{pt_count["SELL_TRADED"]}/{pt_count["COMPLETED"]} '
+              f'at cmp: {stats["profit_at_cmp"]:,.{pv}f} '
+              f'done: {stats["consolidated_profit"]:,.{pv}f} '
+              f'actual: {stats["expected_profit_at_cmp"]:,.{pv}f} '
+              f'expected: {stats["expected_profit"]:,.{pv}f} '
+              f'isolated: {stats["isolated_orders_count"]}')
+
+
+def start_dashboard(host: str, port: int) -> None:
+    # imported here, the dashboard stack is only loaded when requested
+    from dashboard.dash_app import app
+    import dashboard.dash_callbacks  # noqa: F401 (callbacks registration)
+    import dashboard.dash_metrics  # noqa: F401 (/metrics & /latency routes)
+    import dashboard.dash_stream  # noqa: F401 (/stream route)
+
+    thread = threading.Thread(target=app.run_server,
+                              kwargs=dict(host=host, port=port, debug=False, use_reloader=False),
+                              daemon=True)
+    thread.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scorpius headless session manager')
+    parser.add_argument('--mode', choices=list(MODES.keys()), default=None,
+                        help='client mode (default: APP_MODE in config_new.ini)')
+    parser.add_argument('--symbols', default=None, help='comma separated symbols (default: config_new.ini)')
+    parser.add_argument('--duration', type=float, default=0.0, help='seconds to run (0: until CTRL-C)')
+    parser.add_argument('--stats-interval', type=float, default=10.0, help='seconds between stats')
+    parser.add_argument('--dashboard', action='store_true', help='attach the dashboard as an observer')
+    parser.add_argument('--serve', action='store_true', help='serve the engine to dashboard processes (ENGINE section)')
+    parser.add_argument('--host', default='127.0.0.1', help='dashboard host')
+    parser.add_argument('--port', type=int, default=8050, help='dashboard port')
+    parser.add_argument('--profile-startup', action='store_true', help='report the time of each startup stage')
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        startup_profiler.enable()
+
+    # command line values take precedence over config_new.ini
+    if args.mode:
+        ConfigManager.set_override(section='APP_MODE', option='client_mode', value=MODES[args.mode])
+    if args.symbols:
+        ConfigManager.set_override(section='BINANCE', option='symbols', value=args.symbols)
+
+    with startup_profiler.stage('logger'):
+        os.makedirs('log', exist_ok=True)
+        XBLogger()
+
+    # imported after the overrides have been set
+    with startup_profiler.stage('import session manager'):
+        from managers.sc_session_manager import SessionManager
+
+    start = time.time()
+    with startup_profiler.stage('session manager init'):
+        sm = SessionManager()
+    print(f'session manager started in {time.time() - start:.3f}"')
+    if startup_profiler.enabled:
+        print(startup_profiler.get_report())
+
+    if args.dashboard:
+        from dashboard.sc_df_manager import DataframeManager
+        DataframeManager.attached_session_manager = sm
+        start_dashboard(host=args.host, port=args.port)
+
+    if args.serve:
+        from managers.sc_engine import EngineCommands
+        from managers.sc_engine_ipc import EngineServer, get_authkey
+        engine_data = sm.cm.get_engine_data()
+        EngineServer(commands=EngineCommands(sm=sm), address=engine_data['address'],
+                     authkey=get_authkey(engine_data=engine_data))
+
+    try:
+        while args.duration == 0.0 or time.time() - start < args.duration:
+            time.sleep(args.stats_interval if args.duration == 0.0
+                       else max(0.0, min(args.stats_interval, args.duration - (time.time() - start))))
+            print_stats(sm=sm, start=start)
+    except KeyboardInterrupt:
+        log.info('headless run interrupted')
+    finally:
+        sm.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,32 @@
 # main.py
 
+import sys
 import logging
-from dashboard.dash_app import app
-import dashboard.dash_callbacks
+from sc_startup_profiler import startup_profiler
+
+# python main.py --profile-startup: report the import & init time of each startup stage
+if '--profile-startup' in sys.argv:
+    startup_profiler.enable()
+
+with startup_profiler.stage('logger'):
+    from sc_logger import XBLogger
+    XBLogger()
+
+with startup_profiler.stage('import dash app (dash, layout)'):
+    from dashboard.dash_app import app
+
+# the session manager is created here, unless the engine runs in its own process (ENGINE remote = True in
+# config_new.ini & python headless.py --serve)
+with startup_profiler.stage('import dash callbacks (session manager)'):
+    import dashboard.dash_callbacks
+    import dashboard.dash_metrics
+    import dashboard.dash_stream
 # from dashboard.sc_df_manager import DataframeManager
-from sc_logger import XBLogger
 
-XBLogger()
-log = logging.getLogger('log')
+log = logging.getLogger('log.main')
+
+if startup_profiler.enabled:
+    print(startup_profiler.get_report())
 
 
 '''
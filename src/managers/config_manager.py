@@ -5,15 +5,24 @@ from typing import List, Dict
 
 
 class ConfigManager:
+    # values set at run time (i.e. from the command line) that take precedence over config.ini
+    _overrides: Dict[str, Dict[str, str]] = {}
+
     def __init__(self, config_file: str):
         # set config
         self._config = configparser.ConfigParser()
         self._config.read(config_file)
+        self._config.read_dict(ConfigManager._overrides)
 
         # create list from config.ini: symbols = [BTCEUR, BNBBTC]
         self._symbol_names = [s.replace(' ', '').replace('[', '').replace(']', '').replace("'", "")
                               for s in self._config.get('BINANCE', 'symbols').split(',')]
 
+    @staticmethod
+    def set_override(section: str, option: str, value) -> None:
+        # it only affects the ConfigManager instances created afterwards
+        ConfigManager._overrides.setdefault(section, {})[option] = str(value)
+
     def get_symbol_names(self) -> List[str]:
         return self._symbol_names
 
@@ -52,3 +61,25 @@ class ConfigManager:
 
     def get_max_allowed_loss_for_liquidity(self, symbol_name: str) -> float:
         return float(self._config.get(symbol_name, 'accepted_loss_to_get_liquidity'))
+
+    def get_snapshot_data(self) -> Dict:
+        # empty if there is no SNAPSHOT section (snapshots disabled)
+        return dict(self._config.items('SNAPSHOT')) if self._config.has_section('SNAPSHOT') else {}
+
+    def get_events_data(self) -> Dict:
+        return dict(self._config.items('EVENTS')) if self._config.has_section('EVENTS') else {}
+
+    def get_latency_data(self) -> Dict:
+        return dict(self._config.items('LATENCY')) if self._config.has_section('LATENCY') else {}
+
+    def get_metrics_data(self) -> Dict:
+        return dict(self._config.items('METRICS')) if self._config.has_section('METRICS') else {}
+
+    def get_dashboard_data(self) -> Dict:
+        return dict(self._config.items('DASHBOARD')) if self._config.has_section('DASHBOARD') else {}
+
+    def get_engine_data(self) -> Dict:
+        return dict(self._config.items('ENGINE')) if self._config.has_section('ENGINE') else {}
+
+    def get_logging_data(self) -> Dict:
+        return dict(self._config.items('LOGGING')) if self._config.has_section('LOGGING') else {}
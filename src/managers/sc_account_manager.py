@@ -2,7 +2,7 @@
 from typing import List, Optional, Dict
 import logging
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_account_manager')
 
 
 class Account:
@@ -3,15 +3,17 @@
 import logging
 import threading
 from enum import Enum
-from typing import Union, List, Dict, Callable, Optional
-from binance.client import Client as BinanceSpotClient
-from binance import ThreadedWebsocketManager
+from typing import Union, List, Dict, Callable, Optional, TYPE_CHECKING
 
 from managers.config_manager import ConfigManager
 from simulator.sc_fake_client import FakeClient
 from simulator.thread_cmp_generator import ThreadCmpGenerator as Generator
 
-log = logging.getLogger('log')
+if TYPE_CHECKING:
+    from binance.client import Client as BinanceSpotClient
+    from binance import ThreadedWebsocketManager
+
+log = logging.getLogger('log.sc_client_manager')
 
 
 class ClientMode(Enum):
@@ -38,7 +40,7 @@ class ClientManager:
         self._client_mode: ClientMode = ClientMode[self._config_manager.get_app_mode()]
 
         # define web sockets property
-        self._twm: ThreadedWebsocketManager
+        self._twm: 'ThreadedWebsocketManager'
         self._generators: List[Generator] = []  # cmp generators
 
         # set client
@@ -80,14 +82,18 @@ class ClientManager:
         if self._user_callback:
             self._user_callback(msg)
 
-    def _setup_client(self, symbols_name: List[str]) -> Union[BinanceSpotClient, FakeClient]:
+    def _setup_client(self, symbols_name: List[str]) -> Union['BinanceSpotClient', FakeClient]:
         # setup self.client depending on the client mode read from config.ini
         # and setup sockets (Binance) or generators (Simulator) for:
         #   - user data (events executionReport & outboundAccountPosition)
         #   - symbol ticker
-        client: Union[BinanceSpotClient, FakeClient]
+        client: Union['BinanceSpotClient', FakeClient]
 
         if self._client_mode == ClientMode.CLIENT_MODE_BINANCE:
+            # python-binance is only loaded in Binance mode
+            from binance.client import Client as BinanceSpotClient
+            from binance import ThreadedWebsocketManager
+
             # setup signature
             api = self._get_api_keys()
             client = BinanceSpotClient(api_key=api['key'], api_secret=api['secret'])
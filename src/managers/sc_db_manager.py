@@ -1,109 +1,302 @@
 # sc_db_manager.py
+import atexit
 import sqlite3
+import threading
+from queue import Queue, Empty
 from sqlite3 import Connection, Error
-from typing import List, Optional
-from binance import enums as k_binance
+from typing import List, Optional, Union
+from basics import sc_binance_enums as k_binance
 import logging
 
 from basics.sc_action import Action
 from basics.sc_order import Order
 from basics.sc_pending_order import PendingOrder
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_db_manager')
 
 
 class DBManager:
     FILE_NAME = 'database.db'
     ACTIONS_TABLE = 'actions'
     PENDING_ORDERS_TABLE = 'orders'
+    # maximum number of queued statements committed in a single transaction
+    MAX_BATCH_SIZE = 256
+    # prepared statements kept by each connection
+    CACHED_STATEMENTS = 64
+    # seconds a read waits for the queued writes to be committed
+    FLUSH_TIMEOUT = 5.0
+
+    ACTIONS_COLUMNS = 'action_id, symbol_name, side, qty, price, timestamp'  # aligned with Action class
+    PENDING_ORDERS_COLUMNS = 'symbol_name, uid, k_side, price, qty, timestamp'  # aligned with PendingOrder class
+
+    # schema: actions keep the insertion order (id) used to pair buy & sell actions
+    CREATE_ACTIONS_TABLE = \
+        f'CREATE TABLE {ACTIONS_TABLE} (id INTEGER PRIMARY KEY AUTOINCREMENT, ' \
+        f'action_id TEXT, symbol_name TEXT, side TEXT, qty REAL, price REAL, timestamp REAL);'
+    CREATE_PENDING_ORDERS_TABLE = \
+        f'CREATE TABLE IF NOT EXISTS {PENDING_ORDERS_TABLE} (' \
+        f'symbol_name TEXT, uid TEXT, k_side TEXT, price REAL, qty REAL, timestamp REAL);'
+    CREATE_INDEXES = [
+        f'CREATE INDEX IF NOT EXISTS {ACTIONS_TABLE}_side ON {ACTIONS_TABLE} (side, id);',
+        f'CREATE INDEX IF NOT EXISTS {ACTIONS_TABLE}_symbol_side ON {ACTIONS_TABLE} (symbol_name, side, id);',
+        f'CREATE INDEX IF NOT EXISTS {ACTIONS_TABLE}_timestamp ON {ACTIONS_TABLE} (timestamp);',
+        f'CREATE UNIQUE INDEX IF NOT EXISTS {PENDING_ORDERS_TABLE}_uid ON {PENDING_ORDERS_TABLE} (uid);',
+        f'CREATE INDEX IF NOT EXISTS {PENDING_ORDERS_TABLE}_symbol_side '
+        f'ON {PENDING_ORDERS_TABLE} (symbol_name, k_side);',
+        f'CREATE INDEX IF NOT EXISTS {PENDING_ORDERS_TABLE}_timestamp ON {PENDING_ORDERS_TABLE} (timestamp);'
+    ]
+
+    # constant sql (the same string is needed to reuse the prepared statement from the connection cache)
+    # optional symbol filter: (? IS NULL OR symbol_name = ?) with the symbol name (or None) twice
+    INSERT_ACTION = f'INSERT INTO {ACTIONS_TABLE} ({ACTIONS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?);'
+    DELETE_ACTION = f'DELETE FROM {ACTIONS_TABLE} WHERE action_id = ?;'
+    SELECT_ALL_ACTIONS = f'SELECT {ACTIONS_COLUMNS} FROM {ACTIONS_TABLE} ORDER BY id;'
+    SELECT_ACTIONS = \
+        f'SELECT {ACTIONS_COLUMNS} FROM {ACTIONS_TABLE} ' \
+        f'WHERE (? IS NULL OR symbol_name = ?) AND timestamp >= ? ORDER BY id;'
+    SELECT_ACTIONS_COUNT = \
+        f'SELECT side, COUNT(*) FROM {ACTIONS_TABLE} WHERE (? IS NULL OR symbol_name = ?) GROUP BY side;'
+    # balance of the actions paired by order of creation (first buy with first sell, ...)
+    SELECT_ACTIONS_BALANCE = \
+        f'WITH ranked AS (' \
+        f'SELECT side, qty * price AS total, ROW_NUMBER() OVER (PARTITION BY side ORDER BY id) AS n ' \
+        f'FROM {ACTIONS_TABLE} WHERE (? IS NULL OR symbol_name = ?)) ' \
+        f'SELECT COALESCE(SUM(sell.total - buy.total), 0.0) FROM ranked AS buy ' \
+        f'JOIN ranked AS sell ON sell.n = buy.n AND sell.side = \'{k_binance.SIDE_SELL}\' ' \
+        f'WHERE buy.side = \'{k_binance.SIDE_BUY}\';'
+    INSERT_PENDING_ORDER = \
+        f'INSERT OR REPLACE INTO {PENDING_ORDERS_TABLE} ({PENDING_ORDERS_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?);'
+    DELETE_PENDING_ORDER = f'DELETE FROM {PENDING_ORDERS_TABLE} WHERE uid = ?;'
+    SELECT_ALL_PENDING_ORDERS = f'SELECT {PENDING_ORDERS_COLUMNS} FROM {PENDING_ORDERS_TABLE};'
+    SELECT_PENDING_ORDER = f'SELECT {PENDING_ORDERS_COLUMNS} FROM {PENDING_ORDERS_TABLE} WHERE uid = ?;'
+    SELECT_PENDING_ORDERS = \
+        f'SELECT {PENDING_ORDERS_COLUMNS} FROM {PENDING_ORDERS_TABLE} ' \
+        f'WHERE symbol_name = ? AND (? IS NULL OR k_side = ?);'
 
     def __init__(self):
-        self.conn = self._create_connection()
-        self.cursor = self.conn.cursor()
+        # connections are never shared between threads:
+        # - the writer thread owns the only connection that writes
+        # - every reader thread (dashboard, sessions) gets its own read-only connection
+        # with WAL, readers work concurrently with the writer (they see the last committed data)
+        self._local = threading.local()
+        self._reader_connections: List[Connection] = []
+        self._reader_connections_lock = threading.Lock()
 
-        # create tables if they do not exist
+        # set database mode & create tables if they do not exist
+        conn = self._create_connection()
         try:
-            # ACTIONS TABLE
-            self.cursor.execute(F'DROP TABLE IF EXISTS {self.ACTIONS_TABLE};')
-            # query = f'CREATE TABLE IF NOT EXISTS {self.ACTIONS_TABLE} '
-            query = f'CREATE TABLE {self.ACTIONS_TABLE} '
-            query += '(action_id TEXT, side TEXT, qty REAL, price REAL);'
-            self.cursor.execute(query)
-            self.conn.commit()
+            # WAL: readers do not block the writer and commits do not need a full fsync (synchronous=NORMAL)
+            conn.execute('PRAGMA journal_mode=WAL;')
+            # ACTIONS TABLE (actions of the current run)
+            conn.execute(F'DROP TABLE IF EXISTS {self.ACTIONS_TABLE};')
+            conn.execute(self.CREATE_ACTIONS_TABLE)
+            conn.commit()
             # PENDING ORDERS TABLE
-            query = f'CREATE TABLE IF NOT EXISTS {self.PENDING_ORDERS_TABLE} '
-            query += '(symbol_name TEXT, uid TEXT, k_side TEXT, price REAL, qty REAL);'
-            self.cursor.execute(query)
-            self.conn.commit()
+            conn.execute(self.CREATE_PENDING_ORDERS_TABLE)
+            self._migrate_pending_orders_table(conn=conn)
+            for query in self.CREATE_INDEXES:
+                conn.execute(query)
+            conn.commit()
         except Error as e:
             log.critical(e)
+        finally:
+            conn.close()
 
-        pass
+        # write-behind: statements are queued and committed in batches by the writer thread,
+        # so the callers (socket & tick threads) never wait for the disk
+        self._write_queue: Queue = Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name='db_writer', daemon=True)
+        self._writer.start()
+        self._is_closed = False
 
-    def __del__(self):
-        log.info('closing cursor and connection to database')
-        self.conn.close()
+        # queued statements are written even if close() is not called
+        atexit.register(self.close)
+
+    def _migrate_pending_orders_table(self, conn: Connection) -> None:
+        # tables created by previous versions have no timestamp and may have repeated uid
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({self.PENDING_ORDERS_TABLE});')]
+        if 'timestamp' not in columns:
+            log.info(f'migrating table {self.PENDING_ORDERS_TABLE}')
+            conn.execute(f'ALTER TABLE {self.PENDING_ORDERS_TABLE} ADD COLUMN timestamp REAL;')
+            conn.execute(f'UPDATE {self.PENDING_ORDERS_TABLE} SET timestamp = strftime(\'%s\', \'now\');')
+            conn.execute(f'DELETE FROM {self.PENDING_ORDERS_TABLE} WHERE rowid NOT IN '
+                         f'(SELECT MAX(rowid) FROM {self.PENDING_ORDERS_TABLE} GROUP BY uid);')
 
     def add_action(self, action: Action):
-        try:
-            # aligned with Action class
-            self.cursor.execute(f'INSERT INTO {self.ACTIONS_TABLE} VALUES (?, ?, ?, ?)', action.get_tuple())
-            self.conn.commit()
-        except Error as e:
-            log.critical(e)
+        self._write(query=self.INSERT_ACTION, params=action.get_tuple())
 
     def add_pending_order(self, pending_order: PendingOrder):
-        try:
-            # aligned with Order class
-            self.cursor.execute(f'INSERT INTO {self.PENDING_ORDERS_TABLE} VALUES (?, ?, ?, ?, ?)',
-                                pending_order.get_tuple_for_pending_order_table())
-            self.conn.commit()
-            log.info(f'added pending order {pending_order}')
-        except Error as e:
-            log.critical(e)
+        self._write(query=self.INSERT_PENDING_ORDER, params=pending_order.get_tuple_for_pending_order_table())
+        log.info(f'added pending order {pending_order}')
 
     def delete_action(self, action: Action):
-        try:
-            query = f'DELETE FROM {self.ACTIONS_TABLE} WHERE action_id = ?'
-            self.cursor.execute(query, (action.action_id,))
-            self.conn.commit()
-        except Error as e:
-            log.critical(e)
+        self._write(query=self.DELETE_ACTION, params=(action.action_id,))
 
     def delete_pending_order(self, pending_order_uid: str):
+        self._write(query=self.DELETE_PENDING_ORDER, params=(pending_order_uid,))
+        log.info(f'deleted pending order wirh uid {pending_order_uid}')
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # barrier: return when all the statements queued before the call have been committed
+        # (False if the timeout expires first or the writer thread is not running)
+        if self._is_closed:
+            return True
+        if not self._writer.is_alive():
+            log.critical('database writer not running, queued statements not committed')
+            return False
+        barrier = threading.Event()
+        self._write_queue.put(barrier)
+        return barrier.wait(timeout=timeout)
+
+    def get_pending_writes_count(self) -> int:
+        # statements queued and not yet committed (approximate, for monitoring)
+        return self._write_queue.qsize()
+
+    def close(self) -> None:
+        # commit the queued statements, stop the writer thread and close all the connections
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._write_queue.put(None)
+        self._writer.join()
+        log.info('closing connections to database')
+        with self._reader_connections_lock:
+            for conn in self._reader_connections:
+                conn.close()
+            self._reader_connections.clear()
+
+    def _write(self, query: str, params: tuple) -> None:
+        if self._is_closed:
+            log.critical(f'database closed, statement not written: {query} {params}')
+        else:
+            self._write_queue.put((query, params))
+
+    def _writer_loop(self) -> None:
+        # own connection, only used by this thread
+        conn = self._create_connection()
+        if conn is None:
+            log.critical('database writer not started: no connection')
+            self._release_barriers()
+            return
         try:
-            query = f'DELETE FROM {self.PENDING_ORDERS_TABLE} WHERE uid = ?'
-            self.cursor.execute(query, (pending_order_uid,))
-            self.conn.commit()
-            log.info(f'deleted pending order wirh uid {pending_order_uid}')
-        except Error as e:
-            log.critical(e)
+            conn.execute('PRAGMA synchronous=NORMAL;')
+            is_running = True
+            while is_running:
+                # wait for the first item, then take the already queued ones
+                batch: List[Union[tuple, threading.Event, None]] = [self._write_queue.get()]
+                while len(batch) < self.MAX_BATCH_SIZE:
+                    try:
+                        batch.append(self._write_queue.get_nowait())
+                    except Empty:
+                        break
 
-    def get_all_actions(self) -> Optional[List[Action]]:
+                statements = [item for item in batch if isinstance(item, tuple)]
+                if len(statements) > 0:
+                    self._execute_batch(conn=conn, statements=statements)
+
+                # release the barriers once all the previous statements are committed
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+                    elif item is None:
+                        is_running = False
+        except Exception as e:
+            log.critical(f'database writer stopped: {type(e).__name__} {e}')
+            self._release_barriers()
+        finally:
+            conn.close()
+
+    def _release_barriers(self) -> None:
+        # writer not running: the waiting flush() calls return (the queued statements are not committed)
+        while True:
+            try:
+                item = self._write_queue.get_nowait()
+            except Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+
+    @staticmethod
+    def _execute_batch(conn: Connection, statements: List[tuple]) -> None:
         try:
-            query = f'SELECT * FROM {self.ACTIONS_TABLE};'
-            rows = self.cursor.execute(query).fetchall()
-            return [self._get_action_from_row(row) for row in rows]
+            # single transaction (one commit) for the whole batch
+            with conn:
+                for query, params in statements:
+                    conn.execute(query, params)
         except Error as e:
+            # the transaction has been rolled back: commit one by one to keep the good statements
             log.critical(e)
-        return None
+            for query, params in statements:
+                try:
+                    with conn:
+                        conn.execute(query, params)
+                except Error as statement_error:
+                    log.critical(f'{statement_error}: {query} {params}')
 
-    def get_all_pending_orders(self) -> Optional[List[PendingOrder]]:
+    def _read(self, query: str, params: tuple = ()) -> Optional[List[tuple]]:
+        # read after the queued writes (or without them if they are not committed in time), from the connection
+        # of the calling thread
+        if not self.flush(timeout=self.FLUSH_TIMEOUT):
+            log.critical('reading without the queued database writes')
         try:
-            query = f'SELECT * FROM {self.PENDING_ORDERS_TABLE};'
-            rows = self.cursor.execute(query).fetchall()
-            return [self._get_pending_order_from_row(row) for row in rows]
+            return self._get_reader_connection().execute(query, params).fetchall()
         except Error as e:
             log.critical(e)
         return None
 
+    def _get_reader_connection(self) -> Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._create_connection(read_only=True)
+            self._local.conn = conn
+            with self._reader_connections_lock:
+                self._reader_connections.append(conn)
+        return conn
+
+    def get_all_actions(self) -> Optional[List[Action]]:
+        rows = self._read(query=self.SELECT_ALL_ACTIONS)
+        return None if rows is None else [self._get_action_from_row(row) for row in rows]
+
+    def get_actions(self, symbol_name: Optional[str] = None, since: float = 0.0) -> Optional[List[Action]]:
+        # actions of all symbols if symbol_name is None, created at timestamp >= since
+        rows = self._read(query=self.SELECT_ACTIONS, params=(symbol_name, symbol_name, since))
+        return None if rows is None else [self._get_action_from_row(row) for row in rows]
+
+    def get_actions_count(self, symbol_name: Optional[str] = None) -> (int, int):
+        # buy & sell actions count (all symbols if symbol_name is None)
+        rows = self._read(query=self.SELECT_ACTIONS_COUNT, params=(symbol_name, symbol_name))
+        count = dict(rows) if rows else {}
+        return count.get(k_binance.SIDE_BUY, 0), count.get(k_binance.SIDE_SELL, 0)
+
+    def get_actions_balance(self, symbol_name: Optional[str] = None) -> (int, int, float):
+        # same values as ChecksManager.get_actions_balance(): buy count, sell count & paired actions balance
+        buy_actions_count, sell_actions_count = self.get_actions_count(symbol_name=symbol_name)
+        rows = self._read(query=self.SELECT_ACTIONS_BALANCE, params=(symbol_name, symbol_name))
+        actions_balance = rows[0][0] if rows else 0.0
+        return buy_actions_count, sell_actions_count, actions_balance
+
+    def get_all_pending_orders(self) -> Optional[List[PendingOrder]]:
+        rows = self._read(query=self.SELECT_ALL_PENDING_ORDERS)
+        return None if rows is None else [self._get_pending_order_from_row(row) for row in rows]
+
+    def get_pending_order(self, uid: str) -> Optional[PendingOrder]:
+        rows = self._read(query=self.SELECT_PENDING_ORDER, params=(uid,))
+        return self._get_pending_order_from_row(rows[0]) if rows else None
+
+    def get_pending_orders(self, symbol_name: str, k_side: Optional[str] = None) -> Optional[List[PendingOrder]]:
+        # pending orders of the symbol (both sides if k_side is None)
+        rows = self._read(query=self.SELECT_PENDING_ORDERS, params=(symbol_name, k_side, k_side))
+        return None if rows is None else [self._get_pending_order_from_row(row) for row in rows]
+
     @staticmethod
     def _get_action_from_row(row: list) -> Action:
         return Action(
             action_id=row[0],
-            side=row[1],
-            qty=row[2],
-            price=row[3]
+            symbol_name=row[1],
+            side=row[2],
+            qty=row[3],
+            price=row[4],
+            timestamp=row[5]
         )
 
     @staticmethod
@@ -113,15 +306,19 @@ class DBManager:
             uid=row[1],
             k_side=row[2],
             price=row[3],
-            qty=row[4]
+            qty=row[4],
+            timestamp=row[5]
         )
 
-    def _create_connection(self) -> Optional[Connection]:
+    def _create_connection(self, read_only=False) -> Optional[Connection]:
+        # check_same_thread=False only to let close() close the connections of the reader threads
         try:
             conn = sqlite3.connect(
-                database=self.FILE_NAME,
+                database=f'file:{self.FILE_NAME}?mode=ro' if read_only else f'file:{self.FILE_NAME}',
                 detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-                check_same_thread=False
+                check_same_thread=False,
+                cached_statements=self.CACHED_STATEMENTS,
+                uri=True
             )
             return conn
         except Error as e:
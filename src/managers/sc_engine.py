@@ -0,0 +1,82 @@
+# sc_engine.py
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from basics.sc_order import OrderStatus, Order
+from basics.sc_perfect_trade import PerfectTradeStatus
+from managers.sc_orders_feed import OrdersFeed
+from managers.sc_session_manager import SessionManager
+from session.sc_helpers import QuitMode
+
+# seconds between orders feed updates of a symbol (the clients showing the same symbol share each update)
+ORDERS_FEED_MIN_INTERVAL = 1.0
+
+
+class EngineCommands:
+    # everything the dashboard asks to the trading engine (symbols, orders table & buttons actions)
+    # called directly when the dashboard runs in the engine process, or through the engine server
+    # (sc_engine_ipc.py) when it runs in its own process
+    def __init__(self, sm: SessionManager):
+        self.sm = sm
+
+        # orders table rows, by symbol
+        self.orders_feeds: Dict[str, OrdersFeed] = {symbol.name: OrdersFeed(symbol_name=symbol.name)
+                                                    for symbol in sm.symbols}
+        self._orders_feeds_update_time: Dict[str, float] = {}
+        self._orders_feeds_lock = threading.Lock()
+
+    def get_symbols_info(self) -> List[Dict]:
+        return [dict(name=symbol.name, quote_pv=symbol.quote_asset().pv()) for symbol in self.sm.symbols]
+
+    def get_orders_table_changes(self, symbol_name: str, client_symbol_name: Optional[str],
+                                 since_seq: Optional[int]) -> Dict:
+        # orders table rows changed since the client last sequence number (all rows if the client was showing
+        # another symbol), with the cmp row values
+        feed = self.orders_feeds[symbol_name]
+        with self._orders_feeds_lock:
+            now = time.time()
+            if now - self._orders_feeds_update_time.get(symbol_name, 0.0) >= ORDERS_FEED_MIN_INTERVAL:
+                self._orders_feeds_update_time[symbol_name] = now
+                feed.update(orders=self._get_all_orders(symbol_name=symbol_name))
+        changes = feed.get_changes(since_seq=since_seq if client_symbol_name == symbol_name else None)
+        changes['cmp'] = self.sm.active_sessions[symbol_name].cmp
+        return changes
+
+    def get_history(self, symbol_name: str, start: float, end: float, max_points: int = 1_000) -> Dict:
+        # history of the symbol published values (see sc_time_series.py)
+        return self.sm.history.get_range(symbol_name=symbol_name, start=start, end=end, max_points=max_points)
+
+    def quit_session(self, symbol_name: str, quit_mode: QuitMode) -> None:
+        session = self.sm.active_sessions[symbol_name]
+        session.helpers.quit_particular_session(
+            quit_mode=quit_mode,
+            session_id=session.session_id,
+            symbol=session.symbol,
+            cmp=session.cmp,
+            iom=session.iom,
+            cmp_count=session.cmp_count)
+
+    def reboot_global_session(self) -> None:
+        # as first step, perform STOP-PRICE actions
+        for symbol_name in list(self.sm.active_sessions.keys()):
+            self.quit_session(symbol_name=symbol_name, quit_mode=QuitMode.PLACE_ALL_PENDING)
+
+        # finish app ans it will cause a gunicorn workers reboot (reset-like app)
+        self.sm.reboot_global_session()
+
+    def create_new_pt(self, symbol_name: str) -> None:
+        self.sm.active_sessions[symbol_name].manually_create_new_pt()
+
+    def step_cmp(self, symbol_name: str, step: float) -> None:
+        self.sm.client_manager.on_button_step(symbol_name=symbol_name, step=step)
+
+    def _get_all_orders(self, symbol_name: str) -> List[Order]:
+        session_orders = self.sm.active_sessions[symbol_name].ptm.get_orders_by_request(
+            orders_status=[OrderStatus.MONITOR, OrderStatus.ACTIVE],
+            pt_status=[PerfectTradeStatus.NEW, PerfectTradeStatus.BUY_TRADED,
+                       PerfectTradeStatus.SELL_TRADED, PerfectTradeStatus.COMPLETED])
+        return session_orders \
+            + self.sm.iom.get_isolated_orders(symbol_name=symbol_name) \
+            + self.sm.iom.get_previous_runs_orders(symbol_name=symbol_name)
@@ -0,0 +1,263 @@
+# sc_engine_ipc.py
+
+import json
+import logging
+import os
+import queue
+import stat
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, Connection
+from typing import Dict, List, Optional, Callable
+
+from managers.sc_engine import EngineCommands
+from session.sc_helpers import QuitMode
+from sc_state_publisher import state_publisher
+
+log = logging.getLogger('log.sc_engine_ipc')
+
+# EngineCommands methods callable through the engine server
+COMMANDS = ['get_symbols_info', 'get_orders_table_changes', 'get_history', 'quit_session', 'reboot_global_session',
+            'create_new_pt', 'step_cmp']
+
+# command arguments sent as json values (enums by name), converted back in the engine process
+ARGUMENT_DECODERS: Dict[str, Callable] = dict(quit_mode=lambda name: QuitMode[name])
+
+# the authkey is taken from this environment variable if set (otherwise from config_new.ini), never a default one
+AUTHKEY_ENV_VAR = 'SCORPIUS_ENGINE_AUTHKEY'
+REJECTED_AUTHKEYS = ['', 'scorpius']
+
+# seconds between connection attempts to the engine server (state thread & dashboard startup)
+RECONNECT_INTERVAL = 2.0
+# seconds a command waits for the engine answer
+REQUEST_TIMEOUT = 10.0
+# messages larger than this are refused (the published state of every symbol is the largest one)
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class EngineNotAvailable(Exception):
+    pass
+
+
+def get_authkey(engine_data: Dict) -> str:
+    authkey = os.environ.get(AUTHKEY_ENV_VAR, engine_data.get('authkey', ''))
+    if authkey in REJECTED_AUTHKEYS:
+        raise Exception(f'engine authkey not set: set {AUTHKEY_ENV_VAR} (or authkey in the ENGINE section) '
+                        f'to a private value')
+    return authkey
+
+
+def check_socket_directory(address: str, create: bool) -> None:
+    # the socket is in a directory only accessible by this user (created by the engine process), so no other local
+    # user can connect to the engine or put its own socket in its place
+    directory = os.path.dirname(os.path.abspath(address))
+    if create and not os.path.lexists(directory):
+        os.makedirs(directory, mode=0o700)
+    try:
+        directory_stat = os.lstat(directory)
+    except FileNotFoundError:
+        raise EngineNotAvailable(f'engine socket directory {directory} does not exist')
+    if not stat.S_ISDIR(directory_stat.st_mode) or directory_stat.st_uid != os.getuid() \
+            or stat.S_IMODE(directory_stat.st_mode) & 0o077:
+        raise Exception(f'engine socket directory {directory} must be a directory owned by this user with mode 0700')
+
+
+def send_message(connection: Connection, message) -> None:
+    # only json data through the socket (never pickled objects)
+    connection.send_bytes(json.dumps(message, separators=(',', ':')).encode())
+
+
+def receive_message(connection: Connection):
+    return json.loads(connection.recv_bytes(maxlength=MAX_MESSAGE_BYTES))
+
+
+class EngineServer:
+    # runs in the engine process (headless.py --serve): the dashboard processes (EngineProxy) connect through a
+    # local socket (authenticated by authkey, json messages)
+    # - command connections: [command, kwargs] requests answered with ['ok', result] or ['error', message]
+    # - state connections ('subscribe_state' request): each published state is sent as it is published
+    def __init__(self, commands: EngineCommands, address: str, authkey: str):
+        self.commands = commands
+
+        check_socket_directory(address=address, create=True)
+        # a socket left by a previous run would make the listener fail (only removed if it is one of this user)
+        if os.path.lexists(address):
+            address_stat = os.lstat(address)
+            if not stat.S_ISSOCK(address_stat.st_mode) or address_stat.st_uid != os.getuid():
+                raise Exception(f'engine address {address} in use by a file that is not a socket of this user')
+            os.remove(address)
+        self._listener = Listener(address=address, family='AF_UNIX', authkey=authkey.encode())
+        # the served dashboards need the dashboard values in the published state
+        state_publisher.attach_dashboard()
+
+        thread = threading.Thread(target=self._accept_connections, daemon=True)
+        thread.start()
+        log.info(f'engine server listening at {address}')
+
+    def _accept_connections(self) -> None:
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError) as e:
+                log.warning(f'engine server connection refused: {e}')
+                continue
+            thread = threading.Thread(target=self._serve, args=(connection,), daemon=True)
+            thread.start()
+
+    def _serve(self, connection: Connection) -> None:
+        try:
+            while True:
+                command, kwargs = receive_message(connection=connection)
+                if command == 'subscribe_state':
+                    self._send_states(connection=connection)
+                elif command not in COMMANDS or not isinstance(kwargs, dict):
+                    send_message(connection=connection, message=['error', f'unknown command {command}'])
+                else:
+                    try:
+                        kwargs = {name: ARGUMENT_DECODERS[name](value) if name in ARGUMENT_DECODERS.keys() else value
+                                  for name, value in kwargs.items()}
+                        result = getattr(self.commands, command)(**kwargs)
+                        send_message(connection=connection, message=['ok', result])
+                    except Exception as e:
+                        log.critical(f'engine command {command} failed: {e}')
+                        send_message(connection=connection, message=['error', f'{type(e).__name__}: {e}'])
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            # disconnected, or a message that is not a [command, kwargs] json list
+            if not isinstance(e, EOFError):
+                log.warning(f'engine connection closed: {e}')
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _send_states(connection: Connection) -> None:
+        # woken up by the dashboard changes, or at the publication interval for the other values
+        subscriber = state_publisher.subscribe()
+        last_ts = None
+        try:
+            while True:
+                try:
+                    subscriber.get(timeout=state_publisher.interval)
+                except queue.Empty:
+                    pass
+                state = state_publisher.get_state()
+                if state and state['ts'] != last_ts:
+                    last_ts = state['ts']
+                    send_message(connection=connection, message=state)
+        finally:
+            state_publisher.unsubscribe(subscriber)
+
+
+class EngineProxy:
+    # runs in the dashboard process: same methods as EngineCommands, executed in the engine process, and the
+    # engine published state published again in this process (so the dashboard, /stream & /metrics read it as if
+    # the engine were local)
+    # the commands never wait for the engine: with the engine down they fail at once (EngineNotAvailable), only
+    # the state thread waits for it
+    def __init__(self, address: str, authkey: str):
+        self._address = address
+        self._authkey = authkey.encode()
+        self._connection: Optional[Connection] = None
+        self._lock = threading.Lock()
+
+        thread = threading.Thread(target=self._receive_states, daemon=True)
+        thread.start()
+
+    def get_symbols_info(self) -> List[Dict]:
+        return self._request(command='get_symbols_info')
+
+    def get_orders_table_changes(self, symbol_name: str, client_symbol_name: Optional[str],
+                                 since_seq: Optional[int]) -> Dict:
+        return self._request(command='get_orders_table_changes', symbol_name=symbol_name,
+                             client_symbol_name=client_symbol_name, since_seq=since_seq)
+
+    def get_history(self, symbol_name: str, start: float, end: float, max_points: int = 1_000) -> Dict:
+        return self._request(command='get_history', symbol_name=symbol_name, start=start, end=end,
+                             max_points=max_points)
+
+    def quit_session(self, symbol_name: str, quit_mode: QuitMode) -> None:
+        self._request(command='quit_session', symbol_name=symbol_name, quit_mode=quit_mode.name)
+
+    def reboot_global_session(self) -> None:
+        self._request(command='reboot_global_session')
+
+    def create_new_pt(self, symbol_name: str) -> None:
+        self._request(command='create_new_pt', symbol_name=symbol_name)
+
+    def step_cmp(self, symbol_name: str, step: float) -> None:
+        self._request(command='step_cmp', symbol_name=symbol_name, step=step)
+
+    def wait_available(self, timeout: float) -> None:
+        # dashboard startup: wait (up to timeout) for the engine server
+        end = time.time() + timeout
+        while True:
+            try:
+                self._connect().close()
+                return
+            except EngineNotAvailable:
+                if time.time() > end:
+                    raise
+                time.sleep(RECONNECT_INTERVAL)
+
+    def _connect(self) -> Connection:
+        # single connection attempt
+        try:
+            check_socket_directory(address=self._address, create=False)
+            return Client(address=self._address, family='AF_UNIX', authkey=self._authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise EngineNotAvailable(f'engine server not available at {self._address}: {e}')
+
+    def _request(self, command: str, **kwargs):
+        # one request at a time through the command connection (reconnected if the engine has been restarted)
+        with self._lock:
+            self._send(message=[command, kwargs])
+            try:
+                if not self._connection.poll(REQUEST_TIMEOUT):
+                    raise OSError(f'no answer in {REQUEST_TIMEOUT}"')
+                status, result = receive_message(connection=self._connection)
+            except (OSError, EOFError, ValueError) as e:
+                self._connection.close()
+                self._connection = None
+                raise EngineNotAvailable(f'engine {command} not done, connection lost: {e}')
+        if status == 'error':
+            raise Exception(f'engine {command} failed: {result}')
+        return result
+
+    def _send(self, message: List) -> None:
+        # the cached connection may be to an engine that has been restarted: the send fails (nothing has reached
+        # the engine), so the message is sent again once through a new connection
+        if self._connection is not None:
+            try:
+                send_message(connection=self._connection, message=message)
+                return
+            except OSError:
+                self._connection.close()
+                self._connection = None
+        self._connection = self._connect()
+        try:
+            send_message(connection=self._connection, message=message)
+        except OSError as e:
+            self._connection.close()
+            self._connection = None
+            raise EngineNotAvailable(f'engine {message[0]} not sent: {e}')
+
+    def _receive_states(self) -> None:
+        # waits for the engine server as long as needed (only this thread)
+        while True:
+            try:
+                connection = self._connect()
+            except EngineNotAvailable as e:
+                log.warning(e)
+                time.sleep(RECONNECT_INTERVAL)
+                continue
+            try:
+                send_message(connection=connection, message=['subscribe_state', {}])
+                while True:
+                    state = receive_message(connection=connection)
+                    if not isinstance(state, dict) or 'symbols' not in state.keys():
+                        raise ValueError('not a published state')
+                    state_publisher.publish(state=state)
+            except (OSError, EOFError, ValueError) as e:
+                log.warning(f'engine state connection lost: {e}')
+            finally:
+                connection.close()
@@ -1,13 +1,17 @@
 # sc_isolated_manager.py
 
-from typing import List, Optional
+from typing import List, Optional, Dict
 import logging
-from binance import enums as k_binance
+from basics import sc_binance_enums as k_binance
 from basics.sc_order import Order, OrderStatus
+from basics.sc_perfect_trade import PerfectTrade
 from basics.sc_action import Action
+from basics.sc_actions_balance import ActionsBalance
 from basics.sc_asset import Asset
+from basics.sc_symbol import Symbol
+from sc_events import events
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_isolated_manager')
 
 
 class IsolatedOrdersManager:
@@ -15,14 +19,25 @@ class IsolatedOrdersManager:
         self.isolated_orders: List[Order] = []
         self.previous_runs_orders: List[Order] = []
         self.canceled_orders: List[Order] = []
-        self.actions: List[Action] = []
+
+        # per symbol views of the isolated & previous runs orders, rebuilt (in a single pass) only after the lists
+        # have changed: the lists must be changed through the methods below (or followed by a _changed() call)
+        self._version = 0
+        self._views_version = -1
+        self._isolated_by_symbol: Dict[str, List[Order]] = {}
+        self._previous_runs_by_symbol: Dict[str, List[Order]] = {}
+
+        # actions from all symbols and by symbol
+        self._actions_balance = ActionsBalance()
+        self._symbols_actions_balance: Dict[str, ActionsBalance] = {}
 
     def check_previous_runs_orders(self, uid: str) -> None:
         # remove from list and, therefore, from dashboard
-        print(f'check previous runs orders for uid {uid}')
+        events.emit('previous_runs_order_check', uid=uid)
         for order in self.previous_runs_orders:
             if order.uid == uid:
                 self.previous_runs_orders.remove(order)
+                self._changed()
 
     def check_isolated_orders(self, uid: str, traded_price: float) -> (float, float):
         # check if an order from previous sessions have been traded,
@@ -33,14 +48,15 @@ class IsolatedOrdersManager:
         consolidated = 0.0
         expected = 0.0
 
-        log.info(f'checking isolated order with uid {uid}')
-        log.info('********** existing isolated orders:')
-        for order in self.isolated_orders:
-            log.info(f'isolated order: {order} [{order.symbol.name}]')
+        log.info('checking isolated order with uid %s', uid)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug('********** existing isolated orders:')
+            for order in self.isolated_orders:
+                log.debug('isolated order: %s [%s]', order, order.symbol.name)
 
         for order in self.isolated_orders:
             if order.uid == uid:
-                log.info(f'traded isolated order from previous sessions {order}')
+                log.info('traded isolated order from previous sessions %s', order)
 
                 is_known_order = True
                 original_price = order.price
@@ -70,11 +86,12 @@ class IsolatedOrdersManager:
                         consolidated = expected - diff
 
                 # update global profit values
-                log.info(f'total to add to consolidate: {consolidated:,.2f}')
-                log.info(f'total to subtract from expected: {expected:,.2f}')
+                log.info('total to add to consolidate: %.2f', consolidated)
+                log.info('total to subtract from expected: %.2f', expected)
 
                 # remove order from list
                 self.isolated_orders.remove(order)
+                self._changed()
 
                 break
 
@@ -83,8 +100,7 @@ class IsolatedOrdersManager:
     def get_expected_profit_at_cmp(self, cmp: float, symbol_name: str) -> float:
         return sum(
             [order.pt.get_actual_profit_at_cmp(cmp=cmp)
-             for order in self.isolated_orders
-             if order.symbol.name == symbol_name]
+             for order in self.get_isolated_orders(symbol_name=symbol_name)]
         )
 
     def get_further_order(self, cmp: float, k_side: k_binance, min_distance: float) -> Optional[Order]:
@@ -125,23 +141,110 @@ class IsolatedOrdersManager:
     #                 return candidate_order
     #     return None
 
+    def add_action(self, action: Action) -> None:
+        self._actions_balance.add(action=action)
+        if action.symbol_name not in self._symbols_actions_balance.keys():
+            self._symbols_actions_balance[action.symbol_name] = ActionsBalance()
+        self._symbols_actions_balance[action.symbol_name].add(action=action)
+
+    def get_actions_balance(self, symbol_name: Optional[str] = None) -> (int, int, float):
+        # buy actions count, sell actions count & paired actions balance (all symbols if symbol_name is None)
+        if symbol_name is None:
+            return self._actions_balance.get()
+        elif symbol_name in self._symbols_actions_balance.keys():
+            return self._symbols_actions_balance[symbol_name].get()
+        return 0, 0, 0.0
+
     def log(self):
         for order in self.isolated_orders:
             log.info(f'isolated order: {order}')
 
+    def add_isolated_order(self, order: Order) -> None:
+        self.isolated_orders.append(order)
+        self._changed()
+
+    def add_previous_runs_order(self, order: Order) -> None:
+        self.previous_runs_orders.append(order)
+        self._changed()
+
+    def clear_previous_runs_orders(self) -> None:
+        self.previous_runs_orders.clear()
+        self._changed()
+
+    def _changed(self) -> None:
+        self._version += 1
+
+    def _update_views(self) -> None:
+        version = self._version
+        if version == self._views_version:
+            return
+        isolated_by_symbol: Dict[str, List[Order]] = {}
+        for order in self.isolated_orders:
+            isolated_by_symbol.setdefault(order.symbol.name, []).append(order)
+        previous_runs_by_symbol: Dict[str, List[Order]] = {}
+        for order in self.previous_runs_orders:
+            previous_runs_by_symbol.setdefault(order.symbol.name, []).append(order)
+        # views replaced before the version, so that a reader never gets old views as current
+        self._isolated_by_symbol = isolated_by_symbol
+        self._previous_runs_by_symbol = previous_runs_by_symbol
+        self._views_version = version
+
     def get_isolated_orders(self, symbol_name: str) -> List[Order]:
-        return [order for order in self.isolated_orders if order.symbol.name == symbol_name]
+        # shared view: not to be modified by the caller
+        self._update_views()
+        return self._isolated_by_symbol.get(symbol_name, [])
 
     def get_previous_runs_orders(self, symbol_name: str) -> List[Order]:
-        return [order for order in self.previous_runs_orders if order.symbol.name == symbol_name]
+        # shared view: not to be modified by the caller
+        self._update_views()
+        return self._previous_runs_by_symbol.get(symbol_name, [])
 
     def get_all_orders(self, symbol_name: str) -> List[Order]:
         return self.get_isolated_orders(symbol_name=symbol_name) \
                + self.get_previous_runs_orders(symbol_name=symbol_name)
 
     def canceled_order(self, uid: str):
-        log.info(f'canceled order with uid {uid}')
+        log.info('canceled order with uid %s', uid)
         for order in self.isolated_orders + self.previous_runs_orders:
             if order.uid == uid:
-                order.status = OrderStatus.CANCELED
+                order.set_status(status=OrderStatus.CANCELED)
+
+
+    def get_snapshot(self) -> Dict:
+        # orders are saved within its pt, so that the sibling order (needed for profit) is also restored
+        orders = self.isolated_orders + self.previous_runs_orders
+        pts = list({id(order.pt): order.pt for order in orders}.values())
+        return dict(
+            orders=[order.to_snapshot() for pt in pts for order in pt.orders],
+            perfect_trades=[pt.to_snapshot() for pt in pts],
+            isolated_uids=[order.uid for order in self.isolated_orders],
+            previous_runs_uids=[order.uid for order in self.previous_runs_orders],
+            canceled_uids=[order.uid for order in self.canceled_orders],
+            actions_balance=self._actions_balance.to_snapshot(),
+            symbols_actions_balance={symbol_name: actions_balance.to_snapshot()
+                                     for symbol_name, actions_balance in self._symbols_actions_balance.items()}
+        )
 
+    def restore_snapshot(self, snapshot: Dict, symbols: Dict[str, Symbol]) -> None:
+        # orders from symbols not managed in this run are discarded
+        orders: Dict[str, Order] = {}
+        for order_snapshot in snapshot['orders']:
+            if order_snapshot['symbol_name'] in symbols.keys():
+                orders[order_snapshot['uid']] = \
+                    Order.from_snapshot(snapshot=order_snapshot, symbol=symbols[order_snapshot['symbol_name']])
+            else:
+                log.info(f'order with uid {order_snapshot["uid"]} in symbol {order_snapshot["symbol_name"]} '
+                         f'not restored')
+        # set pt & sibling order references
+        for pt_snapshot in snapshot['perfect_trades']:
+            if all([uid in orders.keys() for uid in pt_snapshot['orders_uid']]):
+                PerfectTrade.from_snapshot(snapshot=pt_snapshot, orders=orders)
+
+        self.isolated_orders = [orders[uid] for uid in snapshot['isolated_uids'] if uid in orders.keys()]
+        self.previous_runs_orders = [orders[uid] for uid in snapshot['previous_runs_uids'] if uid in orders.keys()]
+        self.canceled_orders = [orders[uid] for uid in snapshot['canceled_uids'] if uid in orders.keys()]
+        self._changed()
+        self._actions_balance = ActionsBalance.from_snapshot(snapshot=snapshot['actions_balance'])
+        self._symbols_actions_balance = {
+            symbol_name: ActionsBalance.from_snapshot(snapshot=actions_balance_snapshot)
+            for symbol_name, actions_balance_snapshot in snapshot['symbols_actions_balance'].items()}
@@ -0,0 +1,82 @@
+# sc_orders_feed.py
+
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+from basics.sc_order import Order, OrderStatus
+
+# orders shown in the orders table
+TABLE_ORDER_STATUS = [OrderStatus.MONITOR, OrderStatus.ACTIVE, OrderStatus.TO_BE_TRADED, OrderStatus.CANCELED]
+
+# changes kept for the clients refreshing incrementally (older clients get the whole table)
+MAX_CHANGES = 10_000
+
+
+class OrdersFeed:
+    # rows of the orders table of one symbol, a row is only rebuilt when its order version has changed
+    # each change (new, changed or removed row) gets a sequence number, so that every client (browser) only
+    # receives the changes after the last sequence number it has applied
+    def __init__(self, symbol_name: str):
+        self.symbol_name = symbol_name
+        self.seq = 0
+        self._rows: Dict[str, Dict] = {}
+        self._versions: Dict[str, int] = {}
+        self._changes_seq: List[int] = []
+        self._changes_uid: List[str] = []
+        self._lock = threading.Lock()
+
+    def update(self, orders: List[Order]) -> None:
+        with self._lock:
+            alive_uids = set()
+            for order in orders:
+                if order.status not in TABLE_ORDER_STATUS:
+                    continue
+                uid = order.uid
+                alive_uids.add(uid)
+                if self._versions.get(uid) != order.version:
+                    self._versions[uid] = order.version
+                    self._rows[uid] = self._get_row(order=order)
+                    self._add_change(uid=uid)
+
+            for uid in [uid for uid in self._rows.keys() if uid not in alive_uids]:
+                del self._rows[uid]
+                del self._versions[uid]
+                self._add_change(uid=uid)
+
+    def get_changes(self, since_seq: Optional[int]) -> Dict:
+        # rows changed & uids removed after since_seq (all rows if the client has nothing or is too old)
+        with self._lock:
+            first_seq = self._changes_seq[0] if self._changes_seq else self.seq + 1
+            if since_seq is None or since_seq > self.seq or since_seq + 1 < first_seq:
+                return dict(symbol_name=self.symbol_name, seq=self.seq, full=True,
+                            rows=list(self._rows.values()), removed=[])
+
+            changed_uids = set(self._changes_uid[bisect_right(self._changes_seq, since_seq):])
+            return dict(
+                symbol_name=self.symbol_name,
+                seq=self.seq,
+                full=False,
+                rows=[self._rows[uid] for uid in changed_uids if uid in self._rows.keys()],
+                removed=[uid for uid in changed_uids if uid not in self._rows.keys()]
+            )
+
+    def _add_change(self, uid: str) -> None:
+        self.seq += 1
+        self._changes_seq.append(self.seq)
+        self._changes_uid.append(uid)
+        if len(self._changes_seq) > MAX_CHANGES:
+            del self._changes_seq[:MAX_CHANGES // 2]
+            del self._changes_uid[:MAX_CHANGES // 2]
+
+    @staticmethod
+    def _get_row(order: Order) -> Dict:
+        return dict(
+            id=order.uid,
+            pt_id=order.pt.id,
+            name=order.name,
+            price=order.price,
+            amount=order.amount,
+            total=order.get_total_at_cmp(cmp=order.price, signed=False, with_commission=False),
+            status=order.status.name.lower()
+        )
@@ -1,9 +1,10 @@
 # sc_session_manager.py
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 import logging
 import os
 import signal
+import time
 
 from managers.config_manager import ConfigManager
 from managers.sc_db_manager import DBManager
@@ -13,13 +14,25 @@ from market.sc_market_api_out import MarketAPIOut
 from market.sc_market_sockets_in import MarketSocketsIn
 from managers.sc_account_manager import Account, AccountManager
 from managers.sc_isolated_manager import IsolatedOrdersManager
+from basics import sc_binance_enums as k_binance
 from basics.sc_symbol import Symbol, Asset
 from basics.sc_order import Order, OrderStatus
 from basics.sc_pending_order import PendingOrder
-from basics.sc_perfect_trade import PerfectTrade
+from basics.sc_perfect_trade import PerfectTrade, PerfectTradeStatus
 from managers.sc_client_manager import ClientManager
+from managers.sc_snapshot_manager import SnapshotManager
+from managers.sc_time_series import TimeSeriesStore
+from sc_startup_profiler import startup_profiler
+from sc_events import events
+from sc_latency import latency
+from sc_state_publisher import state_publisher
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_session_manager')
+
+# snapshot sections format: increase it whenever a section changes, snapshots of other versions are not restored
+SNAPSHOT_VERSION = 2
+# seconds the reboot waits for the last checkpoint to be written
+SNAPSHOT_FLUSH_TIMEOUT = 5.0
 
 
 class SessionManager:
@@ -30,53 +43,227 @@ class SessionManager:
         self.all_symbols_session_count = 0
 
         # MANAGERS
-        self.dbm = DBManager()
-        self.iom = IsolatedOrdersManager()
-        self.cm = ConfigManager(config_file='config_new.ini')
-
-        self.market_sockets_in = MarketSocketsIn(
-            order_traded_callback=self._order_traded_callback,
-            account_balance_callback=self._account_balance_callback,
-            symbol_ticker_callback=self._symbol_ticker_callback,
-            update_previous_callback=self._update_previous_callback,
-            order_canceled_callback=self._order_canceled_callback
-        )
+        with startup_profiler.stage('config & database'):
+            self.dbm = DBManager()
+            self.iom = IsolatedOrdersManager()
+            self.cm = ConfigManager(config_file='config_new.ini')
+            events.set_limits(events_data=self.cm.get_events_data())
+            latency.enable(enabled=self.cm.get_latency_data().get('enabled', 'False') == 'True')
+            state_publisher.set_interval(interval=float(self.cm.get_metrics_data().get('interval', 1.0)))
+
+        # saved state for warm restart (empty if snapshots are disabled or there is no journal)
+        with startup_profiler.stage('snapshot load'):
+            self.snapshot_manager = self._get_snapshot_manager()
+            snapshot = self._load_snapshot()
+
+        with startup_profiler.stage('client'):
+            self.market_sockets_in = MarketSocketsIn(
+                order_traded_callback=self._order_traded_callback,
+                account_balance_callback=self._account_balance_callback,
+                symbol_ticker_callback=self._symbol_ticker_callback,
+                update_previous_callback=self._update_previous_callback,
+                order_canceled_callback=self._order_canceled_callback
+            )
 
-        self.client_manager = ClientManager(
-            symbol_ticker_callback=self.market_sockets_in.binance_symbol_ticker_callback,
-            user_callback=self.market_sockets_in.binance_user_socket_callback
-        )
-        self.market_api_out = MarketAPIOut(client=self.client_manager.client,
-                                           hot_reconnect_callback=self.client_manager.hot_reconnect)
+            self.client_manager = ClientManager(
+                symbol_ticker_callback=self.market_sockets_in.binance_symbol_ticker_callback,
+                user_callback=self.market_sockets_in.binance_user_socket_callback
+            )
+            self.market_api_out = MarketAPIOut(client=self.client_manager.client,
+                                               hot_reconnect_callback=self.client_manager.hot_reconnect)
 
         # session will be started within start_session method
         self.active_sessions: Dict[str, Optional[Session]] = {}
         self.terminated_sessions: Dict[str, Dict] = {}
         self.session_count: Dict[str, int] = {}
 
+        # monitoring: orders traded & time of the last tick, by symbol (since the app start)
+        self.fills_count: Dict[str, int] = {}
+        self.last_tick_time: Dict[str, float] = {}
+
+        # history of the published values, for the dashboard charts
+        self.history = TimeSeriesStore()
+        # [min, max] cmp of the ticks received since the last publication, by symbol (the history cmp range)
+        self.ticks_cmp_range: Dict[str, List[float]] = {}
+
         # DATA: get list of symbols info from config.ini & market
-        self.symbols = self._get_symbols()
-        [log.info(symbol.name) for symbol in self.symbols]
+        with startup_profiler.stage('symbol info'):
+            self.symbols = self._get_symbols()
+            [log.info(symbol.name) for symbol in self.symbols]
 
         # get initial accounts to create the balance manager (all own accounts managed in Binance)
-        accounts = self.market_api_out.get_account_info()
-        self.am = AccountManager(accounts=accounts)
+        with startup_profiler.stage('account fetch'):
+            accounts = self.market_api_out.get_account_info()
+            self.am = AccountManager(accounts=accounts)
 
         # start first sessions
+        with startup_profiler.stage('session creation'):
+            for symbol in self.symbols:
+                self._init_global_data(symbol=symbol)
+                self.session_count[symbol.name] = 0
+            if snapshot and not self._restore_snapshot(snapshot=snapshot):
+                snapshot = {}
+            for symbol in self.symbols:
+                if symbol.name not in self.active_sessions.keys():
+                    self.active_sessions[symbol.name] = self.start_new_session(symbol=symbol)
+
+        with startup_profiler.stage('sockets'):
+            self.client_manager.start_sockets()
+
+        # get orders placed in previous app runs and append them to previous runs orders list
+        # (after a warm restart the restored orders are checked against Binance instead)
+        with startup_profiler.stage('previous runs orders'):
+            if not snapshot:
+                self._get_previous_orders()
+            elif self.cm.get_app_mode() == 'CLIENT_MODE_BINANCE':
+                self._reconcile_restored_orders()
+            else:
+                self._place_restored_orders()
+
+    def _get_snapshot_manager(self) -> Optional[SnapshotManager]:
+        snapshot_data = self.cm.get_snapshot_data()
+        if snapshot_data.get('enabled', 'False') != 'True':
+            return None
+        return SnapshotManager(
+            file_name=snapshot_data.get('file_name', 'snapshot.jsonl'),
+            interval=float(snapshot_data.get('interval', 5.0)),
+            compact_lines=int(snapshot_data.get('compact_lines', 500))
+        )
+
+    def _load_snapshot(self) -> Dict:
+        if not self.snapshot_manager:
+            return {}
+        snapshot = self.snapshot_manager.load()
+        if not snapshot:
+            return {}
+        # a snapshot is only valid for the same format & client mode (i.e. simulator orders are not in Binance)
+        manager_snapshot = snapshot.get('session_manager', {})
+        if manager_snapshot.get('version') != SNAPSHOT_VERSION:
+            log.warning(f'snapshot version {manager_snapshot.get("version")} not restored '
+                        f'(version {SNAPSHOT_VERSION} expected)')
+            self.snapshot_manager.discard()
+            return {}
+        if manager_snapshot.get('client_mode') != self.cm.get_app_mode():
+            log.info('snapshot from another client mode not restored')
+            self.snapshot_manager.discard()
+            return {}
+        return snapshot
+
+    def _get_snapshot_sections(self) -> Dict[str, Dict]:
+        sections = dict(
+            session_manager=dict(
+                version=SNAPSHOT_VERSION,
+                client_mode=self.cm.get_app_mode(),
+                all_symbols_session_count=self.all_symbols_session_count,
+                session_count=self.session_count,
+                terminated_sessions=self.terminated_sessions
+            ),
+            isolated_orders_manager=self.iom.get_snapshot()
+        )
+        for symbol_name, session in self.active_sessions.items():
+            sections[f'session_{symbol_name}'] = session.get_snapshot()
+        return sections
+
+    def save_snapshot(self) -> None:
+        # the sections are built here (consistent with the current tick) & written by the snapshot writer thread
+        if self.snapshot_manager:
+            try:
+                self.snapshot_manager.checkpoint(sections=self._get_snapshot_sections())
+            except Exception as e:
+                log.critical(f'snapshot not saved: {e}')
+
+    def _restore_snapshot(self, snapshot: Dict) -> bool:
+        # warm restart: counters, global data, isolated orders & active sessions as they were saved
+        # if the snapshot can not be restored, everything restored is undone and the app starts cold
+        try:
+            self._restore_snapshot_sections(snapshot=snapshot)
+            return True
+        except Exception as e:
+            log.critical(f'snapshot not restored, cold start: {type(e).__name__} {e}')
+            self.snapshot_manager.discard()
+            self.all_symbols_session_count = 0
+            for symbol in self.symbols:
+                self._init_global_data(symbol=symbol)
+                self.session_count[symbol.name] = 0
+            self.iom = IsolatedOrdersManager()
+            self.active_sessions.clear()
+            return False
+
+    def _restore_snapshot_sections(self, snapshot: Dict) -> None:
+        manager_snapshot = snapshot['session_manager']
+        self.all_symbols_session_count = manager_snapshot['all_symbols_session_count']
         for symbol in self.symbols:
-            self._init_global_data(symbol=symbol)
-            self.session_count[symbol.name] = 0
-            self.active_sessions[symbol.name] = self.start_new_session(symbol=symbol)
+            if symbol.name in manager_snapshot['session_count'].keys():
+                self.session_count[symbol.name] = manager_snapshot['session_count'][symbol.name]
+                self.terminated_sessions[symbol.name] = manager_snapshot['terminated_sessions'][symbol.name]
 
-        self.client_manager.start_sockets()
+        self.iom.restore_snapshot(snapshot=snapshot['isolated_orders_manager'],
+                                  symbols={symbol.name: symbol for symbol in self.symbols})
 
-        # get orders placed in previous app runs and append them to previous runs orders list
+        for symbol in self.symbols:
+            session_snapshot = snapshot.get(f'session_{symbol.name}')
+            if session_snapshot:
+                session = self._create_session(symbol=symbol, session_id=session_snapshot['session_id'])
+                session.restore_snapshot(snapshot=session_snapshot)
+                self.active_sessions[symbol.name] = session
+                print(f'******** {symbol.name} SESSION RESTORED: {session.session_id}********')
+                log.info(f'******** {symbol.name} SESSION RESTORED: {session.session_id} '
+                         f'at cycle {session.cmp_count} with {len(session.ptm.perfect_trades)} pt ********')
+
+    def _place_restored_orders(self) -> None:
+        # the simulated market starts empty and at the initial cmp:
+        # resume it at the restored cmp and place again the restored orders that were waiting to be traded
+        for symbol_name, session in self.active_sessions.items():
+            self.client_manager.client.cmp[symbol_name] = session.cmp
+        for order in self.iom.isolated_orders + self.iom.previous_runs_orders:
+            if order.status == OrderStatus.TO_BE_TRADED:
+                try:
+                    self.market_api_out.place_limit_order(order=order)
+                except Exception as e:
+                    log.critical(f'restored order {order} not placed: {e}')
+
+    def _reconcile_restored_orders(self) -> None:
+        # the restored orders placed in Binance that are no longer open were traded or canceled while the app was
+        # stopped (or after the last checkpoint): applied as if the socket events had been received
+        open_orders = self.market_api_out.get_open_orders()
+        if open_orders is None:
+            log.critical('restored orders not reconciled: open orders not available')
+            return
+        open_uids = {order['clientOrderId'] for order in open_orders}
+        placed_orders = [order for order in self.iom.isolated_orders if order.status == OrderStatus.TO_BE_TRADED]
+        for session in self.active_sessions.values():
+            placed_orders += session.ptm.get_orders_by_request(
+                orders_status=[OrderStatus.TO_BE_TRADED],
+                pt_status=[PerfectTradeStatus.NEW, PerfectTradeStatus.BUY_TRADED, PerfectTradeStatus.SELL_TRADED])
+        for order in placed_orders:
+            if order.uid in open_uids:
+                continue
+            symbol_name = order.symbol.name
+            msg = self.market_api_out.get_order(symbol_name=symbol_name, uid=order.uid)
+            if msg is None:
+                log.critical(f'restored order {order} not reconciled: order not available')
+            elif msg['status'] == 'FILLED':
+                executed_qty = float(msg['executedQty'])
+                price = float(msg['cummulativeQuoteQty']) / executed_qty if executed_qty > 0 else float(msg['price'])
+                log.info(f'restored order {order} traded while stopped at {price}')
+                self._order_traded_callback(
+                    symbol_name=symbol_name,
+                    uid=order.uid,
+                    price=price,
+                    bnb_commission=self.market_api_out.get_order_bnb_commission(symbol_name=symbol_name,
+                                                                                binance_id=msg['orderId']))
+            elif msg['status'] in ['CANCELED', 'EXPIRED', 'REJECTED']:
+                log.info(f'restored order {order} {msg["status"]} while stopped')
+                self._order_canceled_callback(symbol_name=symbol_name, uid=order.uid, k_side=order.k_side,
+                                              price=order.price, qty=order.amount)
+
+        # open orders placed after the last checkpoint (or outside the app), as in a cold start
         self._get_previous_orders()
 
     def _get_previous_orders(self):
         # clear list
         if len(self.iom.previous_runs_orders) > 0:
-            self.iom.previous_runs_orders.clear()
+            self.iom.clear_previous_runs_orders()
 
         # get al uid in isolated orders (used later)
         isolated_uids = [order.uid for order in self.iom.isolated_orders]
@@ -104,7 +291,7 @@ class SessionManager:
                         name='b1' if order['side'] == 'BUY' else 's1'
                     )
                     open_order.pt = PerfectTrade(pt_id='*', orders=[open_order, open_order])
-                    self.iom.previous_runs_orders.append(open_order)
+                    self.iom.add_previous_runs_order(order=open_order)
                 else:
                     log.info(f'order with uid {order_uid} already in isolated orders')
             else:
@@ -156,9 +343,24 @@ class SessionManager:
         # depending on symbol name, send the last price to the right session
         if symbol_name in self.active_sessions.keys():
             self.active_sessions[symbol_name].symbol_ticker_callback(cmp=cmp)
+        self.last_tick_time[symbol_name] = time.time()
+        cmp_range = self.ticks_cmp_range.get(symbol_name)
+        if cmp_range is None:
+            self.ticks_cmp_range[symbol_name] = [cmp, cmp]
+        elif cmp < cmp_range[0]:
+            cmp_range[0] = cmp
+        elif cmp > cmp_range[1]:
+            cmp_range[1] = cmp
+
+        if self.snapshot_manager and self.snapshot_manager.is_checkpoint_due():
+            self.save_snapshot()
+
+        if state_publisher.is_publish_due():
+            self.publish_state()
 
     def _order_traded_callback(self, symbol_name: str, uid: str, price: float, bnb_commission: float) -> None:
         # depending on symbol name, send the traded order data to the right session
+        self.fills_count[symbol_name] = self.fills_count.get(symbol_name, 0) + 1
         if symbol_name in self.active_sessions.keys():
             self.active_sessions[symbol_name].order_traded_callback(
                 uid=uid,
@@ -214,7 +416,22 @@ class SessionManager:
     def start_new_session(self, symbol: Symbol) -> Session:
         session_id = f'SESSION{self.all_symbols_session_count + 1:03d}' \
                      f'{symbol.name}{datetime.now().strftime("%m%d%H%M")}'
-        session = Session(
+        session = self._create_session(symbol=symbol, session_id=session_id)
+
+        # update counter for all symbols
+        self.all_symbols_session_count += 1
+
+        # update counter for current symbol
+        self.session_count[symbol.name] += 1
+
+        # info
+        events.emit('new_session_started', audit=True, symbol=symbol.name, session_id=session_id,
+                    session_count=self.session_count[symbol.name])
+
+        return session
+
+    def _create_session(self, symbol: Symbol, session_id: str) -> Session:
+        return Session(
             symbol=symbol,
             session_id=session_id,
             isolated_orders_manager=self.iom,
@@ -227,21 +444,271 @@ class SessionManager:
             consolidated_profit=self.terminated_sessions[symbol.name]['global_consolidated_profit']
         )
 
-        # update counter for all symbols
-        self.all_symbols_session_count += 1
-
-        # update counter for current symbol
-        self.session_count[symbol.name] += 1
-
-        # info
-        print(f'******** {symbol.name} NEW SESSION STARTED: {session_id}********')
-        log.info(f'******** {symbol.name} NEW SESSION STARTED: {session_id}********')
+    def stop(self) -> None:
+        # stop sockets (Binance) or generators (simulator), used when the app is not stopped by a signal
+        self.client_manager.stop()
+        # last checkpoint (written before the journal is closed)
+        self.save_snapshot()
+        if self.snapshot_manager:
+            self.snapshot_manager.close()
+        # commit the queued database writes
+        self.dbm.close()
+        log.info('********** SESSION MANAGER STOPPED **********')
+
+    def get_symbol_stats(self, symbol_name: str) -> Dict:
+        # summary of the symbol state (used by the headless runner)
+        session = self.active_sessions[symbol_name]
+        terminated = self.terminated_sessions[symbol_name]
+        cmp = session.cmp
+        pt_count = {status.name: 0 for status in PerfectTradeStatus}
+        for pt in session.ptm.perfect_trades:
+            pt_count[pt.status.name] += 1
+        return dict(
+            symbol_name=symbol_name,
+            session_id=session.session_id,
+            session_count=self.session_count[symbol_name],
+            cmp=cmp,
+            cmp_count=session.cmp_count,
+            global_cmp_count=terminated['global_cmp_count'] + session.cmp_count,
+            is_active=session.is_active,
+            pt_count=pt_count,
+            profit_at_cmp=session.ptm.get_total_actual_profit_at_cmp(cmp=cmp),
+            consolidated_profit=terminated['global_consolidated_profit'],
+            expected_profit=terminated['global_expected_profit'],
+            expected_profit_at_cmp=self.iom.get_expected_profit_at_cmp(cmp=cmp, symbol_name=symbol_name),
+            isolated_orders_count=len(self.iom.get_isolated_orders(symbol_name=symbol_name))
+        )
 
-        return session
+    def publish_state(self) -> None:
+        # pre-aggregated state for the /metrics endpoint & the dashboard (built in the tick thread)
+        try:
+            state = self._get_state()
+            state_publisher.publish(state=state)
+            self._add_history(state=state)
+        except Exception as e:
+            log.critical(f'state not published: {e}')
+
+    def _add_history(self, state: Dict) -> None:
+        for symbol_name, symbol_state in state['symbols'].items():
+            # cmp range of the ticks since the last publication, started again with the next tick (a tick of
+            # another symbol thread at the same time may be left out, only the chart band is affected)
+            cmp_min, cmp_max = self.ticks_cmp_range.pop(symbol_name, None) or [symbol_state['cmp']] * 2
+            self.history.add(symbol_name=symbol_name, ts=state['ts'], values=dict(
+                cmp=symbol_state['cmp'],
+                cmp_min=cmp_min,
+                cmp_max=cmp_max,
+                profit_at_cmp=symbol_state['profit_at_cmp'],
+                consolidated_profit=symbol_state['consolidated_profit'],
+                expected_profit_at_cmp=symbol_state['expected_profit_at_cmp'],
+                monitor_orders=symbol_state['orders_count'][OrderStatus.MONITOR.name],
+                active_orders=symbol_state['orders_count'][OrderStatus.ACTIVE.name],
+                isolated_orders=symbol_state['isolated_orders_count']
+            ))
+
+    def _get_state(self) -> Dict:
+        # the formatted dashboard values are only built when a dashboard (or a /stream subscriber) is attached
+        is_dashboard_needed = state_publisher.is_dashboard_needed()
+        alive_liquidity = self._get_alive_liquidity()
+        symbols_state = {}
+        for symbol_name, session in self.active_sessions.items():
+            terminated = self.terminated_sessions[symbol_name]
+            pt_count = {status.name: 0 for status in PerfectTradeStatus}
+            orders_count = {status.name: 0 for status in OrderStatus}
+            for pt in session.ptm.perfect_trades:
+                pt_count[pt.status.name] += 1
+                for order in pt.orders:
+                    orders_count[order.status.name] += 1
+            symbol_state = dict(
+                cmp=session.cmp,
+                cmp_count=session.cmp_count,
+                global_cmp_count=terminated['global_cmp_count'] + session.cmp_count,
+                session_count=self.session_count[symbol_name],
+                is_active=session.is_active,
+                fills=self.fills_count.get(symbol_name, 0),
+                buy_count=session.buy_count,
+                sell_count=session.sell_count,
+                pt_count=pt_count,
+                orders_count=orders_count,
+                isolated_orders_count=len(self.iom.get_isolated_orders(symbol_name=symbol_name)),
+                previous_runs_orders_count=len(self.iom.get_previous_runs_orders(symbol_name=symbol_name)),
+                consolidated_profit=terminated['global_consolidated_profit'],
+                expected_profit=terminated['global_expected_profit'],
+                market_orders_count_at_cmp=terminated['global_market_orders_count_at_cmp'],
+                placed_orders_count_at_price=terminated['global_placed_orders_count_at_price'],
+                placed_pending_orders_count=terminated['global_placed_pending_orders_count'],
+                last_tick_time=self.last_tick_time.get(symbol_name, 0.0),
+                tick_lag=self.market_sockets_in.tick_lag.get(symbol_name, 0.0),
+                profit_at_cmp=session.ptm.get_total_actual_profit_at_cmp(cmp=session.cmp),
+                expected_profit_at_cmp=self.iom.get_expected_profit_at_cmp(cmp=session.cmp, symbol_name=symbol_name)
+            )
+            if is_dashboard_needed:
+                symbol_state['dashboard'] = self._get_dashboard_state(symbol=session.symbol, session=session,
+                                                                      symbol_state=symbol_state,
+                                                                      alive_liquidity=alive_liquidity)
+            symbols_state[symbol_name] = symbol_state
+        state = dict(
+            symbols=symbols_state,
+            accounts={name: dict(free=account.free, locked=account.locked)
+                      for name, account in self.am.accounts.items()},
+            liquidity=alive_liquidity,
+            queues=dict(db_pending_writes=self.dbm.get_pending_writes_count())
+        )
+        if is_dashboard_needed:
+            state['overview'] = self._get_overview(symbols_state=symbols_state)
+        return state
+
+    def _get_alive_liquidity(self) -> Dict[str, float]:
+        # liquidity needed for the alive orders of all the sessions, by asset name (one pass over the sessions,
+        # the same values as get_liquidity_for_alive_orders for each asset)
+        alive_liquidity = {}
+        for session in self.active_sessions.values():
+            quote_asset_needed, base_asset_needed = session.ptm.get_symbol_liquidity_needed()
+            for asset, needed in [(session.symbol.quote_asset(), quote_asset_needed),
+                                  (session.symbol.base_asset(), base_asset_needed)]:
+                alive_liquidity[asset.name()] = alive_liquidity.get(asset.name(), 0.0) + needed
+        return alive_liquidity
+
+    def _get_dashboard_state(self, symbol: Symbol, session: Session, symbol_state: Dict,
+                             alive_liquidity: Dict[str, float]) -> Dict[str, str]:
+        # dashboard values already formatted, by layout element id (the dashboard only copies them)
+        pt_count = symbol_state['pt_count']
+        symbol_name = symbol.name
+        terminated = self.terminated_sessions[symbol_name]
+        cmp = session.cmp
+        gap = session.gap
+        base_asset = symbol.base_asset()
+        quote_asset = symbol.quote_asset()
+        bp = base_asset.pv()
+        qp = quote_asset.pv()
+        state = {}
+
+        # first line data
+        state['neb'] = f'n: {session.P_NET_QUOTE_BALANCE:,.2f} {quote_asset.name()}'
+        state['qty'] = f'q: {session.P_QUANTITY:,.4f} {base_asset.name()}'
+        state['target'] = f't: {session.checks_manager.P_TARGET_TOTAL_NET_PROFIT:,.2f} {quote_asset.name()}'
+        state['max-negative-profit-allowed'] = f'({session.checks_manager.P_MAX_NEGATIVE_PROFIT_ALLOWED:,.2f})'
+
+        # session data
+        state['session-count'] = f'#{self.session_count[symbol_name]:03d}'
+        state['session-cycle-count'] = f'{timedelta(seconds=session.cmp_count)}'
+        state['pt-new'] = f'{pt_count[PerfectTradeStatus.NEW.name]}'
+        state['pt-buy'] = f'{pt_count[PerfectTradeStatus.BUY_TRADED.name]}'
+        state['pt-sell'] = f'{pt_count[PerfectTradeStatus.SELL_TRADED.name]}'
+        state['pt-end'] = f'{pt_count[PerfectTradeStatus.COMPLETED.name]}'
+        session_orders = session.ptm.get_orders_by_request(
+            orders_status=[OrderStatus.MONITOR, OrderStatus.ACTIVE],
+            pt_status=[PerfectTradeStatus.NEW, PerfectTradeStatus.BUY_TRADED,
+                       PerfectTradeStatus.SELL_TRADED, PerfectTradeStatus.COMPLETED])
+        state.update(self._get_gap_state(prefix='pt', orders=session_orders, session=session, cmp=cmp, gap=gap))
+
+        cycles_to_new_pt = session.cycles_count_for_inactivity - session.cycles_from_last_trade
+        cycles_to_new_pt = 0.0 if cycles_to_new_pt < 0 else cycles_to_new_pt
+        state['actual-profit'] = f'{symbol_state["profit_at_cmp"]:,.{qp}f}'
+        state['stop-price-profit'] = f'{session.ptm.get_stop_price_profit(cmp=cmp):,.{qp}f}'
+        state['ntc'] = f'{session.checks_manager.base_negative_try_count} - ' \
+                       f'{session.checks_manager.quote_negative_try_count}'
+        state['time-to-next-try'] = f'{timedelta(seconds=cycles_to_new_pt)}'
+        state['is-active'] = 'ON' if session.is_active else 'OFF'
+
+        # global data
+        isolated_orders = self.iom.get_isolated_orders(symbol_name=symbol_name)
+        isolated_buy_count = len([order for order in isolated_orders if order.k_side == k_binance.SIDE_BUY])
+        isolated_sell_count = len([order for order in isolated_orders if order.k_side == k_binance.SIDE_SELL])
+        state['global-cycle-count'] = f'{timedelta(seconds=terminated["global_cmp_count"] + session.cmp_count)}'
+        state['isol-orders-placed'] = f'{terminated["global_placed_orders_count_at_price"]}'
+        state['isol-orders-pending'] = f'{isolated_buy_count + isolated_sell_count}'
+        state['isol-orders-pending-buy'] = f'{isolated_buy_count}'
+        state['isol-orders-pending-sell'] = f'{isolated_sell_count}'
+        all_orders = session_orders + isolated_orders + self.iom.get_previous_runs_orders(symbol_name=symbol_name)
+        state.update(self._get_gap_state(prefix='is', orders=all_orders, session=session, cmp=cmp, gap=gap))
+
+        consolidated = terminated['global_consolidated_profit']
+        buy_actions_count, sell_actions_count, actions_balance = session.checks_manager.get_actions_balance()
+        canceled_buy_count = len([order for order in self.iom.canceled_orders if order.k_side == k_binance.SIDE_BUY])
+        canceled_sell_count = len([order for order in self.iom.canceled_orders
+                                   if order.k_side == k_binance.SIDE_SELL])
+        state['consolidated-profit'] = f'{consolidated:,.{qp}f}'
+        state['expected-profit-at-cmp'] = f'{symbol_state["expected_profit_at_cmp"]:,.{qp}f}'
+        state['expected-profit'] = f'{terminated["global_expected_profit"]:,.{qp}f}'
+        state['actions-info'] = f'{buy_actions_count}/{sell_actions_count} {actions_balance:,.2f}'
+        state['actions-rate'] = f'{consolidated / (buy_actions_count + 1):,.0f} / ' \
+                                f'{consolidated / (sell_actions_count + 1):,.0f}'
+        state['canceled-count'] = f'{canceled_buy_count} / {canceled_sell_count}'
+
+        # symbol & accounts data
+        state['symbol'] = symbol_name
+        state['cmp-max'] = f'{session.max_cmp:,.{qp}f}'
+        state['cmp'] = f'{cmp:,.{qp}f}'
+        state['cmp-min'] = f'{session.min_cmp:,.{qp}f}'
+        for prefix, asset, pv in [('base-asset', base_asset, bp), ('quote-asset', quote_asset, qp),
+                                  ('bnb', Asset(name='BNB', pv=6), 6)]:
+            account = self.am.get_account(asset.name())
+            alive = alive_liquidity.get(asset.name(), 0.0)
+            if prefix != 'bnb':
+                state[prefix] = asset.name()
+            state[f'{prefix}-locked'] = f'{account.locked:,.{pv}f}'
+            state[f'{prefix}-alive'] = f'{alive:,.{pv}f}'
+            state[f'{prefix}-free'] = f'{account.free - alive:,.{pv}f}'
+            state[f'{prefix}-total'] = f'{account.get_total():,.{pv}f}'
+
+        # alert message
+        bnb_liquidity = self.am.get_account('BNB').free
+        state['alert-msg'] = f'BNB LIQUIDITY ALERT {bnb_liquidity:,.6f}' if bnb_liquidity < 1.0 else ''
+        return state
+
+    def _get_overview(self, symbols_state: Dict) -> List[Dict[str, str]]:
+        # dashboard overview table: one row per symbol with its key values (already formatted in the dashboard
+        # values), then the profits total by quote asset
+        rows = []
+        totals = {}
+        for symbol_name, symbol_state in symbols_state.items():
+            values = symbol_state['dashboard']
+            rows.append(dict(
+                symbol=symbol_name,
+                cmp=values['cmp'],
+                pt_new=values['pt-new'],
+                pt_buy=values['pt-buy'],
+                pt_sell=values['pt-sell'],
+                pt_end=values['pt-end'],
+                profit_at_cmp=values['actual-profit'],
+                consolidated_profit=values['consolidated-profit'],
+                base_free=f'{values["base-asset-free"]} {values["base-asset"]}',
+                quote_free=f'{values["quote-asset-free"]} {values["quote-asset"]}',
+                is_active=values['is-active']
+            ))
+            quote_asset = self.active_sessions[symbol_name].symbol.quote_asset()
+            total = totals.setdefault(quote_asset.name(), dict(qp=quote_asset.pv(), profit_at_cmp=0.0,
+                                                               consolidated_profit=0.0))
+            total['profit_at_cmp'] += symbol_state['profit_at_cmp']
+            total['consolidated_profit'] += symbol_state['consolidated_profit']
+        for quote_asset_name, total in totals.items():
+            qp = total['qp']
+            rows.append(dict(
+                symbol=f'TOTAL {quote_asset_name}',
+                profit_at_cmp=f'{total["profit_at_cmp"]:,.{qp}f}',
+                consolidated_profit=f'{total["consolidated_profit"]:,.{qp}f}'
+            ))
+        return rows
+
+    @staticmethod
+    def _get_gap_state(prefix: str, orders: List[Order], session: Session, cmp: float, gap: float) -> Dict[str, str]:
+        # span, depth & momentum (total, buy & sell) of the orders
+        state = {}
+        for name, f in [('span', session.helpers.get_gap_span_from_list),
+                        ('depth', session.helpers.get_gap_depth_from_list),
+                        ('mtm', session.helpers.get_gap_momentum_from_list)]:
+            buy_value, sell_value = f(orders=orders, cmp=cmp, gap=gap)
+            state[f'{prefix}-{name}'] = f'{buy_value + sell_value:.2f}'
+            state[f'{prefix}-{name}-buy'] = f'{buy_value:.2f}'
+            state[f'{prefix}-{name}-sell'] = f'{sell_value:.2f}'
+        return state
 
     def reboot_global_session(self):
         # stop market (binance sockets)
         self.client_manager.stop()
+        self.save_snapshot()
+        if self.snapshot_manager:
+            self.snapshot_manager.flush(timeout=SNAPSHOT_FLUSH_TIMEOUT)
         log.critical("********** SESSION TERMINATED FROM BUTTON ********")
 
         # send SIGINT to own app (identical to CTRL-C)
@@ -0,0 +1,194 @@
+# sc_snapshot_manager.py
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from queue import Queue, Empty
+from typing import Dict, List, Optional, Union
+
+log = logging.getLogger('log.sc_snapshot_manager')
+
+
+class SnapshotManager:
+    # crash-consistent snapshots of the app state (sessions, pt, isolated orders & counters) in a journal
+    # - the journal is an append-only file of json lines, each line is a checkpoint with only the sections
+    #   that have changed since the previous one, written at once and synced to disk (fsync)
+    # - the state is rebuilt applying the checkpoints in order (the last value of each section wins);
+    #   a torn last line (crash while writing) is discarded, so the state is always a complete checkpoint
+    # - when the journal is longer than compact_lines it is replaced by a single checkpoint with the
+    #   current state, written to a temporary file first and then renamed (atomic)
+    # write-behind: the caller (tick thread) only builds the sections; the json encoding, the comparison with the
+    # previous checkpoint, the write & the fsync are done by the writer thread
+    def __init__(self, file_name: str, interval: float, compact_lines: int):
+        self.file_name = file_name
+        self.interval = interval
+        self.compact_lines = compact_lines
+
+        # json of the last value written for each section (used to detect changes), only used by the writer thread
+        # once the first checkpoint is queued (load & discard are called before)
+        self._sections: Dict[str, str] = {}
+        self._seq = 0
+        self._lines_count = 0
+        self._last_checkpoint = time.time()
+        self._file = None
+
+        self._write_queue: Queue = Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name='snapshot_writer', daemon=True)
+        self._writer.start()
+        self._is_closed = False
+
+        # queued checkpoints are written even if close() is not called
+        atexit.register(self.close)
+
+    def load(self) -> Dict[str, Dict]:
+        # return the state saved in the journal (empty if there is no journal)
+        state: Dict[str, Dict] = {}
+        if os.path.isfile(self.file_name):
+            valid_size = 0
+            with open(self.file_name, 'rb') as f:
+                for line in f:
+                    try:
+                        checkpoint = json.loads(line)
+                        sections = checkpoint['sections']
+                    except (ValueError, KeyError, TypeError):
+                        log.warning(f'snapshot journal {self.file_name} truncated at checkpoint {self._seq + 1}')
+                        break
+                    state.update(sections)
+                    self._seq = checkpoint['seq']
+                    self._lines_count += 1
+                    valid_size += len(line)
+
+            # remove the torn checkpoint, otherwise the next one would be appended to it
+            if valid_size < os.path.getsize(self.file_name):
+                with open(self.file_name, 'r+b') as f:
+                    f.truncate(valid_size)
+
+            self._sections = {name: self._dumps(section) for name, section in state.items()}
+            log.info(f'snapshot restored from {self.file_name}: checkpoint {self._seq} '
+                     f'({self._lines_count} lines, {len(state)} sections)')
+
+        self._file = open(self.file_name, 'a')
+        return state
+
+    def discard(self) -> None:
+        # the loaded state is not used: the next checkpoint will save every section
+        self._sections.clear()
+
+    def is_checkpoint_due(self) -> bool:
+        return time.time() - self._last_checkpoint > self.interval
+
+    def checkpoint(self, sections: Dict[str, Dict]) -> None:
+        # queue the sections for the writer thread, which appends the ones that have changed
+        # the sections must not be modified after the call (they are encoded later, in the writer thread)
+        self._last_checkpoint = time.time()
+        if self._is_closed:
+            log.critical('snapshot journal closed, checkpoint not written')
+        else:
+            self._write_queue.put(sections)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        # barrier: return when all the checkpoints queued before the call have been written
+        # (False if the timeout expires first or the writer thread is not running)
+        if self._is_closed:
+            return True
+        if not self._writer.is_alive():
+            log.critical('snapshot writer not running, queued checkpoints not written')
+            return False
+        barrier = threading.Event()
+        self._write_queue.put(barrier)
+        return barrier.wait(timeout=timeout)
+
+    def close(self) -> None:
+        # write the queued checkpoints, stop the writer thread and close the journal
+        if self._is_closed:
+            return
+        self._is_closed = True
+        self._write_queue.put(None)
+        self._writer.join()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _writer_loop(self) -> None:
+        is_running = True
+        while is_running:
+            # wait for the first item, then take the already queued ones
+            batch: List[Union[Dict, threading.Event, None]] = [self._write_queue.get()]
+            while True:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except Empty:
+                    break
+
+            # every checkpoint has all the sections, so only the last one queued is written
+            checkpoints = [item for item in batch if isinstance(item, dict)]
+            if len(checkpoints) > 0:
+                try:
+                    self._write_checkpoint(sections=checkpoints[-1])
+                except Exception as e:
+                    log.critical(f'snapshot not saved: {type(e).__name__} {e}')
+
+            # release the barriers once all the previous checkpoints are written
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            is_running = None not in batch
+
+    def _write_checkpoint(self, sections: Dict[str, Dict]) -> None:
+        # append the sections that have changed
+        if self._file is None:
+            log.critical('snapshot journal not open, checkpoint not written')
+            return
+        changed: Dict[str, str] = {}
+        for name, section in sections.items():
+            dumped = self._dumps(section)
+            if self._sections.get(name) != dumped:
+                changed[name] = dumped
+        if len(changed) == 0:
+            return
+
+        self._seq += 1
+        self._write_line(f=self._file, sections=changed)
+        self._sections.update(changed)
+        self._lines_count += 1
+
+        if self._lines_count > self.compact_lines:
+            self._compact()
+
+    def _compact(self) -> None:
+        # rewrite the journal with only the current state
+        tmp_file_name = self.file_name + '.tmp'
+        with open(tmp_file_name, 'w') as f:
+            self._write_line(f=f, sections=self._sections)
+        self._file.close()
+        os.replace(tmp_file_name, self.file_name)
+        self._sync_dir()
+        self._file = open(self.file_name, 'a')
+        self._lines_count = 1
+        log.info(f'snapshot journal {self.file_name} compacted at checkpoint {self._seq}')
+
+    def _write_line(self, f, sections: Dict[str, str]) -> None:
+        # sections are already in json, so the line is built without dumping them again
+        dumped_sections = ', '.join([f'{json.dumps(name)}: {section}' for name, section in sections.items()])
+        f.write(f'{{"seq": {self._seq}, "ts": {time.time():.3f}, "sections": {{{dumped_sections}}}}}\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _sync_dir(self) -> None:
+        # make the rename durable
+        dir_fd: Optional[int] = None
+        try:
+            dir_fd = os.open(os.path.dirname(os.path.abspath(self.file_name)), os.O_RDONLY)
+            os.fsync(dir_fd)
+        except OSError as e:
+            log.warning(e)
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+
+    @staticmethod
+    def _dumps(section: Dict) -> str:
+        return json.dumps(section, sort_keys=True, separators=(',', ':'))
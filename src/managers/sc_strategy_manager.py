@@ -1,8 +1,5 @@
 # sc_strategy_manager.py
 
-import numpy as np
-from sklearn.linear_model import LinearRegression
-
 import logging
 from typing import Callable, List
 from basics.sc_asset import Asset
@@ -13,7 +10,7 @@ from managers.sc_isolated_manager import IsolatedOrdersManager
 from session.sc_helpers import Helpers
 from managers.sc_client_manager import ConfigManager
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_strategy_manager')
 
 BNB_BUFFER = 1.0
 
@@ -35,6 +32,10 @@ class StrategyManager:
 
     @staticmethod
     def get_tendency(cmp_pattern: List[float]) -> float:
+        # numpy & scikit-learn are imported on first use (only needed when a new pt creation is tried)
+        import numpy as np
+        from sklearn.linear_model import LinearRegression
+
         number_of_predictions = 10
         pattern_length = len(cmp_pattern)
 
@@ -0,0 +1,122 @@
+# sc_time_series.py
+
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+# (seconds per point, points kept): 1 hour of 5s points, 1 day of 1m points & 30 days of 1h points
+# the finest one is the finest a chart range can get: the shortest range (1h) in no more than 1,000 points
+RESOLUTIONS = [(5, 720), (60, 1_440), (3_600, 720)]
+
+# recorded values & how the samples within a point are aggregated (the rest keep the last sample value)
+FIELDS = ['cmp', 'cmp_min', 'cmp_max', 'profit_at_cmp', 'consolidated_profit', 'expected_profit_at_cmp',
+          'monitor_orders', 'active_orders', 'isolated_orders']
+MIN_FIELDS = ['cmp_min']
+MAX_FIELDS = ['cmp_max']
+
+
+class RingSeries:
+    # points of one resolution in fixed size arrays (oldest overwritten), plus the point being aggregated
+    def __init__(self, resolution: int, size: int):
+        self.resolution = resolution
+        self.size = size
+        self._ts = array('d', [0.0]) * size
+        self._values: Dict[str, array] = {field: array('d', [0.0]) * size for field in FIELDS}
+        self._head = 0  # next position written
+        self._count = 0
+        self._open_ts: Optional[float] = None
+        self._open_values: Dict[str, float] = {}
+
+    def add(self, ts: float, values: Dict[str, float]) -> None:
+        point_ts = float(int(ts // self.resolution) * self.resolution)
+        if point_ts != self._open_ts:
+            self._close()
+            self._open_ts = point_ts
+            self._open_values = dict(values)
+            return
+        open_values = self._open_values
+        for field, value in values.items():
+            if field in MIN_FIELDS:
+                open_values[field] = min(open_values[field], value)
+            elif field in MAX_FIELDS:
+                open_values[field] = max(open_values[field], value)
+            else:
+                open_values[field] = value
+
+    def _close(self) -> None:
+        if self._open_ts is None:
+            return
+        head = self._head
+        self._ts[head] = self._open_ts
+        for field in FIELDS:
+            self._values[field][head] = self._open_values.get(field, 0.0)
+        self._head = (head + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def get_oldest_ts(self) -> Optional[float]:
+        if self._count > 0:
+            return self._ts[(self._head - self._count) % self.size]
+        return self._open_ts
+
+    def get_range(self, start: float, end: float) -> Dict[str, List[float]]:
+        # points with start <= ts <= end (the point being aggregated included), oldest first, by field
+        first = (self._head - self._count) % self.size
+        low, high = 0, self._count
+        while low < high:  # first point with ts >= start (the points are sorted by ts)
+            middle = (low + high) // 2
+            if self._ts[(first + middle) % self.size] < start:
+                low = middle + 1
+            else:
+                high = middle
+        positions = []
+        for i in range(low, self._count):
+            position = (first + i) % self.size
+            if self._ts[position] > end:
+                break
+            positions.append(position)
+
+        points = dict(ts=[self._ts[position] for position in positions])
+        for field in FIELDS:
+            values = self._values[field]
+            points[field] = [values[position] for position in positions]
+        if self._open_ts is not None and start <= self._open_ts <= end:
+            points['ts'].append(self._open_ts)
+            for field in FIELDS:
+                points[field].append(self._open_values.get(field, 0.0))
+        return points
+
+
+class TimeSeriesStore:
+    # history of the main values of each symbol (recorded at each state publication), kept in several resolutions
+    # with bounded memory, for the dashboard charts
+    def __init__(self):
+        self._series: Dict[str, List[RingSeries]] = {}
+        self._first_ts: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, symbol_name: str, ts: float, values: Dict[str, float]) -> None:
+        with self._lock:
+            if symbol_name not in self._series.keys():
+                self._series[symbol_name] = [RingSeries(resolution=resolution, size=size)
+                                             for resolution, size in RESOLUTIONS]
+                self._first_ts[symbol_name] = ts
+            for series in self._series[symbol_name]:
+                series.add(ts=ts, values=values)
+
+    def get_range(self, symbol_name: str, start: float, end: float, max_points: int = 1_000) -> Dict:
+        # finest resolution with data back to start (or to the first value recorded) and no more than max_points
+        # in the range (the coarsest one if all of them have more)
+        with self._lock:
+            if symbol_name not in self._series.keys():
+                return dict(resolution=0, points=dict(ts=[], **{field: [] for field in FIELDS}))
+            all_series = self._series[symbol_name]
+            effective_start = max(start, self._first_ts[symbol_name])
+            candidates = [series for series in all_series
+                          if (end - effective_start) / series.resolution <= max_points] or [all_series[-1]]
+            selected = candidates[0]
+            for series in candidates:
+                oldest_ts = series.get_oldest_ts()
+                if oldest_ts is not None and oldest_ts <= effective_start:
+                    selected = series
+                    break
+            return dict(resolution=selected.resolution, points=selected.get_range(start=start, end=end))
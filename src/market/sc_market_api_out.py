@@ -1,31 +1,81 @@
 # sc_market_api_out.py
 
-from binance.client import Client
-from binance import enums as k_binance
-from binance.exceptions import *
-from typing import Callable, Optional, List
-from requests.exceptions import ConnectionError, ReadTimeout
-from urllib3.exceptions import ProtocolError
+from typing import Callable, Optional, List, Tuple, TYPE_CHECKING
 import socket
 import logging
 
+from basics import sc_binance_enums as k_binance
 from basics.sc_order import Order, OrderStatus
 from basics.sc_symbol import Symbol
 from basics.sc_asset import Asset
 from managers.sc_account_manager import Account
+from simulator.sc_fake_client import FakeClient
+from sc_latency import timed
 
+if TYPE_CHECKING:
+    from binance.client import Client
 
-log = logging.getLogger('log')
+
+log = logging.getLogger('log.sc_market_api_out')
+
+
+# the exceptions caught are resolved once, when MarketAPIOut is created, and only for the Binance client
+# (python-binance & requests are already loaded by it then); with the fake client (simulator, sweep, benchmarks),
+# which raises plain exceptions, python-binance is never imported and the binance & requests tuples are empty
+def _get_api_exceptions() -> Tuple[type, ...]:
+    try:
+        from binance.exceptions import BinanceAPIException, BinanceRequestException
+    except ImportError:
+        return ()
+    return BinanceAPIException, BinanceRequestException
+
+
+def _get_order_exceptions() -> Tuple[type, ...]:
+    try:
+        from binance.exceptions import (
+            BinanceRequestException, BinanceAPIException,
+            BinanceOrderException, BinanceOrderMinAmountException,
+            BinanceOrderMinPriceException, BinanceOrderMinTotalException,
+            BinanceOrderUnknownSymbolException,
+            BinanceOrderInactiveSymbolException)
+    except ImportError:
+        return ()
+    return (
+        BinanceRequestException, BinanceAPIException,
+        BinanceOrderException, BinanceOrderMinAmountException,
+        BinanceOrderMinPriceException, BinanceOrderMinTotalException,
+        BinanceOrderUnknownSymbolException,
+        BinanceOrderInactiveSymbolException)
+
+
+def _get_connection_exceptions() -> Tuple[type, ...]:
+    try:
+        from requests.exceptions import ConnectionError, ReadTimeout
+        from urllib3.exceptions import ProtocolError
+    except ImportError:
+        return (socket.error,)
+    return ConnectionError, ReadTimeout, ProtocolError, socket.error
 
 
 class MarketAPIOut:
     def __init__(self,
-                 client: Client,
+                 client: 'Client',
                  hot_reconnect_callback: Callable[[], None]
                  ):
         self.client = client
         self.hot_reconnect_callback = hot_reconnect_callback
 
+        # exceptions matched in the except clauses (resolved here, never while handling an api error)
+        if isinstance(client, FakeClient):
+            self._api_exceptions: Tuple[type, ...] = ()
+            self._order_exceptions: Tuple[type, ...] = ()
+            self._connection_exceptions: Tuple[type, ...] = (socket.error,)
+        else:
+            self._api_exceptions = _get_api_exceptions()
+            self._order_exceptions = _get_order_exceptions()
+            self._connection_exceptions = _get_connection_exceptions()
+
+    @timed(group='market_api')
     def get_all_symbol_info(self, symbol_name: str) -> Optional[dict]:
         # return dict with the required values for checking order values
         try:
@@ -34,13 +84,14 @@ class MarketAPIOut:
                 return d
             else:
                 log.critical(f'no symbol info from Binance for {symbol_name}')
-        except (BinanceAPIException, BinanceRequestException) as e:
+        except self._api_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
         return None
 
+    @timed(group='market_api')
     def place_limit_order(self, order: Order) -> Optional[dict]:
         try:
             msg = self.client.create_order(
@@ -56,18 +107,14 @@ class MarketAPIOut:
                 return d
             else:
                 log.critical(f'error when placing order {order}')
-        except (
-                BinanceRequestException, BinanceAPIException,
-                BinanceOrderException, BinanceOrderMinAmountException,
-                BinanceOrderMinPriceException, BinanceOrderMinTotalException,
-                BinanceOrderUnknownSymbolException,
-                BinanceOrderInactiveSymbolException) as e:
+        except self._order_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
         return None  # msg['orderId'], msg['status'] == 'FILLED' or 'NEW'
 
+    @timed(group='market_api')
     def place_market_order(self, order: Order) -> Optional[dict]:
         try:
             msg = {}
@@ -86,29 +133,50 @@ class MarketAPIOut:
                 return d
             else:
                 log.critical(f'error when placing order {order}')
-        except (
-                BinanceRequestException, BinanceAPIException,
-                BinanceOrderException, BinanceOrderMinAmountException,
-                BinanceOrderMinPriceException, BinanceOrderMinTotalException,
-                BinanceOrderUnknownSymbolException,
-                BinanceOrderInactiveSymbolException) as e:
+        except self._order_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
         return None  # msg['orderId'], msg['status'] == 'FILLED' or 'NEW'
 
+    @timed(group='market_api')
     def get_open_orders(self) -> Optional[dict]:
         try:
             msg = self.client.get_open_orders()
             return msg
-        except (BinanceAPIException, BinanceRequestException) as e:
+        except self._api_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
         return None
 
+    @timed(group='market_api')
+    def get_order(self, symbol_name: str, uid: str) -> Optional[dict]:
+        try:
+            return self.client.get_order(symbol=symbol_name, origClientOrderId=uid)
+        except self._api_exceptions as e:
+            log.critical(e)
+        except self._connection_exceptions as e:
+            log.critical(e)
+            self.hot_reconnect_callback()
+        return None
+
+    @timed(group='market_api')
+    def get_order_bnb_commission(self, symbol_name: str, binance_id: int) -> float:
+        # commission paid in BNB by the trades of the order
+        try:
+            trades = self.client.get_my_trades(symbol=symbol_name, orderId=binance_id)
+            return sum([float(trade['commission']) for trade in trades if trade['commissionAsset'] == 'BNB'])
+        except self._api_exceptions as e:
+            log.critical(e)
+        except self._connection_exceptions as e:
+            log.critical(e)
+            self.hot_reconnect_callback()
+        return 0.0
+
+    @timed(group='market_api')
     def get_account_info(self) -> Optional[List[Account]]:
         try:
             msg = self.client.get_account()
@@ -123,13 +191,14 @@ class MarketAPIOut:
                 if float(ba['free']) > 0 or float(ba['locked']) > 0
             ]
             return accounts
-        except (BinanceAPIException, BinanceRequestException) as e:
+        except self._api_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
         return None
 
+    @timed(group='market_api')
     def get_asset_balance(self, asset_name: str) -> Optional[Account]:
         # log.info(f'asset name: {asset_name}')
         try:
@@ -138,16 +207,18 @@ class MarketAPIOut:
             free = float(d.get('free'))
             locked = float(d.get('locked'))
             return Account(name=asset_name, free=free, locked=locked)
-        except (BinanceAPIException, BinanceRequestException) as e:
+        except self._api_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
         return None
 
     def get_asset_liquidity(self, asset_name: str) -> float:
+        # not timed: the api call is recorded once, as get_asset_balance
         return self.get_asset_balance(asset_name=asset_name).free
 
+    @timed(group='market_api')
     def get_cmp(self, symbol_name: str) -> float:
         try:
             cmp = self.client.get_avg_price(symbol=symbol_name)
@@ -155,20 +226,21 @@ class MarketAPIOut:
                 return float(cmp['price'])
             else:
                 return 0.0
-        except (BinanceAPIException, BinanceRequestException) as e:
+        except self._api_exceptions as e:
             log.critical(e)
-        except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+        except self._connection_exceptions as e:
             log.critical(e)
             self.hot_reconnect_callback()
 
+    @timed(group='market_api')
     def cancel_orders(self, orders: List[Order]):
         log.info('********** CANCELLING PLACED ORDER(S) **********')
         for order in orders:
             try:
                 self.client.cancel_order(symbol=order.symbol.name, origClientOrderId=order.uid)
-                log.info(f'** ORDER CANCELLED IN BINANCE {order}')
-            except (BinanceAPIException, BinanceRequestException) as e:
+                log.info('** ORDER CANCELLED IN BINANCE %s', order)
+            except self._api_exceptions as e:
                 log.critical(e)
-            except (ConnectionError, ReadTimeout, ProtocolError, socket.error) as e:
+            except self._connection_exceptions as e:
                 log.critical(e)
                 self.hot_reconnect_callback()
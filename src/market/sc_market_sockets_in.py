@@ -2,10 +2,11 @@
 
 from typing import Optional, Callable, List, Dict
 import logging
+import time
 
 from managers.sc_account_manager import Account
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_market_sockets_in')
 
 
 class MarketSocketsIn:
@@ -29,6 +30,9 @@ class MarketSocketsIn:
         self.update_previous_callback: Callable[[], None] = update_previous_callback
         self.order_canceled_callback: Callable[[str, str, str, float, float], None] = order_canceled_callback
 
+        # delay (seconds) between the event time in the exchange and its reception, by symbol
+        self.tick_lag: Dict[str, float] = {}
+
     def binance_user_socket_callback(self, msg: Dict) -> None:
         # depending on the event type, it will call the right callback function
         # in session manager
@@ -85,6 +89,10 @@ class MarketSocketsIn:
             # get last market price
             last_market_price = float(msg['c'])
 
+            # event time in ms (not included in the simulator messages)
+            if 'E' in msg.keys():
+                self.tick_lag[symbol_name] = time.time() - msg['E'] / 1000
+
             # **********  symbol ticker callback **********
             self.symbol_ticker_callback(symbol_name, last_market_price)
 
@@ -0,0 +1,126 @@
+# sc_events.py
+
+import logging
+import threading
+import time
+from typing import Dict
+
+log = logging.getLogger('log.events')
+
+
+class EventLimit:
+    # token bucket (rate: events per second, up to burst) + sampling (one out of sample events)
+    def __init__(self, rate: float, sample: int):
+        self.rate = rate
+        self.sample = max(sample, 1)
+        self.burst = max(rate, 1.0)
+        self.tokens = self.burst
+        self.last_time = time.monotonic()
+        self.seen = 0
+        self.suppressed = 0
+
+    def allow(self) -> bool:
+        self.seen += 1
+        if self.seen % self.sample != 0:
+            self.suppressed += 1
+            return False
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+        if self.tokens < 1.0:
+            self.suppressed += 1
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class EventFields:
+    # fields are only converted to text if the record is finally written
+    def __init__(self, fields: Dict):
+        self.fields = fields
+
+    def __str__(self):
+        return ' '.join([f'{k}={v}' for k, v in self.fields.items()])
+
+    def get_log_snapshot(self) -> 'EventFields':
+        # the fields dict is built by emit and not modified after logging: queued as it is (see sc_logger.py)
+        return self
+
+
+class Events:
+    # structured events instead of print() on the hot paths:
+    # - every event is counted and its numeric fields aggregated (count, sum, min, max & last value)
+    # - only the events allowed by the per event type rate limit & sampling reach the log
+    #   (the number of suppressed events is added to the next written one)
+    # - audit events (fills, session starts, tick errors) are always written: only the events that replaced
+    #   console prints are rate limited
+    DEFAULT_RATE = 5.0
+    DEFAULT_SAMPLE = 1
+
+    def __init__(self):
+        self._limits: Dict[str, EventLimit] = {}
+        self._limits_config: Dict[str, tuple] = {}
+        self._counters: Dict[str, int] = {}
+        self._aggregates: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def set_limits(self, events_data: Dict) -> None:
+        # from [EVENTS] in config_new.ini: <event_type> = <rate>, <sample> (default for the rest)
+        with self._lock:
+            for event_type, value in events_data.items():
+                rate, sample = [s.strip() for s in value.split(',')]
+                self._limits_config[event_type] = (float(rate), int(sample))
+            self._limits.clear()
+
+    def emit(self, event_type: str, level: int = logging.INFO, audit: bool = False, **fields) -> None:
+        with self._lock:
+            self._counters[event_type] = self._counters.get(event_type, 0) + 1
+            self._aggregate(event_type=event_type, fields=fields)
+            if audit:
+                suppressed = 0
+            else:
+                limit = self._get_limit(event_type=event_type)
+                if not limit.allow() or not log.isEnabledFor(level):
+                    return
+                suppressed = limit.suppressed
+                limit.suppressed = 0
+
+        if suppressed > 0:
+            fields['suppressed'] = suppressed
+        log.log(level, '%s %s', event_type, EventFields(fields=fields),
+                extra=dict(event=event_type, fields=fields))
+
+    def get_counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def get_aggregates(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        # {event_type: {field: {count, sum, min, max, last}}}
+        with self._lock:
+            return {event_type: {field: dict(values) for field, values in fields.items()}
+                    for event_type, fields in self._aggregates.items()}
+
+    def _get_limit(self, event_type: str) -> EventLimit:
+        if event_type not in self._limits.keys():
+            rate, sample = self._limits_config.get(
+                event_type, self._limits_config.get('default', (self.DEFAULT_RATE, self.DEFAULT_SAMPLE)))
+            self._limits[event_type] = EventLimit(rate=rate, sample=sample)
+        return self._limits[event_type]
+
+    def _aggregate(self, event_type: str, fields: Dict) -> None:
+        event_aggregates = self._aggregates.setdefault(event_type, {})
+        for field, value in fields.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values = event_aggregates.get(field)
+                if values is None:
+                    event_aggregates[field] = dict(count=1, sum=value, min=value, max=value, last=value)
+                else:
+                    values['count'] += 1
+                    values['sum'] += value
+                    values['min'] = min(values['min'], value)
+                    values['max'] = max(values['max'], value)
+                    values['last'] = value
+
+
+# single events registry for the whole app
+events = Events()
@@ -0,0 +1,130 @@
+# sc_latency.py
+
+import functools
+import threading
+import time
+from typing import Dict, Tuple, Callable
+
+# sub-buckets per power of two: values are recorded with a relative error below 1 / 2 ** SUB_BUCKET_BITS
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+
+
+class LatencyHistogram:
+    # log-linear histogram of nanosecond values (HDR style): exact up to 2 * SUB_BUCKET_COUNT ns,
+    # then SUB_BUCKET_COUNT linear buckets for each power of two, so record() is O(1) and the memory fixed
+    PERCENTILES = [50.0, 90.0, 99.0, 99.9]
+
+    def __init__(self):
+        self._counts = [0] * (64 * SUB_BUCKET_COUNT)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        self._counts[self._get_index(ns=ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def get_percentile(self, percentile: float) -> int:
+        # value (ns) at the given percentile, within the bucket resolution
+        if self.count == 0:
+            return 0
+        target = max(1, round(self.count * percentile / 100.0))
+        accumulated = 0
+        for index, count in enumerate(self._counts):
+            accumulated += count
+            if accumulated >= target:
+                return min(self._get_value(index=index), self.max_ns)
+        return self.max_ns
+
+    def get_summary(self) -> Dict:
+        # values in microseconds
+        summary = dict(count=self.count,
+                       mean_us=(self.total_ns / self.count / 1000) if self.count > 0 else 0.0,
+                       max_us=self.max_ns / 1000)
+        for percentile in self.PERCENTILES:
+            summary[f'p{percentile:g}_us'] = self.get_percentile(percentile=percentile) / 1000
+        return summary
+
+    @staticmethod
+    def _get_index(ns: int) -> int:
+        if ns < 2 * SUB_BUCKET_COUNT:
+            return max(ns, 0)
+        shift = ns.bit_length() - SUB_BUCKET_BITS - 1
+        return (shift << SUB_BUCKET_BITS) + (ns >> shift)
+
+    @staticmethod
+    def _get_value(index: int) -> int:
+        # middle value of the bucket
+        if index < 2 * SUB_BUCKET_COUNT:
+            return index
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        sub_bucket = index - (shift << SUB_BUCKET_BITS)
+        return (sub_bucket << shift) + (1 << shift) // 2
+
+
+class LatencyRecorder:
+    # histograms by group (symbol name, 'market_api') and stage
+    # disabled by default: when disabled lap() only checks a flag, so the overhead in the tick path is negligible
+    # records from different threads are not locked (a concurrent record might be lost, it is only statistics)
+    def __init__(self):
+        self.enabled = False
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool) -> None:
+        self.enabled = enabled
+
+    def start(self) -> int:
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def lap(self, group: str, stage: str, start_ns: int) -> int:
+        # record the time since start_ns and return the start of the next stage
+        if start_ns == 0 or not self.enabled:
+            return self.start()
+        now = time.perf_counter_ns()
+        self._get_histogram(group=group, stage=stage).record(ns=now - start_ns)
+        return now
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def get_summary(self) -> Dict[str, Dict[str, Dict]]:
+        # {group: {stage: summary}}
+        with self._lock:
+            items = list(self._histograms.items())
+        summary: Dict[str, Dict[str, Dict]] = {}
+        for (group, stage), histogram in items:
+            summary.setdefault(group, {})[stage] = histogram.get_summary()
+        return summary
+
+    def _get_histogram(self, group: str, stage: str) -> LatencyHistogram:
+        histogram = self._histograms.get((group, stage))
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault((group, stage), LatencyHistogram())
+        return histogram
+
+
+# single recorder for the whole app
+latency = LatencyRecorder()
+
+
+def timed(group: str) -> Callable:
+    # decorator: record the latency of each call in group with the function name as stage
+    def decorator(f: Callable) -> Callable:
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not latency.enabled:
+                return f(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                latency.lap(group=group, stage=f.__name__, start_ns=start_ns)
+        return wrapper
+    return decorator
@@ -1,15 +1,83 @@
 # sc_logger.py
 
+import atexit
+import json
 import logging
+import os
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import Queue
+
+from managers.config_manager import ConfigManager
+
+
+class JsonFormatter(logging.Formatter):
+    # one compact json object per line (structured copy of the log)
+    def format(self, record: logging.LogRecord) -> str:
+        d = dict(
+            ts=round(record.created, 6),
+            level=record.levelname,
+            logger=record.name,
+            thread=record.threadName,
+            func=record.funcName,
+            msg=record.getMessage()
+        )
+        # structured events (sc_events) keep their fields
+        if hasattr(record, 'event'):
+            d['event'] = record.event
+            d['fields'] = record.fields
+        return json.dumps(d, separators=(',', ':'), default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    # QueueHandler.prepare() formats the message in the calling thread: here the record is queued unformatted
+    # (the listener handlers format it), so the message shows the arguments as they were when logged:
+    # - immutable values are queued as they are
+    # - objects with get_log_snapshot() (i.e. Order) are replaced by it: an immutable copy of the fields shown,
+    #   formatted by the listener thread
+    # - any other object is converted to str in the calling thread
+    IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, tuple):
+            if not all(isinstance(arg, self.IMMUTABLE_TYPES) for arg in args):
+                record.args = tuple(self._get_arg(arg=arg) for arg in args)
+        elif isinstance(args, dict):
+            record.args = {key: self._get_arg(arg=value) for key, value in args.items()}
+        return record
+
+    @classmethod
+    def _get_arg(cls, arg):
+        if isinstance(arg, cls.IMMUTABLE_TYPES):
+            return arg
+        get_log_snapshot = getattr(arg, 'get_log_snapshot', None)
+        if get_log_snapshot is not None:
+            return get_log_snapshot()
+        return str(arg)
 
 
 class XBLogger:
     def __init__(self):
+        logging_data = ConfigManager(config_file='config_new.ini').get_logging_data()
+
         log = logging.getLogger('log')
-        log.setLevel(logging.DEBUG)
+        log.setLevel(logging_data.get('level', 'DEBUG'))
+
+        # module loggers are children of 'log' (log.sc_order, log.sc_session, ...)
+        # module_levels = sc_order:INFO, sc_isolated_manager:WARNING
+        for module_level in logging_data.get('module_levels', '').split(','):
+            if ':' in module_level:
+                module, level = [s.strip() for s in module_level.split(':')]
+                logging.getLogger(f'log.{module}').setLevel(level.upper())
 
         # setup file handler & formatter
-        ch = logging.FileHandler(filename='log/scorpius.log', mode='w')
+        # the file is rotated by size, the log of the previous run is kept as <file_name>.1
+        file_name = logging_data.get('file_name', 'log/scorpius.log')
+        ch = RotatingFileHandler(filename=file_name,
+                                 maxBytes=int(logging_data.get('max_bytes', 10_000_000)),
+                                 backupCount=int(logging_data.get('backup_count', 5)))
+        if os.path.getsize(file_name) > 0:
+            ch.doRollover()
 
         # setup output string
         # format_s = '%(levelname)-8s %(message)s'
@@ -18,6 +86,25 @@ class XBLogger:
 
         formatter = logging.Formatter(format_s)
         ch.setFormatter(formatter)
-        log.addHandler(ch)
+        handlers = [ch]
+
+        # optional json lines log
+        json_file_name = logging_data.get('json_file_name', '')
+        if json_file_name:
+            jh = RotatingFileHandler(filename=json_file_name,
+                                     maxBytes=int(logging_data.get('max_bytes', 10_000_000)),
+                                     backupCount=int(logging_data.get('backup_count', 5)))
+            jh.setFormatter(JsonFormatter())
+            handlers.append(jh)
+
+        # app threads (ticks, sockets, dashboard) only put the records in a queue,
+        # formatting the output & writing to disk is done in the listener thread
+        log_queue = Queue(-1)
+        log.addHandler(DeferredQueueHandler(log_queue))
+        self.listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+        # write the queued records before exit
+        atexit.register(self.listener.stop)
 
         # %(threadName)-20s, %(asctime)s, %(filename)-20s, %(funcName)-25s
@@ -0,0 +1,46 @@
+# sc_startup_profiler.py
+
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    # elapsed time of each (nested) startup stage: imports and initialization
+    # stages are only timed when enabled (--profile-startup), otherwise stage() does nothing
+    def __init__(self):
+        self.enabled = False
+        self._stages: List[Tuple[int, str, float]] = []  # (depth, name, elapsed secs)
+        self._depth = 0
+        self._start = time.perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        # reserve the position so that stages are reported in start order
+        index = len(self._stages)
+        self._stages.append((self._depth, name, 0.0))
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self._stages[index] = (self._depth, name, time.perf_counter() - start)
+
+    def get_report(self) -> str:
+        lines = ['********** STARTUP PROFILE **********']
+        for depth, name, elapsed in self._stages:
+            lines.append(f'{"  " * depth}{name:{50 - 2 * depth}} {elapsed * 1000:10,.1f} ms')
+        lines.append(f'{"total":50} {(time.perf_counter() - self._start) * 1000:10,.1f} ms')
+        return '\n'.join(lines)
+
+
+# single profiler for the whole app
+startup_profiler = StartupProfiler()
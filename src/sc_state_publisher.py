@@ -0,0 +1,108 @@
+# sc_state_publisher.py
+
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+# dashboard changes waiting to be sent to a subscriber, when exceeded (slow client) they are dropped and the
+# subscriber gets the whole dashboard state instead
+MAX_PENDING_CHANGES = 100
+
+
+class StatePublisher:
+    # the trading threads publish a pre-aggregated state (plain dicts & numbers) at most every interval seconds
+    # readers (i.e. the /metrics endpoint) only get the last published state, so they never walk the session
+    # data structures nor contend with the trading threads
+    # the state is replaced as a whole (a single reference assignment) and never modified after publishing
+    # subscribers (i.e. the /stream endpoint) also receive, at each publication, only the dashboard values that
+    # have changed
+    # the dashboard values (by symbol & overview) are only in the state when a consumer needs them: an attached
+    # dashboard (in this process or served by the engine server) or a subscriber
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._state: Dict = {}
+        self._last_publish = 0.0
+        self._subscribers: List[queue.Queue] = []
+        self._dashboards_count = 0
+        self._lock = threading.Lock()
+
+    def set_interval(self, interval: float) -> None:
+        self.interval = interval
+
+    def is_publish_due(self) -> bool:
+        return time.time() - self._last_publish > self.interval
+
+    def attach_dashboard(self) -> None:
+        with self._lock:
+            self._dashboards_count += 1
+
+    def is_dashboard_needed(self) -> bool:
+        return self._dashboards_count > 0 or len(self._subscribers) > 0
+
+    def publish(self, state: Dict) -> None:
+        previous_state = self._state
+        self._last_publish = time.time()
+        state['ts'] = self._last_publish
+        self._state = state
+
+        if self._subscribers:
+            changes = self._get_dashboard_changes(previous_state=previous_state, state=state)
+            if changes:
+                with self._lock:
+                    subscribers = list(self._subscribers)
+                for subscriber in subscribers:
+                    self._put(subscriber=subscriber, changes=changes)
+
+    def get_state(self) -> Dict:
+        return self._state
+
+    def get_dashboard_state(self) -> Dict:
+        # dashboard values of every symbol in the last published state
+        state = self._state
+        return dict(
+            ts=state.get('ts', 0.0),
+            full=True,
+            symbols={name: symbol_state['dashboard'] for name, symbol_state in state.get('symbols', {}).items()
+                     if 'dashboard' in symbol_state.keys()}
+        )
+
+    def subscribe(self) -> queue.Queue:
+        # the queue receives the dashboard changes of each publication (None: changes dropped, whole state needed)
+        subscriber = queue.Queue(maxsize=MAX_PENDING_CHANGES)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def get_subscribers_count(self) -> int:
+        return len(self._subscribers)
+
+    @staticmethod
+    def _get_dashboard_changes(previous_state: Dict, state: Dict) -> Optional[Dict]:
+        previous_symbols = previous_state.get('symbols', {})
+        symbols_changes = {}
+        for name, symbol_state in state['symbols'].items():
+            previous_values = previous_symbols[name].get('dashboard', {}) if name in previous_symbols.keys() else {}
+            values_changes = {element_id: value for element_id, value in symbol_state.get('dashboard', {}).items()
+                              if previous_values.get(element_id) != value}
+            if values_changes:
+                symbols_changes[name] = values_changes
+        return dict(ts=state['ts'], full=False, symbols=symbols_changes) if symbols_changes else None
+
+    @staticmethod
+    def _put(subscriber: queue.Queue, changes: Dict) -> None:
+        try:
+            subscriber.put_nowait(changes)
+        except queue.Full:
+            with subscriber.mutex:
+                subscriber.queue.clear()
+            subscriber.put_nowait(None)
+
+
+# single publisher for the whole app
+state_publisher = StatePublisher()
@@ -1,20 +1,22 @@
 # sc_checks_manager.py
 
 import logging
-from binance import enums as k_binance
+from basics import sc_binance_enums as k_binance
 from typing import List
 
 from managers.sc_isolated_manager import IsolatedOrdersManager
 from managers.sc_strategy_manager import StrategyManager
+from managers.sc_db_manager import DBManager
 from session.sc_pt_manager import PTManager, PerfectTradeStatus
 from session.sc_helpers import Helpers, QuitMode
 from basics.sc_order import Order, OrderStatus
 from market.sc_market_api_out import MarketAPIOut
 from basics.sc_symbol import Symbol
 from basics.sc_action import Action
+from sc_events import events
 
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_checks_manager')
 
 
 class ChecksManager:
@@ -25,13 +27,15 @@ class ChecksManager:
                  helpers: Helpers,
                  market_api_out: MarketAPIOut,
                  config: dict,
-                 symbol: Symbol):
+                 symbol: Symbol,
+                 dbm: DBManager):
         self.iom = iom
         self.strategy_manager = strategy_manager
         self.ptm = ptm
         self.helpers = helpers
         self.market_api_out = market_api_out
         self.symbol = symbol
+        self.dbm = dbm
 
         # parameters needed from config.ini
         self.P_TARGET_TOTAL_NET_PROFIT = float(config['target_total_net_profit'])
@@ -127,7 +131,7 @@ class ChecksManager:
                           if order.status == OrderStatus.CANCELED
                           and order.get_distance(cmp=cmp) < self.P_DISTANCE_FOR_REPLACING_ORDER]
         for order in pending_orders:
-            log.info(f'pending order {order} to be processed')
+            log.info('pending order %s to be processed', order)
             # set asset & liquidity needed depending upon k_side
             if order.k_side == k_binance.SIDE_SELL:
                 asset = self.symbol.base_asset()
@@ -140,14 +144,14 @@ class ChecksManager:
                 liquidity_needed = order.amount * order.price
                 counter_liquidity_needed = order.amount
 
-            log.info(f'PENDING_ORDER: asset: {asset.name()} liquidity needed: {liquidity_needed}')
+            log.info('PENDING_ORDER: asset: %s liquidity needed: %s', asset.name(), liquidity_needed)
 
             # check whether there is enough liquidity for placing it
             if self.strategy_manager.is_asset_liquidity_enough(asset=asset, new_pt_need=liquidity_needed):
                 # place, change status & delete from database
                 log.info(f'PENDING_ORDER: place, change status & delete from database')
                 self.market_api_out.place_limit_order(order=order)
-                order.status = OrderStatus.TO_BE_TRADED
+                order.set_status(status=OrderStatus.TO_BE_TRADED)
                 if order in self.iom.canceled_orders:
                     self.iom.canceled_orders.remove(order)
                 else:
@@ -178,9 +182,9 @@ class ChecksManager:
                                       status=OrderStatus.TO_BE_TRADED)
                     log.info(f'PENDING_ORDER: MARKET place order: {new_order}')
                     self.market_api_out.place_market_order(order=new_order)
-                    # self.dbm.add_action(action=Action(
-                    self.iom.actions.append(Action(
+                    self._add_action(action=Action(
                         action_id='ACTION_FOR_CANCELING',
+                        symbol_name=self.symbol.name,
                         side=counter_k_side,
                         qty=new_qty,
                         price=cmp))
@@ -240,9 +244,9 @@ class ChecksManager:
                                           status=OrderStatus.TO_BE_TRADED)
                         log.info(f'PENDING_ORDER: MARKET place order: {new_order}')
                         self.market_api_out.place_market_order(order=new_order)
-                        # self.dbm.add_action(action=Action(
-                        self.iom.actions.append(Action(
+                        self._add_action(action=Action(
                             action_id='ACTION_TO_CREATE_NEW_PT',
+                            symbol_name=self.symbol.name,
                             side=k_binance.SIDE_BUY,
                             qty=new_qty,
                             price=cmp))
@@ -286,9 +290,9 @@ class ChecksManager:
                                           status=OrderStatus.TO_BE_TRADED)
                         log.info(f'PENDING_ORDER: MARKET place order: {new_order}')
                         self.market_api_out.place_market_order(order=new_order)
-                        # self.dbm.add_action(action=Action(
-                        self.iom.actions.append(Action(
+                        self._add_action(action=Action(
                             action_id='ACTION_TO_CREATE_NEW_PT',
+                            symbol_name=self.symbol.name,
                             side=k_binance.SIDE_SELL,
                             qty=new_qty,
                             price=cmp))
@@ -345,33 +349,26 @@ class ChecksManager:
         if 0.0 not in cmp_pattern_short and 0.0 not in cmp_pattern_long:
             predicted_cmp = self.strategy_manager.get_tendency(cmp_pattern=cmp_pattern_short)
             shift_short = predicted_cmp - cmp
-            print(f'cmp: {cmp} predicted value: {predicted_cmp} shift_short: {shift_short}')
 
             predicted_cmp = self.strategy_manager.get_tendency(cmp_pattern=cmp_pattern_long)
             shift_long = predicted_cmp - cmp
-            print(f'cmp: {cmp} predicted value: {predicted_cmp} shift_long: {shift_long}')
 
             # set value as average from short and long
             short_weight = 0.5
             long_weight = 0.5
             shift = short_weight * shift_short + long_weight * shift_long
-            print(f'applied shift: {shift}')
+            events.emit('pt_creation_shift', symbol=self.symbol.name, cmp=cmp,
+                        shift_short=shift_short, shift_long=shift_long, shift=shift)
 
             return True, shift
         else:
             return True, 0.0
 
-    def get_actions_balance(self) -> (int, int, float):
-        buy_actions = [action for action in self.iom.actions if action.side == k_binance.SIDE_BUY]
-        sell_actions = [action for action in self.iom.actions if action.side == k_binance.SIDE_SELL]
-        buy_actions_count = len(buy_actions)
-        sell_actions_count = len(sell_actions)
-
-        actions_for_balance_count = min(buy_actions_count, sell_actions_count)
+    def _add_action(self, action: Action) -> None:
+        # in memory (used for the balance) & persisted
+        self.iom.add_action(action=action)
+        self.dbm.add_action(action=action)
 
-        actions_balance = 0.0
-        for i in range(actions_for_balance_count):
-            partial_balance = sell_actions[i].price * sell_actions[i].qty - buy_actions[i].price * buy_actions[i].qty
-            actions_balance += partial_balance
-
-        return buy_actions_count, sell_actions_count, actions_balance
+    def get_actions_balance(self) -> (int, int, float):
+        # actions from all symbols
+        return self.iom.get_actions_balance()
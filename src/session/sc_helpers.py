@@ -3,7 +3,7 @@
 import logging
 from typing import List, Union, Callable
 from enum import Enum
-from binance import enums as k_binance
+from basics import sc_binance_enums as k_binance
 from basics.sc_order import Order, OrderStatus
 from basics.sc_perfect_trade import PerfectTradeStatus
 from session.sc_pt_manager import PTManager
@@ -11,7 +11,7 @@ from market.sc_market_api_out import MarketAPIOut
 from basics.sc_symbol import Symbol
 from managers.sc_isolated_manager import IsolatedOrdersManager
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_helpers')
 
 
 class QuitMode(Enum):
@@ -102,7 +102,7 @@ class Helpers:
         msg = self.market.place_market_order(order=order)
         if msg:
             order.set_binance_id(new_id=msg.get('binance_id'))
-            log.info(f'********** MARKET ORDER PLACED ********** {order}')  # msg: {msg}')
+            log.info('********** MARKET ORDER PLACED ********** %s', order)  # msg: {msg}')
         else:
             log.critical(f'market order not place in binance {order}')
             raise Exception("MARKET order not placed")
@@ -113,7 +113,7 @@ class Helpers:
         msg = self.market.place_limit_order(order=order)
         if msg:
             order.set_binance_id(new_id=msg.get('binance_id'))
-            log.debug(f'********** LIMIT ORDER PLACED ********** {order}')  # msg: {msg}')
+            log.debug('********** LIMIT ORDER PLACED ********** %s', order)  # msg: {msg}')
         else:
             log.critical(f'error placing order {order}')
             raise Exception("LIMIT order not placed")
@@ -153,7 +153,7 @@ class Helpers:
                     # place only MONITOR orders
                     if order.status == OrderStatus.MONITOR:
                         log.info(f'** isolated order to be appended to list: {order}')
-                        iom.isolated_orders.append(order)
+                        iom.add_isolated_order(order=order)
                         # self.placed_isolated_callback(order)
                         self.place_limit_order(order=order)
 
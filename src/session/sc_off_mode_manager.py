@@ -11,7 +11,7 @@ from basics.sc_symbol import Symbol
 from basics.sc_order import Order, OrderStatus
 from market.sc_market_api_out import MarketAPIOut
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_off_mode_manager')
 
 
 class OffModeManager:
@@ -1,7 +1,7 @@
 # sc_pt_manager.py
 
-from typing import Optional, List
-from binance import enums as k_binance
+from typing import Optional, List, Dict
+from basics import sc_binance_enums as k_binance
 import logging
 
 from basics.sc_order import Order, OrderStatus
@@ -9,7 +9,7 @@ from session.sc_pt_calculator import get_prices_given_neb  # get_pt_values
 from basics.sc_perfect_trade import PerfectTrade, PerfectTradeStatus
 from basics.sc_symbol import Symbol
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_pt_manager')
 
 
 class PTManager:
@@ -65,11 +65,11 @@ class PTManager:
 
             if order.k_side == k_binance.SIDE_BUY:
                 pt.status = PerfectTradeStatus.BUY_TRADED
-                so.price = order.price + gap  # price
+                so.set_price(price=order.price + gap)
                 so.target_price = so.price + self.distance_to_target_price  # target price
             elif order.k_side == k_binance.SIDE_SELL:
                 pt.status = PerfectTradeStatus.SELL_TRADED
-                so.price = order.price - gap
+                so.set_price(price=order.price - gap)
                 so.target_price = so.price - self.distance_to_target_price
 
         # check whether the pt is partially traded or completed
@@ -197,6 +197,20 @@ class PTManager:
         )
         return b1, s1
 
+    def get_snapshot(self) -> Dict:
+        return dict(
+            pt_created_count=self.pt_created_count,
+            orders=[order.to_snapshot() for pt in self.perfect_trades for order in pt.orders],
+            perfect_trades=[pt.to_snapshot() for pt in self.perfect_trades]
+        )
+
+    def restore_snapshot(self, snapshot: Dict) -> None:
+        self.pt_created_count = snapshot['pt_created_count']
+        orders = {order_snapshot['uid']: Order.from_snapshot(snapshot=order_snapshot, symbol=self.symbol)
+                  for order_snapshot in snapshot['orders']}
+        self.perfect_trades = [PerfectTrade.from_snapshot(snapshot=pt_snapshot, orders=orders)
+                               for pt_snapshot in snapshot['perfect_trades']]
+
     def log_perfect_trades_info(self):
         for pt in self.perfect_trades:
             log.info(f'perfect trade {pt.id} {pt.pt_type} {pt.status.name}')
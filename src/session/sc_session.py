@@ -2,8 +2,8 @@
 
 import logging
 
-from typing import Callable, List
-from binance import enums as k_binance
+from typing import Callable, List, Dict
+from basics import sc_binance_enums as k_binance
 
 from market.sc_market_api_out import MarketAPIOut
 from basics.sc_order import OrderStatus
@@ -17,8 +17,10 @@ from managers.sc_db_manager import DBManager
 from session.sc_helpers import Helpers
 from session.sc_checks_manager import ChecksManager
 from session.sc_off_mode_manager import OffModeManager
+from sc_events import events
+from sc_latency import latency
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_session')
 
 
 class Session:
@@ -92,7 +94,8 @@ class Session:
             helpers=self.helpers,
             market_api_out=self.market,
             config=config,
-            symbol=symbol
+            symbol=symbol,
+            dbm=self.dbm
         )
 
         self.off_mode_manager = OffModeManager(
@@ -106,7 +109,7 @@ class Session:
         )
 
         self.cmp = self.market.get_cmp(symbol_name=self.symbol.name)
-        print(f'initial cmp: {self.cmp}')
+        events.emit('session_started', symbol=self.symbol.name, session_id=self.session_id, cmp=self.cmp)
         self.min_cmp = self.cmp
         self.max_cmp = self.cmp
 
@@ -115,8 +118,6 @@ class Session:
 
         self.gap = 0.0
 
-        self.total_profit_series = [0.0]
-
         self.pt_created_count = 0
         self.buy_count = 0
         self.sell_count = 0
@@ -136,6 +137,9 @@ class Session:
     def symbol_ticker_callback(self, cmp: float) -> None:
         if self.session_active:
             try:
+                # stage latencies (only when latency.enabled)
+                tick_start_ns = stage_start_ns = latency.start()
+
                 self.is_active = self.off_mode_manager.check_to_update_activation_flag(cmp=cmp)
                 # self.off_mode_manager.check_monitor_order(cmp=cmp)
                 if not self.is_active:
@@ -148,7 +152,8 @@ class Session:
                         if self.strategy_manager.is_liquidity_enough(cmp=cmp, symbol=self.symbol):
                             self.ptm.create_new_pt(cmp=shifted_cmp, symbol=self.symbol)
                             created_remaining_order = self.ptm.perfect_trades[-1].orders[0]
-                            print(f'created remaining order: {created_remaining_order}')
+                            events.emit('remaining_order_created', symbol=self.symbol.name,
+                                        order=created_remaining_order, cmp=cmp)
                             # self.off_mode_manager.monitor_order = created_remaining_order  # buy order
 
                     elif buy_span > 0.0 and sell_span == 0.0:
@@ -157,9 +162,11 @@ class Session:
                         if self.strategy_manager.is_liquidity_enough(cmp=cmp, symbol=self.symbol):
                             self.ptm.create_new_pt(cmp=shifted_cmp, symbol=self.symbol)
                             created_remaining_order = self.ptm.perfect_trades[-1].orders[1]
-                            log.info(f'created remaining order: {created_remaining_order}')
+                            log.info('created remaining order: %s', created_remaining_order)
                             # self.off_mode_manager.monitor_order = created_remaining_order  # sell order
 
+                stage_start_ns = latency.lap(group=self.symbol.name, stage='off_mode', start_ns=stage_start_ns)
+
                 # 0.1: create first pt
                 if self.cmp_count == 5:
                     if self._try_new_pt_creation(cmp=cmp):
@@ -189,31 +196,39 @@ class Session:
                 # counter used to detect inactivity
                 self.cycles_from_last_trade += 1
 
+                stage_start_ns = latency.lap(group=self.symbol.name, stage='cmp_update', start_ns=stage_start_ns)
+
                 # it is important to check first the active list and then the monitor one
                 # with this order we guarantee there is only one status change per cycle
                 # self._check_active_orders_for_trading(cmp=cmp)
                 self.checks_manager.check_active_orders_for_trading(cmp=cmp)
+                stage_start_ns = latency.lap(group=self.symbol.name, stage='active_orders', start_ns=stage_start_ns)
 
                 # 4. loop through monitoring orders for activating
                 # self._check_monitor_orders_for_activating(cmp=cmp)
                 self.checks_manager.check_monitor_orders_for_activating(cmp=cmp)
+                stage_start_ns = latency.lap(group=self.symbol.name, stage='monitor_orders', start_ns=stage_start_ns)
 
                 # 5. check inactivity
                 self._check_inactivity(cmp=cmp)
+                stage_start_ns = latency.lap(group=self.symbol.name, stage='inactivity', start_ns=stage_start_ns)
 
                 # 6. check pending orders to place if close to be traded
                 # self._check_pending_orders()
                 self.checks_manager.check_pending_orders(cmp=cmp, consolidated_profit=self.consolidated_profit)
+                stage_start_ns = latency.lap(group=self.symbol.name, stage='pending_orders', start_ns=stage_start_ns)
 
                 # ********** SESSION EXIT POINT ********
                 self.checks_manager.check_exit_conditions(cmp=cmp, session_id=self.session_id, cmp_count=self.cmp_count)
+                latency.lap(group=self.symbol.name, stage='exit_conditions', start_ns=stage_start_ns)
+                latency.lap(group=self.symbol.name, stage='tick', start_ns=tick_start_ns)
 
             except AttributeError as e:
-                print(e)
+                events.emit('tick_error', level=logging.ERROR, audit=True, symbol=self.symbol.name, error=e)
 
     def order_traded_callback(self, uid: str, order_price: float, bnb_commission: float) -> None:
-        print(f'********** ORDER TRADED:    price: {order_price} [Q] - commission: {bnb_commission} [BNB]')
-        log.info(f'********** ORDER TRADED:    {uid}')
+        events.emit('order_traded', audit=True, symbol=self.symbol.name, uid=uid, price=order_price,
+                    commission=bnb_commission)
 
         # get candidate orders
         orders_to_be_traded = self.ptm.get_orders_by_request(
@@ -244,7 +259,7 @@ class Session:
                     bnb_quote_rate=self.market.get_cmp(symbol_name=self.P_COMMISSION_RATE_SYMBOL))
 
                 # set traded order price
-                order.price = order_price
+                order.set_price(price=order_price)
 
                 # change status
                 order.set_status(status=OrderStatus.TRADED)
@@ -266,7 +281,7 @@ class Session:
             if is_known_order:
                 self.isolated_order_traded_callback(self.symbol, consolidated, expected)
             else:
-                print(f'checking previous runs order with uid: {uid} price: {order_price}')
+                events.emit('previous_runs_order_traded', symbol=self.symbol.name, uid=uid, price=order_price)
                 self.iom.check_previous_runs_orders(uid=uid)
 
     def account_balance_callback(self, accounts: List[Account]) -> None:
@@ -321,6 +336,52 @@ class Session:
         all_orders = isolated_orders + session_orders
         return all_orders
 
+    def get_snapshot(self) -> Dict:
+        # session state for warm restart (the pt manager state included), copied: it is encoded in another thread
+        return dict(
+            session_id=self.session_id,
+            session_active=self.session_active,
+            is_active=self.is_active,
+            consolidated_profit=self.consolidated_profit,
+            cycles_count_for_inactivity=self.cycles_count_for_inactivity,
+            cmp=self.cmp,
+            min_cmp=self.min_cmp,
+            max_cmp=self.max_cmp,
+            cmp_pattern_short=list(self.cmp_pattern_short),
+            cmp_pattern_long=list(self.cmp_pattern_long),
+            gap=self.gap,
+            pt_created_count=self.pt_created_count,
+            buy_count=self.buy_count,
+            sell_count=self.sell_count,
+            cmp_count=self.cmp_count,
+            cycles_from_last_trade=self.cycles_from_last_trade,
+            logbook=list(self.logbook),
+            base_negative_try_count=self.checks_manager.base_negative_try_count,
+            quote_negative_try_count=self.checks_manager.quote_negative_try_count,
+            ptm=self.ptm.get_snapshot()
+        )
+
+    def restore_snapshot(self, snapshot: Dict) -> None:
+        self.session_active = snapshot['session_active']
+        self.is_active = snapshot['is_active']
+        self.consolidated_profit = snapshot['consolidated_profit']
+        self.cycles_count_for_inactivity = snapshot['cycles_count_for_inactivity']
+        self.cmp = snapshot['cmp']
+        self.min_cmp = snapshot['min_cmp']
+        self.max_cmp = snapshot['max_cmp']
+        self.cmp_pattern_short = snapshot['cmp_pattern_short']
+        self.cmp_pattern_long = snapshot['cmp_pattern_long']
+        self.gap = snapshot['gap']
+        self.pt_created_count = snapshot['pt_created_count']
+        self.buy_count = snapshot['buy_count']
+        self.sell_count = snapshot['sell_count']
+        self.cmp_count = snapshot['cmp_count']
+        self.cycles_from_last_trade = snapshot['cycles_from_last_trade']
+        self.logbook = snapshot['logbook']
+        self.checks_manager.base_negative_try_count = snapshot['base_negative_try_count']
+        self.checks_manager.quote_negative_try_count = snapshot['quote_negative_try_count']
+        self.ptm.restore_snapshot(snapshot=snapshot['ptm'])
+
     @staticmethod
     def add_cmp_to_pattern(new_cmp: float, pattern: List[float]):
         # shift left
@@ -7,9 +7,10 @@ from managers.sc_account_manager import Account, AccountManager
 from managers.config_manager import ConfigManager
 from simulator.thread_cmp_generator import ThreadCmpGenerator
 from simulator.sc_fake_simulator_out import FakeSimulatorOut
+from simulator.sc_fake_order_book import FakeOrderBooks
 from basics.sc_symbol import Symbol, Asset
 
-log = logging.getLogger('log')
+log = logging.getLogger('log.sc_fake_client')
 
 
 class FakeOrder:
@@ -34,9 +35,12 @@ class FakeClient:
         self.symbol_ticker_socket_callback = symbol_ticker_socket_callback
 
         # DATA
-        self._placed_orders: List[FakeOrder] = []
+        # resting orders in per-symbol, per-side price-sorted books with an uid index
+        self._placed_orders = FakeOrderBooks()
         # only used to ser the orderId
         self._placed_orders_count = 0
+        # number of fills (LIMIT & MARKET), used to assess simulations
+        self.traded_orders_count = 0
 
         self.symbols: Dict[str, Symbol] = {}
         self.generators: List[ThreadCmpGenerator] = []  # cmp generators
@@ -202,9 +206,8 @@ class FakeClient:
         status = 'NEW'
 
         # check whether it has already been placed
-        for placed_order in self._placed_orders:
-            if placed_order.uid == order.uid:
-                raise Exception(f'order {order} has already been placed')
+        if order.uid in self._placed_orders:
+            raise Exception(f'order {order} has already been placed')
 
         # get account free value from symbol name
         base_account, quote_account = self._get_accounts(symbol_name=symbol_name)
@@ -244,31 +247,28 @@ class FakeClient:
             }
 
     def cancel_order(self, symbol: str, origClientOrderId: str) -> dict:
-        # TODO: check that the order exist in list and remove from it
-        for order in self._placed_orders:
-            if order.uid == origClientOrderId:
-                self._placed_orders.remove(order)
-
-                # get account free value from symbol name
-                base_account, quote_account = self._get_accounts(symbol_name=symbol)
-
-                # update balance
-                if order.side == 'BUY':
-                    quote_account.free += order.get_total()
-                    quote_account.locked -= order.get_total()
-                else:
-                    base_account.free += order.quantity
-                    base_account.locked -= order.quantity
-                # call user socket callback
-                self._call_user_socket_order_canceled(order=order)
-                self._call_user_socket_balance_update()
-
-                return {
-                        "symbol": symbol,
-                        "origClientOrderId": origClientOrderId,
-                        "orderId": 1,
-                        "clientOrderId": "cancelMyOrder1"
-                    }
+        order = self._placed_orders.remove(uid=origClientOrderId)
+        if order:
+            # get account free value from symbol name
+            base_account, quote_account = self._get_accounts(symbol_name=symbol)
+
+            # update balance
+            if order.side == 'BUY':
+                quote_account.free += order.get_total()
+                quote_account.locked -= order.get_total()
+            else:
+                base_account.free += order.quantity
+                base_account.locked -= order.quantity
+            # call user socket callback
+            self._call_user_socket_order_canceled(order=order)
+            self._call_user_socket_balance_update()
+
+            return {
+                    "symbol": symbol,
+                    "origClientOrderId": origClientOrderId,
+                    "orderId": 1,
+                    "clientOrderId": "cancelMyOrder1"
+                }
         # if not found
         log.critical(f'trying to cancel an order not placed {origClientOrderId}')
         return {}
@@ -313,7 +313,7 @@ class FakeClient:
         self._process_cmp_change(symbol_name=symbol_name)
 
     def _process_cmp_change(self, symbol_name: str):
-        self._check_placed_orders_for_trading()
+        self._check_placed_orders_for_trading(symbol_name=symbol_name)
         msg = dict(
             e='24hrTicker',
             s=symbol_name,
@@ -321,16 +321,18 @@ class FakeClient:
         )
         self.symbol_ticker_socket_callback(msg)
 
-    def _check_placed_orders_for_trading(self):
-        for order in self._placed_orders:
-            symbol_name = order.symbol_name
-            if order.side == 'BUY' and self.cmp[symbol_name] <= order.price:
-                self._trade_order(order=order)
-            elif order.side == 'SELL' and self.cmp[symbol_name] >= order.price:
+    def _check_placed_orders_for_trading(self, symbol_name: str):
+        # only the crossed price levels of the symbol are visited:
+        #   BUY: cmp <= price
+        #   SELL: cmp >= price
+        crossed_orders = self._placed_orders.get_crossed(symbol_name=symbol_name, cmp=self.cmp[symbol_name])
+        for order in crossed_orders:
+            # the order could have been canceled or traded from a callback of a previous trade
+            if order.uid in self._placed_orders:
                 self._trade_order(order=order)
 
     def _place_order(self, order: FakeOrder):
-        self._placed_orders.append(order)
+        self._placed_orders.add(order)
 
         symbol_name = order.symbol_name
         base_account, quote_account = self._get_accounts(symbol_name=symbol_name)
@@ -345,8 +347,8 @@ class FakeClient:
         self._call_user_socket_balance_update()
 
     def _trade_order(self, order: FakeOrder):
-        if order in self._placed_orders:
-            self._placed_orders.remove(order)
+        if self._placed_orders.remove(uid=order.uid):
+            self.traded_orders_count += 1
 
             symbol_name = order.symbol_name
             base_account, quote_account = self._get_accounts(symbol_name=symbol_name)
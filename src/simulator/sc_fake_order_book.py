@@ -0,0 +1,112 @@
+# sc_fake_order_book.py
+
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Dict, Optional
+
+
+class FakeOrderBookSide:
+    # resting orders of one side of one symbol, grouped in price levels
+    # the list of prices is kept sorted (ascending) and each level keeps its orders in arrival order
+    def __init__(self, side: str):
+        self.side = side
+        self._prices: List[float] = []
+        self._levels: Dict[float, list] = {}
+
+    def __len__(self) -> int:
+        return sum([len(level) for level in self._levels.values()])
+
+    def add(self, order) -> None:
+        level = self._levels.get(order.price)
+        if level is None:
+            # new price level
+            level = []
+            self._levels[order.price] = level
+            insort(self._prices, order.price)
+        level.append(order)
+
+    def remove(self, order) -> None:
+        level = self._levels.get(order.price)
+        if level is None:
+            return
+        level.remove(order)
+        if len(level) == 0:
+            # remove empty price level
+            del self._levels[order.price]
+            del self._prices[bisect_left(self._prices, order.price)]
+
+    def get_crossed(self, cmp: float) -> list:
+        # return (without removing them) the orders that must be traded at cmp:
+        #   BUY: price >= cmp (starting from the highest price)
+        #   SELL: price <= cmp (starting from the lowest price)
+        if self.side == 'BUY':
+            crossed_prices = reversed(self._prices[bisect_left(self._prices, cmp):])
+        else:
+            crossed_prices = self._prices[:bisect_right(self._prices, cmp)]
+        crossed = []
+        for price in crossed_prices:
+            crossed.extend(self._levels[price])
+        return crossed
+
+
+class FakeOrderBook:
+    # resting (LIMIT) orders placed in the simulator for one symbol
+    def __init__(self, symbol_name: str):
+        self.symbol_name = symbol_name
+        self._bids = FakeOrderBookSide(side='BUY')
+        self._asks = FakeOrderBookSide(side='SELL')
+
+    def __len__(self) -> int:
+        return len(self._bids) + len(self._asks)
+
+    def add(self, order) -> None:
+        self._get_side(side=order.side).add(order)
+
+    def remove(self, order) -> None:
+        self._get_side(side=order.side).remove(order)
+
+    def get_crossed(self, cmp: float) -> list:
+        # only the crossed price levels are visited
+        return self._bids.get_crossed(cmp=cmp) + self._asks.get_crossed(cmp=cmp)
+
+    def _get_side(self, side: str) -> FakeOrderBookSide:
+        return self._bids if side == 'BUY' else self._asks
+
+
+class FakeOrderBooks:
+    # per-symbol order books with a global uid index (uid -> order)
+    def __init__(self):
+        self._books: Dict[str, FakeOrderBook] = {}
+        self._orders_by_uid: Dict[str, object] = {}
+
+    def __len__(self) -> int:
+        return len(self._orders_by_uid)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._orders_by_uid
+
+    def get(self, uid: str) -> Optional[object]:
+        return self._orders_by_uid.get(uid)
+
+    def add(self, order) -> None:
+        if order.uid in self._orders_by_uid:
+            raise Exception(f'order {order.uid} already in order book')
+        self._orders_by_uid[order.uid] = order
+        self._get_book(symbol_name=order.symbol_name).add(order)
+
+    def remove(self, uid: str) -> Optional[object]:
+        # return the removed order or None if not in the book
+        order = self._orders_by_uid.pop(uid, None)
+        if order:
+            self._get_book(symbol_name=order.symbol_name).remove(order)
+        return order
+
+    def get_crossed(self, symbol_name: str, cmp: float) -> list:
+        book = self._books.get(symbol_name)
+        return book.get_crossed(cmp=cmp) if book else []
+
+    def _get_book(self, symbol_name: str) -> FakeOrderBook:
+        book = self._books.get(symbol_name)
+        if book is None:
+            book = FakeOrderBook(symbol_name=symbol_name)
+            self._books[symbol_name] = book
+        return book
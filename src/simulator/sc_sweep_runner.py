@@ -0,0 +1,313 @@
+# sc_sweep_runner.py
+
+import configparser
+import contextlib
+import csv
+import itertools
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional, Union
+
+log = logging.getLogger('log.sc_sweep_runner')
+
+# parameters (per symbol section in config_new.ini) that can be swept
+SWEEPABLE_PARAMETERS = [
+    'distance_to_target_price',
+    'net_quote_balance',
+    'cycles_count_for_inactivity',
+    'forced_shift',
+    'target_total_net_profit',
+    'max_negative_profit_allowed',
+    'loss_for_activation_flag',
+    'over_activation_shift',
+]
+
+# columns of the results table (params are added as param_<name>)
+RESULT_FIELDS = [
+    'key', 'seed', 'ticks', 'consolidated_profit', 'expected_profit', 'expected_profit_at_cmp',
+    'session_profit_at_cmp', 'total_profit_at_cmp', 'session_count', 'consolidated_session_count',
+    'expected_session_count', 'trades_count', 'placed_orders_count_at_price', 'market_orders_count_at_cmp',
+    'isolated_orders_count', 'elapsed', 'error'
+]
+
+
+class ParameterRange:
+    # values for one parameter: either a list of discrete values or a [low, high] interval
+    def __init__(self, name: str, values: Optional[List[float]] = None,
+                 low: Optional[float] = None, high: Optional[float] = None, is_int=False):
+        if name not in SWEEPABLE_PARAMETERS:
+            raise Exception(f'parameter {name} can not be swept')
+        self.name = name
+        self.values = values
+        self.low = low
+        self.high = high
+        self.is_int = is_int
+
+    @staticmethod
+    def from_string(spec: str) -> 'ParameterRange':
+        # name=v1,v2,v3 (discrete values) or name=low:high (interval)
+        name, values_s = spec.replace(' ', '').split('=')
+        if ':' in values_s:
+            low_s, high_s = values_s.split(':')
+            is_int = '.' not in low_s and '.' not in high_s
+            return ParameterRange(name=name, low=float(low_s), high=float(high_s), is_int=is_int)
+        values = [float(value) for value in values_s.split(',')]
+        is_int = all(['.' not in value for value in values_s.split(',')])
+        return ParameterRange(name=name, values=values, is_int=is_int)
+
+    def get_grid_values(self, steps: int) -> List[float]:
+        if self.values:
+            return [self._cast(value) for value in self.values]
+        # interval: equally spaced values (without duplicates when casting to int)
+        values = [self.low + (self.high - self.low) * i / (steps - 1) for i in range(steps)] if steps > 1 \
+            else [self.low]
+        return list(dict.fromkeys([self._cast(value) for value in values]))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.values:
+            return self._cast(rng.choice(self.values))
+        return self._cast(rng.uniform(self.low, self.high))
+
+    def get_bounds(self) -> (float, float):
+        if self.values:
+            return min(self.values), max(self.values)
+        return self.low, self.high
+
+    def _cast(self, value: float) -> Union[int, float]:
+        return int(round(value)) if self.is_int else round(value, 8)
+
+
+def get_key(params: Dict, seed: int, ticks: int) -> str:
+    # unique key for a simulation (used for checkpoints)
+    return json.dumps(dict(params=params, seed=seed, ticks=ticks), sort_keys=True)
+
+
+def run_simulation(config_file: str, params: Dict, seed: int, ticks: int) -> Dict:
+    # run a headless SessionManager + FakeClient simulation in its own working directory
+    # the market is driven from here (MANUAL mode) with a seeded random walk, so that
+    # all the parameter sets are evaluated against the same market for the same seed
+    result: Dict = dict(key=get_key(params=params, seed=seed, ticks=ticks), seed=seed, ticks=ticks, error='')
+    for name, value in params.items():
+        result[f'param_{name}'] = value
+
+    start = time.time()
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='scorpius_sweep_')
+    try:
+        # the app reads config_new.ini, log/ and database.db from the working directory
+        _write_config(config_file=config_file, params=params, work_dir=work_dir)
+        os.mkdir(os.path.join(work_dir, 'log'))
+        os.chdir(work_dir)
+
+        # silence the app (logs & prints) in the worker
+        logging.getLogger('log').addHandler(logging.NullHandler())
+        logging.getLogger('log').propagate = False
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # imported here to keep the parent process light
+            from managers.sc_session_manager import SessionManager
+
+            sm = SessionManager()
+            client = sm.client_manager.client
+            rng = random.Random(seed)
+            choice_values = {symbol.name: sm.cm.get_simulator_choice_values(symbol_name=symbol.name)
+                             for symbol in sm.symbols}
+            try:
+                for _ in range(ticks):
+                    for symbol in sm.symbols:
+                        new_cmp = client.cmp[symbol.name] + rng.choice(choice_values[symbol.name])
+                        client.update_cmp_from_generator(dict(e='24hrTicker', s=symbol.name, c=str(new_cmp)))
+            except Exception as e:
+                # keep the values reached so far
+                result['error'] = f'{type(e).__name__}: {e}'
+
+            result.update(_get_simulation_values(sm=sm))
+            sm.stop()
+    except Exception as e:
+        result['error'] = f'{type(e).__name__}: {e}'
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result['elapsed'] = round(time.time() - start, 3)
+    return result
+
+
+def _write_config(config_file: str, params: Dict, work_dir: str) -> None:
+    config = configparser.ConfigParser()
+    config.read(config_file)
+    # drive the market from the sweep runner, not from generator threads
+    config.set('APP_MODE', 'client_mode', 'CLIENT_MODE_SIMULATOR_MANUAL')
+    # every simulation starts from scratch
+    if config.has_section('SNAPSHOT'):
+        config.set('SNAPSHOT', 'enabled', 'False')
+    symbol_names = [s.replace(' ', '').replace('[', '').replace(']', '').replace("'", "")
+                    for s in config.get('BINANCE', 'symbols').split(',')]
+    for symbol_name in symbol_names:
+        for name, value in params.items():
+            config.set(symbol_name, name, str(value))
+    with open(os.path.join(work_dir, 'config_new.ini'), 'w') as f:
+        config.write(f)
+
+
+def _get_simulation_values(sm) -> Dict:
+    values = dict(consolidated_profit=0.0, expected_profit=0.0, expected_profit_at_cmp=0.0,
+                  session_profit_at_cmp=0.0, session_count=0, consolidated_session_count=0,
+                  expected_session_count=0, placed_orders_count_at_price=0, market_orders_count_at_cmp=0,
+                  isolated_orders_count=len(sm.iom.isolated_orders),
+                  trades_count=sm.client_manager.client.traded_orders_count)
+    for symbol in sm.symbols:
+        terminated = sm.terminated_sessions[symbol.name]
+        session = sm.active_sessions[symbol.name]
+        values['consolidated_profit'] += terminated['global_consolidated_profit']
+        values['expected_profit'] += terminated['global_expected_profit']
+        values['consolidated_session_count'] += terminated['global_consolidated_session_count']
+        values['expected_session_count'] += terminated['global_expected_session_count']
+        values['placed_orders_count_at_price'] += terminated['global_placed_orders_count_at_price']
+        values['market_orders_count_at_cmp'] += terminated['global_market_orders_count_at_cmp']
+        values['session_count'] += sm.session_count[symbol.name]
+        values['expected_profit_at_cmp'] += sm.iom.get_expected_profit_at_cmp(cmp=session.cmp,
+                                                                              symbol_name=symbol.name)
+        values['session_profit_at_cmp'] += session.ptm.get_total_actual_profit_at_cmp(cmp=session.cmp)
+    values['total_profit_at_cmp'] = \
+        values['consolidated_profit'] + values['expected_profit_at_cmp'] + values['session_profit_at_cmp']
+    return values
+
+
+class SweepRunner:
+    def __init__(self,
+                 config_file: str,
+                 parameters: List[ParameterRange],
+                 ticks: int,
+                 seed: int = 1,
+                 workers: Optional[int] = None,
+                 checkpoint_file: Optional[str] = None,
+                 objective: str = 'consolidated_profit'):
+        self.config_file = os.path.abspath(config_file)
+        self.parameters = parameters
+        self.ticks = ticks
+        self.seed = seed
+        self.workers = workers or os.cpu_count()
+        self.checkpoint_file = checkpoint_file
+        self.objective = objective
+
+        # results already done (from checkpoint) and done in this run, by key
+        self.results: Dict[str, Dict] = {}
+        self._load_checkpoint()
+
+    # ********** search strategies **********
+
+    def run_grid(self, steps: int = 5) -> List[Dict]:
+        names = [p.name for p in self.parameters]
+        grid = itertools.product(*[p.get_grid_values(steps=steps) for p in self.parameters])
+        return self._run_batch(params_list=[dict(zip(names, values)) for values in grid])
+
+    def run_random(self, samples: int) -> List[Dict]:
+        rng = random.Random(self.seed)
+        params_list = [{p.name: p.sample(rng=rng) for p in self.parameters} for _ in range(samples)]
+        return self._run_batch(params_list=params_list)
+
+    def run_bayesian(self, iterations: int, initial_samples: int, candidates: int = 1000) -> List[Dict]:
+        # gaussian process + expected improvement, evaluated in batches of <workers> simulations
+        # imported here since they are only needed for this strategy
+        import numpy as np
+        from scipy.stats import norm
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        from sklearn.gaussian_process.kernels import Matern
+
+        rng = random.Random(self.seed)
+        bounds = [p.get_bounds() for p in self.parameters]
+        self.run_random(samples=initial_samples)
+
+        while iterations > 0:
+            done = [r for r in self.results.values() if r['error'] == '' and self._is_own_result(r)]
+            if len(done) < 2:
+                raise Exception('not enough successful simulations to fit the model')
+            x = np.array([self._normalize(r, bounds) for r in done])
+            y = np.array([r[self.objective] for r in done])
+
+            gpr = GaussianProcessRegressor(kernel=Matern(nu=2.5), normalize_y=True, random_state=self.seed)
+            gpr.fit(x, y)
+
+            # expected improvement of random candidates
+            candidate_params = [{p.name: p.sample(rng=rng) for p in self.parameters} for _ in range(candidates)]
+            cx = np.array([self._normalize({f'param_{k}': v for k, v in c.items()}, bounds)
+                           for c in candidate_params])
+            mu, sigma = gpr.predict(cx, return_std=True)
+            sigma = np.maximum(sigma, 1e-9)
+            z = (mu - y.max()) / sigma
+            ei = (mu - y.max()) * norm.cdf(z) + sigma * norm.pdf(z)
+
+            batch_size = min(self.workers, iterations)
+            best = [candidate_params[i] for i in np.argsort(-ei)[:batch_size]]
+            self._run_batch(params_list=best)
+            iterations -= batch_size
+
+        return self.get_table()
+
+    # ********** results **********
+
+    def get_table(self) -> List[Dict]:
+        # own results sorted by objective (best first), failed simulations at the end
+        rows = [r for r in self.results.values() if self._is_own_result(r)]
+        return sorted(rows, key=lambda r: (r['error'] == '', r.get(self.objective, 0.0)), reverse=True)
+
+    def write_table(self, output_file: str) -> None:
+        rows = self.get_table()
+        param_fields = [f'param_{p.name}' for p in self.parameters]
+        with open(output_file, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=param_fields + RESULT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def _run_batch(self, params_list: List[Dict]) -> List[Dict]:
+        # skip simulations already done (resume from checkpoint)
+        pending = []
+        for params in params_list:
+            key = get_key(params=params, seed=self.seed, ticks=self.ticks)
+            if key not in self.results and params not in pending:
+                pending.append(params)
+        log.info(f'sweep: {len(pending)} simulations to run ({len(params_list) - len(pending)} already done)')
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(run_simulation, self.config_file, params, self.seed, self.ticks)
+                       for params in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results[result['key']] = result
+                self._append_to_checkpoint(result=result)
+                print(f'[{len(self.results)}] {self.objective}: {result.get(self.objective, 0.0):,.4f} '
+                      f'{result["key"]} {result["error"]}')
+        return self.get_table()
+
+    def _is_own_result(self, result: Dict) -> bool:
+        # results in the checkpoint from a sweep with other parameters, seed or ticks are not used
+        return result['seed'] == self.seed and result['ticks'] == self.ticks \
+            and all([f'param_{p.name}' in result for p in self.parameters])
+
+    def _normalize(self, result: Dict, bounds: List) -> List[float]:
+        return [(result[f'param_{p.name}'] - low) / (high - low) if high > low else 0.0
+                for p, (low, high) in zip(self.parameters, bounds)]
+
+    def _load_checkpoint(self) -> None:
+        if self.checkpoint_file and os.path.exists(self.checkpoint_file):
+            with open(self.checkpoint_file) as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                        self.results[result['key']] = result
+                    except (ValueError, KeyError):
+                        # last line could be incomplete if the previous run was killed
+                        log.info(f'sweep: checkpoint line discarded: {line}')
+
+    def _append_to_checkpoint(self, result: Dict) -> None:
+        if self.checkpoint_file:
+            with open(self.checkpoint_file, 'a') as f:
+                f.write(json.dumps(result) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
@@ -20,8 +20,8 @@ class ThreadCmpGenerator:
 
     def terminate(self):
         print(f'cmp thread for symbol {self._symbol_name} terminated')
+        # the thread ends after the current interval
         self._running = False
-        raise Exception(f'generator for symbol {self._symbol_name} terminated')  # todo: check if it is feasible
 
     def run(self):
         # generate a new cmp, between choice_values, every _interval seconds and send it to update_cmp callback function
@@ -0,0 +1,59 @@
+# sweep.py
+
+# parameter sweep over headless simulations (SessionManager + FakeClient), run from src/:
+#   python sweep.py grid --param distance_to_target_price=8:16 --param forced_shift=160,320 --steps 5
+#   python sweep.py random --param net_quote_balance=2.0:6.0 --samples 64
+#   python sweep.py bayes --param cycles_count_for_inactivity=100:800 --iterations 48 --initial 16
+
+import argparse
+
+from simulator.sc_sweep_runner import SweepRunner, ParameterRange, SWEEPABLE_PARAMETERS
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scorpius parameter sweep')
+    parser.add_argument('strategy', choices=['grid', 'random', 'bayes'])
+    parser.add_argument('--param', action='append', required=True,
+                        help=f'name=v1,v2,... or name=low:high, name in {SWEEPABLE_PARAMETERS}')
+    parser.add_argument('--config', default='config_new.ini', help='base config file')
+    parser.add_argument('--ticks', type=int, default=20_000, help='cmp updates per symbol and simulation')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the simulated market')
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('--steps', type=int, default=5, help='grid: values per interval parameter')
+    parser.add_argument('--samples', type=int, default=32, help='random: number of simulations')
+    parser.add_argument('--iterations', type=int, default=32, help='bayes: number of guided simulations')
+    parser.add_argument('--initial', type=int, default=8, help='bayes: number of initial random simulations')
+    parser.add_argument('--objective', default='consolidated_profit', help='result column to maximize')
+    parser.add_argument('--checkpoint', default='sweep_checkpoint.jsonl', help='resumable results journal')
+    parser.add_argument('--output', default='sweep_results.csv', help='results table')
+    args = parser.parse_args()
+
+    runner = SweepRunner(
+        config_file=args.config,
+        parameters=[ParameterRange.from_string(spec=spec) for spec in args.param],
+        ticks=args.ticks,
+        seed=args.seed,
+        workers=args.workers,
+        checkpoint_file=args.checkpoint,
+        objective=args.objective
+    )
+
+    if args.strategy == 'grid':
+        runner.run_grid(steps=args.steps)
+    elif args.strategy == 'random':
+        runner.run_random(samples=args.samples)
+    else:
+        runner.run_bayesian(iterations=args.iterations, initial_samples=args.initial)
+
+    runner.write_table(output_file=args.output)
+
+    # show the best results
+    for row in runner.get_table()[:10]:
+        params = ' '.join([f'{p.name}={row[f"param_{p.name}"]}' for p in runner.parameters])
+        print(f'{row.get(args.objective, 0.0):12,.4f}  {params}  sessions: {row.get("session_count", 0)}'
+              f'  trades: {row.get("trades_count", 0)}  {row["error"]}')
+    print(f'results table written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()